@@ -0,0 +1,2 @@
+# pmsim/__init__.py
+"""Headless building blocks for the Japan PM Simulator engine."""
@@ -0,0 +1,7 @@
+# pmsim/__main__.py
+"""``python -m pmsim``: the headless command line (see pmsim.cli)."""
+import sys
+
+from pmsim.cli import main
+
+sys.exit(main())
@@ -0,0 +1,233 @@
+# pmsim/advisor.py
+"""Search-based advisor: Monte Carlo tree search over the next actions.
+
+A tree node is a sequence of actions from the current day (one action, then one day
+passes). The game is random, so the search is open-loop: every visit replays the
+node's actions on a fresh fork of the current state. Selected paths are evaluated
+in batches on the batch engine. Each path becomes one row of a BatchSimulation forked
+from the game, plays its actions, then waits out the rest of a fixed horizon. A
+path's value is the mean daily approval over that horizon, with days after losing
+office counting as zero.
+
+Batches run in a process pool when workers are available (leaf parallelism with
+virtual loss), otherwise in-process. The tree is kept between turns: after the player
+moves, the matching child becomes the new root.
+
+The time budget is a deadline. Batch sizes are powers of two up to BATCH_SIZE, and
+each size's last measured duration on the game's map picks the largest batch expected
+to finish in the time left. Cost grows faster than linearly on large maps, so an
+unmeasured size is extrapolated from a smaller one with a margin. Each worker runs one
+batch at a time. Pool results that arrive after the deadline are dropped and their
+virtual visits undone, and later searches leave a worker alone until its dropped batch
+has finished. A search that evaluated nothing recommends waiting.
+"""
+import concurrent.futures
+import multiprocessing
+import os
+import threading
+import time
+
+import numpy as np
+
+from pmsim.batch import BatchSimulation, game_snapshot
+from pmsim.env import ACTIONS
+
+DEFAULT_TIME_BUDGET = 0.5 # Seconds per recommendation
+MAX_DEPTH = 4 # Tree depth in decision days
+HORIZON_DAYS = 60 # Days simulated per evaluation (tree actions plus waiting)
+BATCH_SIZE = 64 # Paths evaluated together in one BatchSimulation (at most)
+PROBE_BATCH_SIZE = 8 # First batch on a map, before any batch cost is known
+UNMEASURED_MARGIN = 2.0 # Extrapolating a batch cost to a larger, unmeasured size
+EXPLORATION = 0.15 # UCT exploration constant (values are scaled to 0-1)
+
+
+class Node:
+    """Visit statistics for one action sequence."""
+    def __init__(self):
+        self.children = {} # action index -> Node
+        self.visits = 0 # Includes in-flight (virtual loss) visits
+        self.value_sum = 0.0
+
+    def mean(self):
+        return self.value_sum / self.visits if self.visits else 0.0
+
+
+# --- Evaluation (runs in the worker processes too) ---
+_worker_dataset = None
+_evaluators = {}
+
+def _init_worker(dataset):
+    global _worker_dataset
+    _worker_dataset = dataset
+
+def evaluate_paths(dataset, snapshot, paths, seed, horizon=HORIZON_DAYS):
+    """Mean daily approval (0 after losing) over horizon days for each action path."""
+    key = (id(dataset), len(paths))
+    batch = _evaluators.get(key)
+    if batch is None or batch.dataset is not dataset:
+        batch = _evaluators[key] = BatchSimulation(dataset, len(paths))
+    batch.rng = np.random.default_rng(seed)
+    batch.load_snapshot(np.arange(len(paths)), snapshot)
+
+    depth = max(len(path) for path in paths)
+    actions = np.zeros((len(paths), depth), dtype=np.int64)
+    for i, path in enumerate(paths): actions[i, :len(path)] = path
+    total = np.zeros(len(paths))
+    for day in range(horizon):
+        if day < depth: batch.apply_actions(actions[:, day])
+        batch.step_day()
+        total += np.where(batch.running, batch.global_approval, 0.0)
+    return total / horizon
+
+def _evaluate_timed(dataset, snapshot, paths, seed):
+    """(values, seconds) of evaluate_paths."""
+    start = time.perf_counter()
+    values = evaluate_paths(dataset, snapshot, paths, seed)
+    return values, time.perf_counter() - start
+
+def _evaluate_in_worker(snapshot, paths, seed):
+    return _evaluate_timed(_worker_dataset, snapshot, paths, seed)
+
+
+class Advisor:
+    """Recommends the next action for an interactive Simulation (on the game's own dataset)."""
+    def __init__(self, workers=None, time_budget=DEFAULT_TIME_BUDGET, seed=None):
+        self.workers = max(0, min(4, (os.cpu_count() or 1) - 1)) if workers is None else workers
+        self.time_budget = time_budget
+        self.rng = np.random.default_rng(seed)
+        self._pool = None
+        self._pool_dataset = None
+        self._lock = threading.Lock()
+        self._root = Node()
+        self._root_key = None
+        self._moves = [] # Player moves since the last search, applied to the tree lazily
+        self._batch_seconds = {} # (id(dataset), batch size) -> last measured seconds
+        self._late = set() # Dropped pool batches that may still occupy a worker
+
+    # --- Tree reuse ---
+    @staticmethod
+    def _key(sim):
+        return (id(sim), sim.tick, sim.election_in_progress)
+
+    def advance(self, action):
+        """Record the player's move (an ACTIONS name; a day passes after it)."""
+        with self._lock: self._moves.append(ACTIONS.index(action))
+
+    def _take_root(self, sim):
+        with self._lock: moves, self._moves = self._moves, []
+        root, key = self._root, self._root_key
+        for move in moves:
+            root = root.children.get(move, Node())
+            if key is not None: key = (key[0], key[1] + 1, None)
+        if key != self._key(sim): root = Node() # Different game or state: start over
+        return root
+
+    # --- Search ---
+    def _select(self, root, n_actions):
+        """Walk down by UCT, expanding one untried action; adds a virtual visit on the way."""
+        node, path, nodes = root, [], [root]
+        while len(path) < MAX_DEPTH:
+            untried = [a for a in range(n_actions) if a not in node.children]
+            if untried:
+                action = untried[int(self.rng.integers(len(untried)))]
+                node.children[action] = child = Node()
+                path.append(action); nodes.append(child)
+                break
+            log_visits = np.log(max(node.visits, 1))
+            action, node = max(node.children.items(), key=lambda item: item[1].mean() / 100.0
+                               + EXPLORATION * np.sqrt(log_visits / max(item[1].visits, 1)))
+            path.append(action); nodes.append(node)
+        for visited in nodes: visited.visits += 1
+        return path, nodes
+
+    def _pool_executor(self, dataset):
+        """Worker pool holding dataset (restarted when a game on another map is advised)."""
+        if self.workers <= 0: return None
+        if self._pool is not None and self._pool_dataset is not dataset: self.close()
+        if self._pool is None:
+            context = multiprocessing.get_context('spawn') # Safe next to a GUI main loop
+            self._pool = concurrent.futures.ProcessPoolExecutor(self.workers, mp_context=context,
+                                                                initializer=_init_worker, initargs=(dataset,))
+            self._pool_dataset = dataset
+        return self._pool
+
+    def _batch_size(self, dataset, remaining):
+        """Paths for the next batch: the largest power of two (up to BATCH_SIZE) expected to
+        finish within remaining seconds, 0 when not even one path will."""
+        if remaining <= 0: return 0
+        measured = {size: seconds for (key, size), seconds in self._batch_seconds.items() if key == id(dataset)}
+        if not measured: return PROBE_BATCH_SIZE
+        best, size, known = 0, 1, None # known: the largest measured size so far
+        while size <= BATCH_SIZE:
+            if size in measured: known, estimate = size, measured[size]
+            elif known is not None: estimate = measured[known] * size / known * UNMEASURED_MARGIN
+            else: estimate = min(measured.items())[1] # Smaller than every measured size
+            if estimate <= remaining: best = size
+            size *= 2
+        return best
+
+    def recommend(self, sim, time_budget=None):
+        """Search from sim's current state and return the recommendation as a dict:
+        action (ACTIONS name), expected_approval, visits, and per-action statistics.
+
+        expected_approval is None when only waiting is possible or no path could be
+        evaluated within the budget (the action is then 'wait')."""
+        budget = self.time_budget if time_budget is None else time_budget
+        start = time.perf_counter()
+        deadline = start + budget
+        key = self._key(sim)
+        if not sim.running or sim.election_in_progress: # Only waiting is possible
+            return {'action': 'wait', 'expected_approval': None, 'visits': 0, 'actions': {}, 'seconds': 0.0}
+
+        snapshot = game_snapshot(sim)
+        root = self._take_root(sim)
+        pool = self._pool_executor(sim.dataset)
+        in_flight = {}
+
+        def select_batch(size):
+            batch = [self._select(root, len(ACTIONS)) for _ in range(size)]
+            return batch, [path for path, _ in batch], int(self.rng.integers(2**63))
+
+        def backpropagate(batch, values, seconds):
+            self._batch_seconds[id(sim.dataset), len(batch)] = seconds
+            for (_, nodes), value in zip(batch, values):
+                for node in nodes: node.value_sum += value
+
+        if pool is None:
+            while size := self._batch_size(sim.dataset, deadline - time.perf_counter()):
+                batch, paths, seed = select_batch(size)
+                backpropagate(batch, *_evaluate_timed(sim.dataset, snapshot, paths, seed))
+        else:
+            while time.perf_counter() < deadline:
+                self._late = {future for future in self._late if not future.done()}
+                while len(in_flight) + len(self._late) < self.workers: # One batch per free worker
+                    size = self._batch_size(sim.dataset, deadline - time.perf_counter())
+                    if not size: break
+                    batch, paths, seed = select_batch(size)
+                    in_flight[pool.submit(_evaluate_in_worker, snapshot, paths, seed)] = batch
+                if not in_flight and not self._late: break
+                remaining = max(0.0, deadline - time.perf_counter())
+                done, _ = concurrent.futures.wait(set(in_flight) | self._late, timeout=remaining,
+                                                  return_when=concurrent.futures.FIRST_COMPLETED)
+                done &= set(in_flight)
+                for future in done: backpropagate(in_flight.pop(future), *future.result())
+            for future, batch in in_flight.items(): # Too late: drop the result and its virtual visits
+                if not future.cancel(): self._late.add(future)
+                for _, nodes in batch:
+                    for node in nodes: node.visits -= 1
+
+        self._root, self._root_key = root, key
+        visited = {a: child for a, child in root.children.items() if child.visits}
+        if not visited: # Nothing evaluated in time
+            return {'action': 'wait', 'expected_approval': None, 'visits': root.visits, 'actions': {},
+                    'seconds': time.perf_counter() - start}
+        stats = {ACTIONS[a]: (child.visits, child.mean()) for a, child in visited.items()}
+        best = max(visited.items(), key=lambda item: item[1].visits)
+        return {'action': ACTIONS[best[0]], 'expected_approval': best[1].mean(), 'visits': root.visits,
+                'actions': stats, 'seconds': time.perf_counter() - start}
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = self._pool_dataset = None
+        self._late = set()
@@ -0,0 +1,103 @@
+# pmsim/aggregates.py
+"""National aggregates of a unit store with change tracking.
+
+NationalAggregates keeps country-wide figures of one UnitArrays store:
+global (population-weighted) approval, total population, total GDP and the
+population-weighted growth rate. Code that changes the store says which fields
+it changed (``changed('approval')``). A figure is recomputed only when it is read
+after one of its inputs changed, so several reads between mutations cost one pass.
+
+Approval is weighted by integer (rounded) population, as it always has been. The
+rounded weights and their total are cached and only rebuilt after the population
+changes (once a simulated day). A policy, event or election step then recomputes
+approval with a single dot product instead of rounding and summing the population
+again.
+
+Every field also has a version counter that is bumped by changed(). A consumer (for
+example a GUI panel) keeps the versions it last saw and asks dirty_since() which
+fields changed since, so any number of consumers can track changes independently.
+"""
+import numpy as np
+
+FIELDS = ('population', 'gdp', 'economy', 'approval', 'unemployment', 'population_growth_rate')
+# Aggregates that must be recomputed when a unit field changes
+DEPENDENTS = {
+    'population': ('weights', 'approval', 'growth_rate', 'population'),
+    'approval': ('approval',),
+    'gdp': ('gdp',),
+    'population_growth_rate': ('growth_rate',),
+    'economy': (), 'unemployment': (),
+}
+
+
+class NationalAggregates:
+    """Lazily recomputed country totals of a UnitArrays store, with per-field versions."""
+    def __init__(self, units):
+        self.units = units
+        self.versions = dict.fromkeys(FIELDS, 0)
+        self._stale = {'weights', 'approval', 'growth_rate', 'population', 'gdp'}
+        self._weights = self._weight_total = None
+        self._values = {}
+        self.recomputed = dict.fromkeys(('weights', 'approval', 'growth_rate', 'population', 'gdp'), 0)
+
+    def changed(self, *fields):
+        """Record that the store's fields were modified (in place or reassigned)."""
+        for field in fields:
+            self.versions[field] += 1
+            self._stale.update(DEPENDENTS[field])
+
+    def resync(self):
+        """Drop every cached figure (e.g. after replacing the store's arrays wholesale)."""
+        self.changed(*FIELDS)
+
+    def dirty_since(self, seen):
+        """Fields changed since the versions in seen (a dict from an earlier snapshot())."""
+        return {field for field, version in self.versions.items() if version != seen.get(field)}
+
+    def snapshot(self):
+        """Current versions, to pass to dirty_since later."""
+        return dict(self.versions)
+
+    # --- Figures ---
+    def _refresh_weights(self):
+        self._weights = np.rint(self.units.population) # Integer population weights
+        self._weight_total = float(self._weights.sum())
+        self._stale.discard('weights')
+        self.recomputed['weights'] += 1
+
+    def _figure(self, name, compute):
+        if name in self._stale:
+            if 'weights' in self._stale: self._refresh_weights()
+            self._values[name] = compute()
+            self._stale.discard(name)
+            self.recomputed[name] += 1
+        return self._values[name]
+
+    def _weighted_mean(self, values):
+        if self._weight_total <= 0: return 0.0
+        return float(self._weights @ values) / self._weight_total
+
+    @property
+    def approval(self):
+        """Global approval: integer-population-weighted mean, clamped to [0, 100]."""
+        return self._figure('approval', lambda: min(100.0, max(0.0, self._weighted_mean(self.units.approval))))
+
+    @property
+    def population(self):
+        """Total population (sum of the rounded unit populations)."""
+        return self._figure('population', lambda: int(self._weight_total))
+
+    @property
+    def gdp(self):
+        """Total nominal GDP (billions USD)."""
+        return self._figure('gdp', lambda: float(self.units.gdp.sum()))
+
+    @property
+    def growth_rate(self):
+        """Population-weighted mean annual growth rate (%)."""
+        return self._figure('growth_rate', lambda: self._weighted_mean(self.units.population_growth_rate))
+
+    @property
+    def gdp_per_capita(self):
+        population = self.population
+        return self.gdp * 1_000_000_000 / population if population > 0 else 0.0
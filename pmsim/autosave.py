@@ -0,0 +1,88 @@
+# pmsim/autosave.py
+"""Periodic autosave off the UI thread.
+
+An autosave is due every ``every_days`` simulated days or every ``every_seconds``
+seconds of play with something changed. The caller's thread only takes the snapshot
+(header fields and the pickled game, about a millisecond): pickling while the UI
+thread keeps mutating the game would not give a consistent state. Hashing, packing
+and the atomic write (temp file, fsync, rename) happen on a background thread. Autosaves rotate
+through ``keep`` files, replacing the oldest, and a new autosave is skipped while the
+previous one is still being written.
+"""
+import concurrent.futures
+import os
+import threading
+import time
+
+from pmsim import instrument, saves
+
+DEFAULT_EVERY_DAYS = 30
+DEFAULT_EVERY_SECONDS = 120
+DEFAULT_KEEP = 3
+
+
+class Autosaver:
+    """Rotating background autosaves into directory."""
+    def __init__(self, directory=".", every_days=DEFAULT_EVERY_DAYS, every_seconds=DEFAULT_EVERY_SECONDS,
+                 keep=DEFAULT_KEEP):
+        self.directory = directory
+        self.every_days = every_days
+        self.every_seconds = every_seconds
+        self.keep = keep
+        self.last_error = None # Exception of the last failed write, if any
+        self.last_path = None # File of the last completed autosave
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="autosave")
+        self._future = None
+        self._lock = threading.Lock()
+        self._saved_game = self._saved_tick = self._saved_state = None
+        self._saved_at = time.monotonic()
+
+    @staticmethod
+    def _state(sim):
+        return (sim.tick, len(sim.events), sim.events[-1] if sim.events else None, sim.running)
+
+    def due(self, sim):
+        """Whether sim should be autosaved now."""
+        if sim.game_id != self._saved_game: return True
+        if sim.tick - self._saved_tick >= self.every_days: return True
+        return (time.monotonic() - self._saved_at >= self.every_seconds and self._state(sim) != self._saved_state)
+
+    def busy(self):
+        return self._future is not None and not self._future.done()
+
+    def maybe_save(self, sim):
+        """Start an autosave if one is due and none is being written; returns True if started."""
+        if self.busy() or not self.due(sim): return False
+        self.save(sim)
+        return True
+
+    def save(self, sim):
+        """Snapshot sim now and write it to the next autosave file in the background."""
+        header, payload = saves.snapshot(sim)
+        path = self._next_path()
+        self._saved_game, self._saved_tick, self._saved_state = sim.game_id, sim.tick, self._state(sim)
+        self._saved_at = time.monotonic()
+        self._future = self._executor.submit(self._write, path, header, payload)
+        return self._future
+
+    def _write(self, path, header, payload):
+        try:
+            saves.write_bytes(path, saves.pack(header, payload))
+        except OSError as e:
+            with self._lock: self.last_error = e
+            if instrument.level <= instrument.WARNING:
+                instrument.emit(instrument.WARNING, 'autosave.failed', path=path, error=repr(e))
+            return None
+        with self._lock: self.last_path, self.last_error = path, None
+        return path
+
+    def _next_path(self):
+        """A missing autosave file if there is one, otherwise the least recently written."""
+        paths = [saves.autosave_path(index, self.directory) for index in range(1, self.keep + 1)]
+        for path in paths:
+            if not os.path.exists(path): return path
+        return min(paths, key=os.path.getmtime)
+
+    def close(self, wait=True):
+        """Finish (or with wait=False, abandon) the pending write and stop the thread."""
+        self._executor.shutdown(wait=wait)
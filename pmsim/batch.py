@@ -0,0 +1,263 @@
+# pmsim/batch.py
+"""Batch engine: many independent games stepped in lockstep.
+
+The state of every game lives in one ``(n_games, len(FIELDS), n_units)`` buffer, so a
+simulated day for all games is a handful of whole-array operations instead of a
+Python loop over games. The rules are the ones Simulation uses (shared through the
+policy, event, election and migration kernels): daily growth, migration, diffusion and
+drift; random events; an election called when approval drops below the threshold, with
+attack, voting and result phases on the following days; and the score as the mean of
+the daily global approval history. Balance knobs come from a params.Params.
+
+The daily update runs on a backend from pmsim.kernels: the NumPy operations here
+(the reference), or a compiled kernel with identical results when numba is installed.
+"""
+from types import SimpleNamespace
+
+import numpy as np
+
+from pmsim import election, events, kernels, migration, policies
+from pmsim.params import DEFAULT_PARAMS
+from pmsim.scheduler import ELECTION_PHASE_OFFSETS, ELECTION_ATTACK, ELECTION_RESULT
+from pmsim.units import UnitArrays, FIELDS, BOUNDS, draw_starting_stats
+
+SKILLS = ('economy_skill', 'unemployment_skill', 'welfare_skill', 'demographics_skill')
+N_RIVALS = 3
+PHASE_DAYS = dict((kind, offset) for kind, offset in ELECTION_PHASE_OFFSETS)
+
+
+class BatchSimulation:
+    """n_games independent games on one dataset (see module docstring)."""
+    def __init__(self, dataset, n_games, seed=None, params=None, backend=None):
+        self.dataset = dataset
+        self.n_games = n_games
+        self.names = dataset.unit_names
+        self.hierarchy = dataset.hierarchy()
+        self.graph = dataset.graph()
+        self.params = DEFAULT_PARAMS if params is None else params
+        self.rng = np.random.default_rng(seed)
+        self.backend = kernels.resolve(backend) # 'numpy' or 'numba'
+        n_units = dataset.n_units
+
+        # Disaster targets as a weight table (normalised on the starting population) plus a
+        # padded (disaster, option) -> row index
+        self._disaster_weights, options = events.disaster_weight_table(self.graph, dataset.population)
+        self._disaster_counts = np.array([len(o) for o in options])
+        self._disaster_rows = np.array([o + [o[0]] * (max(self._disaster_counts) - len(o)) for o in options])
+        self._effect_low = np.array([events.EVENT_EFFECT_RANGES[t][0] for t in events.EVENT_TYPES])
+        self._effect_high = np.array([events.EVENT_EFFECT_RANGES[t][1] for t in events.EVENT_TYPES])
+
+        self.buffer = np.zeros((n_games, len(FIELDS), n_units))
+        self.units = UnitArrays.from_buffer(self.names, self.buffer)
+        self.skills = {name: np.zeros(n_games) for name in SKILLS}
+        self.attack_skills = np.zeros((n_games, N_RIVALS))
+        self.global_approval = np.zeros(n_games)
+        self.score_sum = np.zeros(n_games) # Sum of the approval history
+        self.days = np.zeros(n_games, dtype=np.int64) # Days played (history length - 1)
+        self.election_day = np.full(n_games, -1, dtype=np.int64) # Days since the election was called, -1 if none
+        self.running = np.ones(n_games, dtype=bool)
+        self._migration_net = np.zeros((n_games, n_units))
+        self._days_to_refresh = 0
+        # Per-field clip bounds and the field rows touched by the compiled daily kernel
+        bounds = [BOUNDS.get(field, (None, None)) for field in FIELDS]
+        self._low = np.array([-np.inf if low is None else low for low, _ in bounds])
+        self._high = np.array([np.inf if high is None else high for _, high in bounds])
+        self.reset_games(np.arange(n_games))
+
+    def reset(self, seed=None):
+        if seed is not None: self.rng = np.random.default_rng(seed)
+        self.reset_games(np.arange(self.n_games))
+
+    def reset_games(self, rows):
+        """Start fresh games in the given rows."""
+        rows = np.asarray(rows)
+        if rows.size == 0: return
+        k, rng, units, dataset = rows.size, self.rng, self.units, self.dataset
+        units.population[rows] = dataset.population
+        units.gdp[rows] = dataset.gdp
+        units.population_growth_rate[rows] = dataset.growth_rate
+        for field, values in draw_starting_stats(rng, dataset.n_units, (k,), self.hierarchy).items():
+            getattr(units, field)[rows] = values
+        self._clip(rows)
+        for name in SKILLS: self.skills[name][rows] = rng.uniform(*self.params.pm_skill_range, k)
+        self.attack_skills[rows] = rng.uniform(*self.params.rival_skill_range, (k, N_RIVALS))
+        self.days[rows] = 0
+        self.election_day[rows] = -1
+        self.running[rows] = True
+        self._migration_net[rows] = migration.net_migration(units.population[rows], units.gdp[rows],
+                                                            units.unemployment[rows], units.approval[rows])
+        self._update_global_approval(rows)
+        self.score_sum[rows] = self.global_approval[rows]
+
+    def load_snapshot(self, rows, snapshot):
+        """Fork the game described by snapshot (see game_snapshot) into the given rows.
+
+        The snapshot's parameter set replaces this batch's (it applies to every row)."""
+        rows = np.asarray(rows)
+        self.params = snapshot.get('params', self.params)
+        self.buffer[rows] = snapshot['state']
+        for name in SKILLS: self.skills[name][rows] = snapshot['skills'][name]
+        self.attack_skills[rows] = snapshot['attack_skills']
+        self.election_day[rows] = snapshot['election_day']
+        self.running[rows] = snapshot['running']
+        self.score_sum[rows] = snapshot['score_sum']
+        self.days[rows] = snapshot['days']
+        units = self.units
+        self._migration_net[rows] = migration.net_migration(units.population[rows], units.gdp[rows],
+                                                            units.unemployment[rows], units.approval[rows])
+        self._update_global_approval(rows)
+
+    # --- Per-game quantities ---
+    def score(self):
+        """Current final score of every game (mean of its approval history)."""
+        return self.score_sum / (self.days + 1)
+
+    def _update_global_approval(self, rows=slice(None)):
+        weights = np.rint(self.units.population[rows]) # Integer pop for weighting, as in the game
+        total = weights.sum(axis=-1)
+        approval = (weights * self.units.approval[rows]).sum(axis=-1) / np.maximum(total, 1.0)
+        self.global_approval[rows] = np.where(total > 0, np.clip(approval, 0.0, 100.0), 0.0)
+
+    def _clip(self, rows=slice(None)):
+        for field, (low, high) in BOUNDS.items():
+            array = getattr(self.units, field)
+            if isinstance(rows, slice): np.clip(array, low, high, out=array)
+            else: array[rows] = np.clip(array[rows], low, high)
+
+    def _check_elections(self, rows):
+        rows = rows[self.running[rows] & (self.election_day[rows] < 0)
+                    & (self.global_approval[rows] < self.params['election_threshold'])]
+        self.election_day[rows] = 0
+
+    # --- Actions ---
+    def apply_actions(self, actions):
+        """Apply one action per game: 0 waits, k > 0 makes policies.POLICY_TYPES[k - 1].
+
+        Policies are ignored for finished games and during elections (as in the game);
+        the returned mask marks those blocked actions."""
+        actions = np.asarray(actions)
+        allowed = self.running & (self.election_day < 0)
+        touched = []
+        for k, policy in enumerate(policies.POLICY_TYPES, start=1):
+            rows = np.flatnonzero((actions == k) & allowed)
+            if rows.size == 0: continue
+            state = self.buffer[rows] # Copy of the chosen games, written back below
+            effect, success = policies.draw_outcomes(self.rng, policy, rows.size, self.params.outcome_ranges(policy),
+                                                     self.params['policy_success_probability'])
+            skills = SimpleNamespace(**{name: values[rows] for name, values in self.skills.items()})
+            policies.apply_policy(UnitArrays.from_buffer(self.names, state), policy, effect, success, skills, self.rng)
+            self.buffer[rows] = state
+            touched.append(rows)
+        if touched:
+            rows = np.concatenate(touched)
+            self._update_global_approval(rows)
+            self._check_elections(rows)
+        return (actions != 0) & ~allowed
+
+    # --- Time ---
+    def step_day(self):
+        """Advance every running game by one day; returns the mask of games that ended today."""
+        units, rng, shape = self.units, self.rng, self.units.approval.shape
+        was_running = self.running.copy()
+
+        if self._days_to_refresh <= 0:
+            self._migration_net = migration.net_migration(units.population, units.gdp, units.unemployment, units.approval)
+            self._days_to_refresh = migration.REFRESH_DAYS
+        self._days_to_refresh -= 1
+
+        # Natural growth, migration, diffusion and drift (Simulation._apply_daily_changes)
+        if self.backend == 'numba': self._daily_changes_compiled()
+        else:
+            units.population *= (1.0 + units.population_growth_rate / 100.0) ** (1 / 365.0)
+            units.population += self._migration_net / 365.0
+            units.approval[...] = self.graph.diffuse(units.approval)
+            for field, magnitude in self.params.daily_drift.items():
+                getattr(units, field)[...] += rng.uniform(-magnitude, magnitude, shape)
+            self._clip()
+            self._update_global_approval()
+
+        # Election phases for games with an election under way
+        self.election_day[self.election_day >= 0] += 1
+        attacked = np.flatnonzero(self.election_day == PHASE_DAYS[ELECTION_ATTACK])
+        if attacked.size:
+            impacts = election.draw_attack_impacts(rng, self.attack_skills[attacked])
+            hits = election.draw_local_hits(rng, impacts, shape[-1])
+            units.approval[attacked] = election.apply_hits(units.approval[attacked], hits)
+            self._update_global_approval(attacked)
+        voting = np.flatnonzero(self.election_day == PHASE_DAYS[ELECTION_RESULT])
+        if voting.size: self._hold_votes(voting)
+
+        # Random events (none while an election is under way, as in the game)
+        fire = np.flatnonzero(self.running & (self.election_day < 0) & (rng.random(self.n_games) < self.params['event_probability']))
+        if fire.size: self._apply_events(fire)
+
+        self.score_sum += np.where(was_running, self.global_approval, 0.0)
+        self.days += was_running
+        return was_running & ~self.running
+
+    def _daily_changes_compiled(self):
+        """The NumPy daily update above as one fused kernel pass (same draws, same results)."""
+        units, shape = self.units, self.units.approval.shape
+        growth_factor = (1.0 + units.population_growth_rate / 100.0) ** (1 / 365.0)
+        diffused = self.graph.diffuse(units.approval)
+        drift_fields = self.params.daily_drift
+        drift = np.empty((len(drift_fields),) + shape)
+        for k, magnitude in enumerate(drift_fields.values()): drift[k] = self.rng.uniform(-magnitude, magnitude, shape)
+        kernels.daily_changes(self.buffer, growth_factor, self._migration_net, diffused, drift,
+                              np.array([FIELDS.index(field) for field in drift_fields], dtype=np.int64),
+                              self._low, self._high, FIELDS.index('population'), FIELDS.index('approval'),
+                              self.global_approval)
+
+    def _hold_votes(self, rows):
+        approval = self.units.approval[rows]
+        if not self.hierarchy.is_identity: # Prefectures vote on their population-weighted mean
+            approval = self.hierarchy.prefecture_mean(approval, self.units.population[rows])
+        _, votes_to_oust = election.tally_votes(approval, self.params['keep_threshold'])
+        survived = election.pm_survives(votes_to_oust, approval.shape[-1])
+        self.running[rows[~survived]] = False
+        winners = rows[survived]
+        if winners.size:
+            boost = self.rng.uniform(*election.SURVIVAL_BOOST_RANGE, winners.size)
+            self.units.approval[winners] = np.clip(self.units.approval[winners] + boost[:, None], 0.0, 100.0)
+            self._update_global_approval(winners)
+        self.election_day[rows] = -1
+
+    def _apply_events(self, rows):
+        k, rng, units = rows.size, self.rng, self.units
+        n_units = units.approval.shape[-1]
+        kind = rng.integers(len(events.EVENT_TYPES), size=k)
+        effect = self._effect_low[kind] + (self._effect_high[kind] - self._effect_low[kind]) * rng.random(k)
+        weights = np.ones((k, n_units))
+
+        disaster = kind == events.EVENT_TYPES.index("natural_disaster")
+        if disaster.any():
+            name = rng.integers(len(self._disaster_counts), size=int(disaster.sum()))
+            pick = (rng.random(name.size) * self._disaster_counts[name]).astype(np.int64)
+            weights[disaster] = self._disaster_weights[self._disaster_rows[name, pick]]
+            hit_rows = rows[disaster]
+            units.population_growth_rate[hit_rows] -= rng.uniform(*events.DISASTER_GROWTH_HIT, (hit_rows.size, n_units)) * weights[disaster]
+        boom = rows[kind == events.EVENT_TYPES.index("economic_boom")]
+        if boom.size:
+            units.population_growth_rate[boom] += rng.uniform(*events.BOOM_GROWTH_GAIN, (boom.size, n_units))
+
+        shock = effect[:, None] * weights * rng.uniform(*events.SHOCK_NOISE, (k, n_units))
+        units.approval[rows] = np.clip(units.approval[rows] + shock, 0.0, 100.0)
+        self._update_global_approval(rows)
+        self._check_elections(rows)
+
+
+# Election states of the interactive game -> days since the election was called
+ELECTION_STATE_DAYS = {None: -1, 'triggered': 0, 'attack_phase': 1, 'voting_day': 2}
+
+def game_snapshot(sim):
+    """Picklable copy of an interactive Simulation's state for BatchSimulation.load_snapshot."""
+    return {
+        'state': np.stack([getattr(sim.units, field) for field in FIELDS]),
+        'skills': {name: getattr(sim.pm, name) for name in SKILLS},
+        'attack_skills': np.array([rival.attack_skill for rival in sim.rivals][:N_RIVALS]),
+        'election_day': ELECTION_STATE_DAYS[sim.election_in_progress],
+        'running': sim.running,
+        'score_sum': float(sum(sim.approval_history)),
+        'days': len(sim.approval_history) - 1,
+        'params': sim.params,
+    }
@@ -0,0 +1,396 @@
+# pmsim/benchmarks.py
+"""Benchmark suite for the simulation hot paths.
+
+Every benchmark runs once per case: a map scale (prefecture: 47 units, municipality:
+about 1,700 units) crossed with a game length (days of approval history already
+played). The groups are:
+
+* ``engine``: Simulation.__init__, advance_day, skip_year, make_policy for every
+  policy type, random_event, the election phases (check_for_election triggering,
+  handle_election_attacks, handle_election_voting), get_prefecture_data, and
+  save/load through pmsim.saves
+* ``game``: a whole seeded game (one term of daily play)
+* ``batch``: BatchSimulation.step_day for BATCH_GAMES games, once per available
+  backend (see pmsim.kernels), so the NumPy and compiled paths are listed side by side
+* ``gui``: the GUI data paths (PrefectureTab.populate_tree, RegionAnalysisTab.update_chart,
+  PrefectureMapTab.draw_map, JapanPMSimulatorApp.create_approval_graph) rendered with
+  matplotlib's offscreen Agg backend, with stand-ins for the Tk widgets. Only this
+  group imports simulator (and with it tkinter).
+* ``memory``: the footprint of one Simulation per case: bytes held by a loaded copy
+  (traced with tracemalloc over FOOTPRINT_COPIES copies, as ensemble workers or undo
+  buffers would hold them) and its pickled size. Each is checked against a target
+  (FOOTPRINT_TARGETS per scale plus FOOTPRINT_BYTES_PER_DAY of history).
+
+Cases are prepared by playing the game day by day with elections switched off
+(election_threshold 0), so advance_day and skip_year measure ordinary days; the
+election benchmarks put the game into each phase directly. Benchmarks that change
+the game run on a fresh copy for every sample (the copy is not timed).
+
+A sample times one call, with the garbage collector paused. Each benchmark takes
+samples until it has at least min_samples of them and min_time seconds of timed
+calls, and reports min, median, mean, p95 and standard deviation in seconds. Run as::
+
+    python -m pmsim.benchmarks [--group engine] [--filter advance] [--out bench.json]
+                               [--baseline base.json] [--save-baseline base.json]
+
+With --baseline, every benchmark's median is compared with the stored one; ratios
+above --tolerance are reported as regressions (exit status 1), as are footprints over
+their target.
+"""
+import argparse
+import gc
+import json
+import os
+import pickle
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from pmsim import geography, kernels, saves
+from pmsim.batch import BatchSimulation
+from pmsim.engine import Simulation
+from pmsim.params import DEFAULT_PARAMS
+from pmsim.policies import POLICY_TYPES
+
+GROUPS = ('engine', 'game', 'batch', 'gui', 'memory')
+HEADLESS_GROUPS = ('engine', 'game', 'batch', 'memory') # No tkinter import
+SCALES = ('prefecture', 'municipality')
+HISTORY_DAYS = (0, 365, 1460) # Game lengths: fresh, one year, one term
+GAME_DAYS = 4 * 365
+DEFAULT_MIN_TIME = 0.2 # Seconds of timed calls per benchmark
+DEFAULT_MIN_SAMPLES = 5
+MAX_SAMPLES = 2000
+DEFAULT_TOLERANCE = 1.25 # Median ratio above which a benchmark counts as regressed
+SEED = 0
+BATCH_GAMES = 64
+NO_ELECTIONS = DEFAULT_PARAMS.replace({'election_threshold': 0.0})
+FOOTPRINT_COPIES = 20 # Loaded copies per footprint measurement
+FOOTPRINT_TARGETS = {'prefecture': 72_000, 'municipality': 800_000} # Bytes per fresh Simulation
+FOOTPRINT_BYTES_PER_DAY = 100 # Allowance for each day of approval history
+
+
+# --- Cases ---
+class Case:
+    """A prepared game (scale, days played) that benchmarks copy or read."""
+    def __init__(self, scale, days, directory):
+        self.scale, self.days = scale, days
+        self.label = f"{scale},{days}d"
+        self.save_path = os.path.join(directory, f"{scale}_{days}.pkl")
+        self.sim = Simulation(seed=SEED, scale=scale, params=NO_ELECTIONS)
+        for _ in range(days): self.sim.advance_day()
+        self._blob = pickle.dumps(self.sim, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def copy(self):
+        return pickle.loads(self._blob)
+
+
+class Benchmark:
+    """name, group, setup(case) -> state (untimed) and run(state) (timed).
+
+    per_days=False benchmarks do not depend on the game length and run once per scale."""
+    def __init__(self, group, name, run, setup=None, per_days=True):
+        self.group, self.name, self.run, self.setup, self.per_days = group, name, run, setup, per_days
+
+BENCHMARKS = []
+
+def benchmark(group, name, setup=None, per_days=True):
+    def add(run):
+        BENCHMARKS.append(Benchmark(group, name, run, setup, per_days))
+        return run
+    return add
+
+
+# --- Engine ---
+def _copy(case): return case.copy()
+def _shared(case): return case.sim
+
+@benchmark('engine', 'Simulation.__init__', setup=lambda case: case.scale, per_days=False)
+def _init(scale): Simulation(seed=SEED, scale=scale)
+
+@benchmark('engine', 'advance_day', setup=_copy)
+def _advance_day(sim): sim.advance_day()
+
+@benchmark('engine', 'skip_year', setup=_copy)
+def _skip_year(sim): sim.skip_year()
+
+def _make_policy(policy_type):
+    benchmark('engine', f'make_policy[{policy_type}]', setup=_copy)(lambda sim: sim.make_policy(policy_type))
+for _policy_type in POLICY_TYPES: _make_policy(_policy_type)
+
+@benchmark('engine', 'random_event', setup=_copy)
+def _random_event(sim): sim.random_event()
+
+def _below_threshold(case):
+    sim = case.copy()
+    sim.params = DEFAULT_PARAMS.replace({'election_threshold': 101.0}) # Always triggers
+    return sim
+
+@benchmark('engine', 'check_for_election', setup=_below_threshold)
+def _check_for_election(sim): sim.check_for_election()
+
+def _attack_phase(case):
+    sim = case.copy()
+    sim.election_in_progress = 'attack_phase'
+    return sim
+
+@benchmark('engine', 'handle_election_attacks', setup=_attack_phase)
+def _attacks(sim): sim.handle_election_attacks()
+
+def _voting_day(case):
+    sim = case.copy()
+    sim.election_in_progress = 'voting_day'
+    return sim
+
+@benchmark('engine', 'handle_election_voting', setup=_voting_day)
+def _voting(sim): sim.handle_election_voting()
+
+@benchmark('engine', 'get_prefecture_data', setup=_shared)
+def _prefecture_data(sim): sim.get_prefecture_data()
+
+@benchmark('engine', 'save', setup=lambda case: (case.save_path, case.sim))
+def _save(state): saves.write(*state)
+
+def _saved(case):
+    saves.write(case.save_path, case.sim)
+    return case.save_path
+
+@benchmark('engine', 'load', setup=_saved)
+def _load(path): saves.load(path)
+
+
+# --- Whole games ---
+@benchmark('game', 'play_term', setup=lambda case: case.scale, per_days=False)
+def _play_term(scale):
+    from pmsim.cli import play
+    play(SEED, GAME_DAYS, options={'scale': scale})
+
+
+# --- Batch engine ---
+_batches = {} # (scale, backend) -> BatchSimulation, stepped on by every sample
+
+def _step_day(backend):
+    def setup(case):
+        key = (case.scale, backend)
+        if key not in _batches:
+            batch = _batches[key] = BatchSimulation(case.sim.dataset, BATCH_GAMES, seed=SEED, backend=backend)
+            batch.step_day() # Compiles the kernel (numba) before anything is timed
+        return _batches[key]
+    benchmark('batch', f'step_day[{backend}]', setup=setup, per_days=False)(lambda batch: batch.step_day())
+for _backend in kernels.available_backends(): _step_day(_backend)
+
+
+# --- GUI data paths (offscreen) ---
+class _Widget:
+    """Stand-in for a Tk widget: every method is a no-op (ids for create_* calls)."""
+    def __init__(self):
+        self.calls = 0
+
+    def __getattr__(self, name):
+        def call(*args, **kwargs):
+            self.calls += 1
+            return self.calls
+        return call
+
+    def get_children(self): return ()
+    def winfo_children(self): return ()
+
+class _Var:
+    def __init__(self, value): self.value = value
+    def get(self): return self.value
+    def set(self, value): self.value = value
+
+_gui = None
+def _gui_module():
+    """simulator with the Agg backend and an offscreen FigureCanvasTkAgg."""
+    global _gui
+    if _gui is None:
+        import matplotlib
+        matplotlib.use('Agg')
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        import simulator
+
+        class OffscreenCanvas(FigureCanvasAgg):
+            def __init__(self, figure, master=None): super().__init__(figure)
+            def get_tk_widget(self): return _Widget()
+
+        simulator.FigureCanvasTkAgg = OffscreenCanvas
+        _gui = simulator
+    return _gui
+
+def _bare(cls, **attributes):
+    """Instance of a GUI class without running its Tk setup."""
+    instance = cls.__new__(cls)
+    instance.__dict__.update(attributes)
+    return instance
+
+def _prefecture_tab(case):
+    gui = _gui_module()
+    return _bare(gui.PrefectureTab, tree=_Widget(), sort_var=_Var("Approval Rating"), sort_asc_var=_Var(False),
+                 search_entry=_Var(""), prefecture_data=case.sim.get_prefecture_data())
+
+@benchmark('gui', 'populate_tree', setup=_prefecture_tab)
+def _populate_tree(tab): tab.populate_tree()
+
+def _region_tab(case):
+    gui = _gui_module()
+    fig = gui.plt.Figure(figsize=(9, 5), dpi=100)
+    return _bare(gui.RegionAnalysisTab, fig=fig, canvas=gui.FigureCanvasTkAgg(fig), display_var=_Var("Approval"),
+                 regions=geography.REGIONS, prefecture_data=case.sim.get_prefecture_data())
+
+@benchmark('gui', 'update_chart', setup=_region_tab)
+def _update_chart(tab): tab.update_chart()
+
+def _map_tab(case):
+    gui = _gui_module()
+    return _bare(gui.PrefectureMapTab, canvas=_Widget(), info_label=_Widget(), color_var=_Var("Approval"),
+                 prefecture_data=case.sim.get_prefecture_data())
+
+@benchmark('gui', 'draw_map', setup=_map_tab)
+def _draw_map(tab): tab.draw_map()
+
+def _app(case):
+    gui = _gui_module()
+    gui.plt.close('all') # create_approval_graph opens a new pyplot figure per call
+    return _bare(gui.JapanPMSimulatorApp, graph_frame=_Widget(), simulation=case.sim)
+
+@benchmark('gui', 'create_approval_graph', setup=_app)
+def _approval_graph(app): app.create_approval_graph()
+
+
+# --- Memory ---
+def footprint(case, copies=FOOTPRINT_COPIES):
+    """Bytes held by one loaded copy of the case's game, its pickled size and its target."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        sims = [case.copy() for _ in range(copies)]
+        used = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del sims
+    per_sim = used // copies
+    target = FOOTPRINT_TARGETS[case.scale] + FOOTPRINT_BYTES_PER_DAY * case.days
+    return {'bytes': per_sim, 'pickled': len(case._blob), 'target': target, 'over_target': per_sim > target}
+
+
+# --- Running ---
+def measure(run, setup, min_time=DEFAULT_MIN_TIME, min_samples=DEFAULT_MIN_SAMPLES):
+    """Per-call timings (seconds) of run(setup()), one call per sample."""
+    timings, total = [], 0.0
+    gc_was_enabled = gc.isenabled()
+    try:
+        while len(timings) < MAX_SAMPLES and (len(timings) < min_samples or total < min_time):
+            state = setup()
+            gc.disable()
+            start = time.perf_counter()
+            run(state)
+            elapsed = time.perf_counter() - start
+            if gc_was_enabled: gc.enable()
+            timings.append(elapsed); total += elapsed
+    finally:
+        if gc_was_enabled: gc.enable()
+    return timings
+
+def summarize(timings):
+    values = np.asarray(timings)
+    return {'samples': len(timings), 'min': float(values.min()), 'median': float(np.median(values)),
+            'mean': float(values.mean()), 'p95': float(np.percentile(values, 95)),
+            'stdev': float(statistics.stdev(timings)) if len(timings) > 1 else 0.0}
+
+def run_suite(groups=GROUPS, name_filter=None, scales=SCALES, history_days=HISTORY_DAYS,
+              min_time=DEFAULT_MIN_TIME, min_samples=DEFAULT_MIN_SAMPLES, progress=None):
+    """{"group/name[scale,days]": summary} for the selected benchmarks (footprint dicts for memory)."""
+    selected = [b for b in BENCHMARKS if b.group in groups and (not name_filter or name_filter in b.name)]
+    memory = 'memory' in groups and (not name_filter or name_filter in 'footprint')
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="pmsim-bench-") as directory:
+        for scale in scales:
+            for days in history_days:
+                todo = [b for b in selected if b.per_days or days == history_days[0]]
+                if not todo and not memory: continue
+                case = Case(scale, days, directory)
+                if memory:
+                    key = f"memory/footprint[{case.label}]"
+                    results[key] = footprint(case)
+                    if progress: progress(key, results[key])
+                for bench in todo:
+                    key = f"{bench.group}/{bench.name}[{case.label}]"
+                    setup = (lambda: bench.setup(case)) if bench.setup else (lambda: None)
+                    results[key] = summarize(measure(bench.run, setup, min_time, min_samples))
+                    if progress: progress(key, results[key])
+    return results
+
+def environment():
+    return {'python': platform.python_version(), 'implementation': platform.python_implementation(),
+            'numpy': np.__version__, 'machine': platform.machine(), 'system': platform.system(),
+            'cpus': os.cpu_count(), 'time': time.time()}
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """{key: {'median', 'baseline', 'ratio', 'regressed'}} for keys in both runs."""
+    comparison = {}
+    for key, summary in results.items():
+        if key not in baseline or 'median' not in summary: continue
+        ratio = summary['median'] / baseline[key]['median'] if baseline[key]['median'] > 0 else float('inf')
+        comparison[key] = {'median': summary['median'], 'baseline': baseline[key]['median'],
+                           'ratio': ratio, 'regressed': ratio > tolerance}
+    return comparison
+
+
+def _format_seconds(seconds):
+    for unit, scale in (('s', 1), ('ms', 1e-3), ('us', 1e-6)):
+        if seconds >= scale: return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.0f} ns"
+
+def main(argv=None, groups=GROUPS, prog="python -m pmsim.benchmarks"):
+    parser = argparse.ArgumentParser(prog=prog, description=__doc__.split('\n\n')[0])
+    parser.add_argument('--group', action='append', choices=groups, help="benchmark group (repeatable, default: all)")
+    parser.add_argument('--filter', default=None, help="only benchmarks whose name contains this text")
+    parser.add_argument('--scale', action='append', choices=SCALES, help="map scale (repeatable, default: all)")
+    parser.add_argument('--days', action='append', type=int, help="game length in days (repeatable)")
+    parser.add_argument('--min-time', type=float, default=DEFAULT_MIN_TIME)
+    parser.add_argument('--min-samples', type=int, default=DEFAULT_MIN_SAMPLES)
+    parser.add_argument('--out', default=None, help="results JSON (default: stdout)")
+    parser.add_argument('--baseline', default=None, help="compare with this stored results file")
+    parser.add_argument('--save-baseline', default=None, help="also store these results as a baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument('--quiet', action='store_true', help="no progress on stderr")
+    args = parser.parse_args(argv)
+
+    def progress(key, summary):
+        if args.quiet: return
+        if 'median' in summary: print(f"{_format_seconds(summary['median'])}  {key}", file=sys.stderr, flush=True)
+        else: print(f"{summary['bytes'] / 1024:8.1f} KB  {key} (target {summary['target'] / 1024:.1f} KB, "
+                    f"pickled {summary['pickled'] / 1024:.1f} KB)", file=sys.stderr, flush=True)
+
+    results = run_suite(tuple(args.group or groups), args.filter, tuple(args.scale or SCALES),
+                        tuple(args.days or HISTORY_DAYS), args.min_time, args.min_samples, progress)
+    report = {'environment': environment(), 'results': results}
+    regressed = [key for key, summary in results.items() if summary.get('over_target')]
+    for key in regressed: print(f"{key}: {results[key]['bytes']:,} bytes, over the {results[key]['target']:,} target",
+                                file=sys.stderr)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f: baseline = json.load(f)
+        report['baseline'] = {'path': args.baseline, 'environment': baseline.get('environment'),
+                              'tolerance': args.tolerance}
+        report['comparison'] = compare(results, baseline['results'], args.tolerance)
+        regressed += [key for key, row in report['comparison'].items() if row['regressed']]
+        for key, row in report['comparison'].items():
+            if not args.quiet or row['regressed']:
+                flag = "  REGRESSED" if row['regressed'] else ""
+                print(f"{row['ratio']:6.2f}x  {key}{flag}", file=sys.stderr)
+    text = json.dumps(report, indent=2) + '\n'
+    if args.out: saves.write_bytes(args.out, text.encode('utf-8'))
+    else: sys.stdout.write(text)
+    if args.save_baseline: saves.write_bytes(args.save_baseline, json.dumps(
+        {'environment': report['environment'], 'results': results}, indent=2).encode('utf-8'))
+    return 1 if regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
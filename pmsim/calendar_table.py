@@ -0,0 +1,67 @@
+# pmsim/calendar_table.py
+"""Precomputed game calendar: day ordinal <-> (year, month, day) lookup tables.
+
+Day 0 is 1 January of the epoch year (the game's start date). Advancing time is an
+integer increment and turning an ordinal into a display date is an array lookup, so
+the simulation never builds datetime objects while it runs.
+"""
+import datetime
+import numpy as np
+
+EPOCH_YEAR = 2025
+INITIAL_YEARS = 200 # Covers any realistic game; the table grows on demand beyond that
+
+
+class CalendarTable:
+    """Gregorian calendar table indexed by day ordinal since 1 January of epoch_year."""
+    def __init__(self, epoch_year=EPOCH_YEAR, years=INITIAL_YEARS):
+        self.epoch = datetime.date(epoch_year, 1, 1)
+        self._build(years)
+
+    def _build(self, years):
+        start = np.datetime64(self.epoch, 'D')
+        end = np.datetime64(datetime.date(self.epoch.year + years, 1, 1), 'D')
+        self.dates64 = np.arange(start, end, dtype='datetime64[D]')
+        month_starts = self.dates64.astype('datetime64[M]')
+        self.years = (month_starts.astype('datetime64[Y]').astype(np.int32) + 1970).astype(np.int16)
+        self.months = (month_starts.astype(np.int32) % 12 + 1).astype(np.int8)
+        self.days = ((self.dates64 - month_starts).astype(np.int32) + 1).astype(np.int8)
+        self.span_years = years
+
+    def __len__(self):
+        return len(self.dates64)
+
+    def ensure(self, ordinal):
+        """Grow the table (doubling) until ordinal is covered."""
+        years = self.span_years
+        while ordinal >= len(self):
+            years *= 2
+            self._build(years)
+
+    # --- Lookups ---
+    def ymd(self, ordinal):
+        """(year, month, day) of a day ordinal."""
+        self.ensure(ordinal)
+        return int(self.years[ordinal]), int(self.months[ordinal]), int(self.days[ordinal])
+
+    def ordinal(self, year, month, day):
+        """Day ordinal of a calendar date (raises ValueError for invalid dates)."""
+        ordinal = datetime.date(year, month, day).toordinal() - self.epoch.toordinal()
+        if ordinal < 0: raise ValueError(f"{year}-{month:02d}-{day:02d} is before the calendar epoch")
+        return ordinal
+
+    def to_datetime64(self, ordinals):
+        """Vectorized conversion of ordinals to numpy datetime64 (for plotting)."""
+        ordinals = np.asarray(ordinals, dtype=np.int64)
+        if ordinals.size: self.ensure(int(ordinals.max()))
+        return self.dates64[ordinals]
+
+    def to_date(self, ordinal):
+        return self.epoch + datetime.timedelta(days=int(ordinal))
+
+    def isoformat(self, ordinal):
+        year, month, day = self.ymd(ordinal)
+        return f"{year:04d}-{month:02d}-{day:02d}"
+
+
+CALENDAR = CalendarTable()
@@ -0,0 +1,94 @@
+# pmsim/changes.py
+"""Change notifications from a Simulation to the views that display it.
+
+The engine publishes what it changed, without knowing who is watching:
+
+* ``date``     the calendar moved
+* ``history``  a point was added to the approval history
+* ``approval`` global approval may have changed
+* ``units``    unit metrics changed; the Change lists the fields and a prefecture row
+               mask (None means every row)
+* ``events``   entries were added to the events log
+* ``election`` the election state changed
+* ``running``  the game ended
+
+Publishing only records the change. Changes are merged until the owner of the event
+loop calls flush() (the GUI does so once per frame), and each subscriber then gets one
+call with the merged changes of the topics it asked for. A day that moves
+the calendar, drifts every metric and logs two events therefore costs one redraw of
+each affected widget, not one per mutation. With no subscribers, for example in
+headless runs, publish() returns after a single check.
+
+Subscribers are UI callbacks, so they are not saved: a pickled bus loads empty.
+"""
+import numpy as np
+
+TOPICS = ('date', 'history', 'approval', 'units', 'events', 'election', 'running')
+
+
+class Change:
+    """Merged publications of one topic since the last flush."""
+    __slots__ = ('count', 'fields', 'mask')
+
+    def __init__(self, fields=(), mask=None):
+        self.count = 1
+        self.fields = set(fields)
+        self.mask = mask
+
+    def merge(self, fields=(), mask=None):
+        self.count += 1
+        self.fields.update(fields)
+        if self.mask is not None: self.mask = None if mask is None else np.logical_or(self.mask, mask)
+
+    def __repr__(self):
+        rows = "all" if self.mask is None else int(np.count_nonzero(self.mask))
+        return f"Change(count={self.count}, fields={sorted(self.fields)}, rows={rows})"
+
+
+class ChangeBus:
+    """Coalescing publish/subscribe of Simulation changes (see the module docstring)."""
+    def __init__(self):
+        self._subscribers = [] # (callback, topics or None for all)
+        self._pending = {}
+
+    def __reduce__(self):
+        return (ChangeBus, ()) # Subscribers belong to the running UI, never to a save
+
+    def subscribe(self, callback, topics=None):
+        """Call callback({topic: Change}) on flush when any of topics (default: all) changed.
+
+        Subscribing a callback again replaces its earlier subscription."""
+        if topics is not None:
+            unknown = set(topics) - set(TOPICS)
+            if unknown: raise ValueError(f"Unknown topics {sorted(unknown)}, expected some of {TOPICS}")
+            topics = frozenset(topics)
+        self.unsubscribe(callback)
+        self._subscribers.append((callback, topics))
+        return callback
+
+    def unsubscribe(self, callback):
+        self._subscribers = [(other, topics) for other, topics in self._subscribers if other != callback]
+
+    def publish(self, topic, fields=(), mask=None):
+        if not self._subscribers: return
+        change = self._pending.get(topic)
+        if change is None: self._pending[topic] = Change(fields, mask)
+        else: change.merge(fields, mask)
+
+    def pending(self):
+        """Topics with unflushed changes."""
+        return set(self._pending)
+
+    def clear(self):
+        """Drop pending changes (after a view has redrawn everything anyway)."""
+        self._pending = {}
+
+    def flush(self):
+        """Deliver the merged changes to the subscribers; returns them ({topic: Change})."""
+        changes, self._pending = self._pending, {}
+        if not changes: return changes
+        for callback, topics in list(self._subscribers):
+            relevant = changes if topics is None else {topic: change for topic, change in changes.items()
+                                                       if topic in topics}
+            if relevant: callback(relevant)
+        return changes
@@ -0,0 +1,334 @@
+# pmsim/cli.py
+"""Headless command line for the game engine (never imports the Tk GUI).
+
+    python -m pmsim run      [--seed S] [--days D] [--strategy NAME|script.py] [--out result.json]
+                             [--save game.pkl] [--log actions.json]
+    python -m pmsim ensemble --seeds 0:1000 [--workers N] [--out results.jsonl] [--save-dir DIR]
+                             [--trajectories approval.npy]
+    python -m pmsim replay   actions.json [--out result.json]
+    python -m pmsim bench    [--group engine] [--out bench.json] [--baseline base.json]
+    python -m pmsim export   SAVES_OR_DIRS... --out DIR   (see pmsim.export)
+
+Games are full Simulation games driven by a strategy (see pmsim.strategies; a script
+path loads a strategy file). A game is reproducible from its seed, which seeds both
+of the game's generators (NumPy and random.Random). Results are JSON (JSONL for ensembles)
+written to --out or stdout. Progress and engine events (--log-level) go to stderr,
+so stdout carries only results; --profile and --trace dump the instrumentation
+counters (see pmsim.instrument).
+
+Ensemble workers write each game's figures (and, with --trajectories, its daily
+approval) into shared memory indexed by run (see pmsim.results). Only the game's
+names and end reason come back through the pool. The parent reads the figures from
+zero-copy views, so its progress lines show the mean score and the share still in
+office so far.
+"""
+import argparse
+import concurrent.futures
+import contextlib
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from pmsim import instrument, saves, strategies
+from pmsim.calendar_table import CALENDAR
+from pmsim.engine import SCALES, Simulation
+from pmsim.env import ACTIONS
+from pmsim.params import DEFAULT_PARAMS
+from pmsim.results import SharedResults
+
+DEFAULT_DAYS = 4 * 365
+LOG_VERSION = 1
+# Per-game figures of an ensemble, kept in shared memory (start and end are day ordinals)
+SUMMARY_COLUMNS = {'seed': (np.int64, ()), 'days': (np.int32, ()), 'running': (np.bool_, ()),
+                   'approval': (np.float64, ()), 'score': (np.float64, ()), 'events': (np.int32, ()),
+                   'start': (np.int32, ()), 'end': (np.int32, ())}
+LABELS = ('game_id', 'pm_name', 'party_name', 'cause', 'reason', 'save') # Returned by the workers
+
+
+# --- Playing games ---
+def game_options(args):
+    """Simulation keyword arguments shared by every game of a command."""
+    return {'scale': args.scale, 'election_level': args.election_level, 'dataset': args.dataset,
+            'params': parse_params(args.param)}
+
+def parse_params(assignments):
+    values = {}
+    for assignment in assignments or ():
+        name, sep, value = assignment.partition('=')
+        if not sep: raise ValueError(f"Expected NAME=VALUE, got '{assignment}'")
+        values[name.strip()] = float(value)
+    return DEFAULT_PARAMS.replace(values) if values else DEFAULT_PARAMS
+
+def play(seed, days, strategy=None, actions=None, options=None):
+    """Play one game for up to days days; returns (sim, action log).
+
+    Each day the strategy (or, when replaying, the logged actions, a {day: action}
+    dict) picks an action before the day is advanced. The log lists [day, action]
+    for every policy actually made."""
+    sim = Simulation(seed=seed, **(options or {}))
+    view, log = strategies.GameView(sim), []
+    for day in range(days):
+        if not sim.running: break
+        if actions is not None: action = actions.get(day, 'wait')
+        else: action = ACTIONS[int(strategy(view)[0])] if strategy is not None else 'wait'
+        if action != 'wait' and sim.election_in_progress is None:
+            sim.make_policy(action)
+            log.append([day, action])
+        sim.advance_day()
+    return sim, log
+
+def game_result(sim, seed):
+    return {'seed': seed, 'game_id': sim.game_id, 'pm_name': sim.pm_name, 'party_name': sim.party_name,
+            'start_date': CALENDAR.isoformat(sim.approval_ordinals[0]), 'end_date': CALENDAR.isoformat(sim.tick),
+            'days': len(sim.approval_history) - 1, 'running': sim.running,
+            'cause': sim.game_over_cause, 'reason': sim.game_over_reason,
+            'approval': float(sim.pm.global_approval), 'score': float(sim.calculate_final_score()),
+            'events': len(sim.events)}
+
+_loaded = {}
+def _strategy(spec):
+    """Loaded strategy for spec, once per process (worker processes load their own)."""
+    if spec not in _loaded: _loaded[spec] = strategies.load(spec)
+    return _loaded[spec]
+
+def ensemble_layout(days, trajectories=False):
+    """SharedResults layout of an ensemble: SUMMARY_COLUMNS, plus the approval history if asked."""
+    return {**SUMMARY_COLUMNS, **({'trajectory': (np.float64, (days + 1,))} if trajectories else {})}
+
+_results = None # The ensemble's SharedResults in this process
+
+def _attach_results(handle):
+    global _results
+    _results = SharedResults.attach(handle)
+
+def _play_one(run, seed, days, spec, options, save_dir):
+    """Play run's game into _results; returns its labels (LABELS)."""
+    with contextlib.redirect_stdout(sys.stderr): # Engine messages are not results
+        sim, _ = play(seed, days, _strategy(spec), options=options)
+    result = game_result(sim, seed)
+    if save_dir:
+        result['save'] = os.path.join(save_dir, f"game_{seed}.pkl")
+        saves.write(result['save'], sim)
+    row = {name: result[name] for name in ('seed', 'days', 'running', 'approval', 'score', 'events')}
+    row.update(start=sim.approval_ordinals[0], end=sim.tick)
+    if 'trajectory' in _results.arrays:
+        history = sim.approval_history[:days + 1]
+        _results['trajectory'][run, :len(history)] = history
+        _results['trajectory'][run, len(history):] = np.nan # Days after the game ended
+    _results.write(run, row)
+    return {name: result[name] for name in LABELS if name in result}
+
+def ensemble_result(results, run, labels):
+    """Result dict of run (as game_result) from its shared figures and its labels."""
+    figures = {name: results[name][run].item() for name in SUMMARY_COLUMNS}
+    result = {'seed': figures['seed'], 'game_id': labels['game_id'], 'pm_name': labels['pm_name'],
+              'party_name': labels['party_name'], 'start_date': CALENDAR.isoformat(figures['start']),
+              'end_date': CALENDAR.isoformat(figures['end']), 'days': figures['days'], 'running': figures['running'],
+              'cause': labels['cause'], 'reason': labels['reason'], 'approval': figures['approval'],
+              'score': figures['score'], 'events': figures['events']}
+    if 'save' in labels: result['save'] = labels['save']
+    return result
+
+def ensemble_progress(results):
+    """Summary of the games finished so far, read from the shared views."""
+    scores = results.finished('score')
+    if not scores.size: return ""
+    return f", mean score {scores.mean():.1f}, {results.finished('running').mean():.0%} in office"
+
+
+# --- Output ---
+def parse_seeds(text):
+    """"7" (seeds 0..6), "0:100" (half-open range) or "1,5,9" ("7," is seed 7 alone)."""
+    if ':' in text:
+        start, stop = text.split(':', 1)
+        return list(range(int(start), int(stop)))
+    if ',' not in text: return list(range(int(text)))
+    return [int(seed) for seed in text.split(',') if seed.strip()]
+
+@contextlib.contextmanager
+def _output(path):
+    if path in (None, '-'):
+        yield sys.stdout
+        return
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f: yield f
+
+def _write_json(path, value):
+    with _output(path) as f:
+        json.dump(value, f, indent=2)
+        f.write('\n')
+
+class Progress:
+    """Throttled "label done/total" lines on stderr."""
+    def __init__(self, label, total, quiet=False, interval=1.0):
+        self.label, self.total, self.quiet, self.interval = label, total, quiet, interval
+        self.start = self.last = time.perf_counter()
+
+    def __call__(self, done, detail=None):
+        """Report done; detail() (called only when a line is printed) is appended to it."""
+        now = time.perf_counter()
+        if self.quiet or (now - self.last < self.interval and done < self.total): return
+        self.last = now
+        extra = detail() if detail is not None else ""
+        print(f"{self.label}: {done}/{self.total} ({now - self.start:.1f}s){extra}", file=sys.stderr, flush=True)
+
+
+# --- Commands ---
+def cmd_run(args):
+    options = game_options(args)
+    with contextlib.redirect_stdout(sys.stderr):
+        sim, log = play(args.seed, args.days, strategies.load(args.strategy), options=options)
+    result = game_result(sim, args.seed)
+    if args.save:
+        saves.write(args.save, sim); result['save'] = args.save
+    if args.log:
+        _write_json(args.log, {'version': LOG_VERSION, 'seed': args.seed, 'days': args.days,
+                               'strategy': args.strategy, 'options': {**options, 'params': options['params'].overrides()},
+                               'actions': log, 'score': result['score']})
+    _write_json(args.out, result)
+    return 0
+
+def cmd_ensemble(args):
+    global _results
+    seeds = parse_seeds(args.seeds)
+    options = game_options(args)
+    strategies.load(args.strategy) # Fail early on a bad name or script
+    if args.save_dir: os.makedirs(args.save_dir, exist_ok=True)
+    progress = Progress("ensemble", len(seeds), args.quiet)
+    workers = (os.cpu_count() or 1) if args.workers is None else args.workers
+    with SharedResults(ensemble_layout(args.days, bool(args.trajectories)), len(seeds)) as results, \
+            _output(args.out) as f:
+        def finish(done, run, labels):
+            f.write(json.dumps(ensemble_result(results, run, labels)) + '\n')
+            progress(done, lambda: ensemble_progress(results))
+
+        if workers <= 1:
+            _results = results
+            try:
+                for run, seed in enumerate(seeds):
+                    finish(run + 1, run, _play_one(run, seed, args.days, args.strategy, options, args.save_dir))
+            finally:
+                _results = None
+        else:
+            with concurrent.futures.ProcessPoolExecutor(min(workers, len(seeds)), initializer=_attach_results,
+                                                        initargs=(results.handle(),)) as pool:
+                futures = {pool.submit(_play_one, run, seed, args.days, args.strategy, options, args.save_dir): run
+                           for run, seed in enumerate(seeds)}
+                for done, future in enumerate(concurrent.futures.as_completed(futures), 1):
+                    finish(done, futures[future], future.result())
+        if args.trajectories: np.save(args.trajectories, results['trajectory'])
+    return 0
+
+def cmd_replay(args):
+    with open(args.log, encoding='utf-8') as f: log = json.load(f)
+    if log.get('version') != LOG_VERSION: raise ValueError(f"{args.log}: unsupported action log version")
+    options = dict(log['options'], params=DEFAULT_PARAMS.replace(log['options']['params']))
+    actions = {day: action for day, action in log['actions']}
+    with contextlib.redirect_stdout(sys.stderr):
+        sim, _ = play(log['seed'], log['days'], actions=actions, options=options)
+    result = game_result(sim, log['seed'])
+    result['matches'] = abs(result['score'] - log['score']) < 1e-9
+    _write_json(args.out, result)
+    if not result['matches']:
+        print(f"Replay diverged: score {result['score']:.6f}, logged {log['score']:.6f}", file=sys.stderr)
+        return 1
+    return 0
+
+def cmd_bench(args):
+    from pmsim import benchmarks
+    return benchmarks.main(args.args, groups=benchmarks.HEADLESS_GROUPS, prog="python -m pmsim bench")
+
+def cmd_export(args):
+    from pmsim import export
+    return export.main(args.args)
+
+
+def _add_game_arguments(parser, seed=True):
+    if seed: parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--days', type=int, default=DEFAULT_DAYS, help="horizon in days (default: one term)")
+    parser.add_argument('--strategy', default='wait', help="registered strategy name or script.py[:NAME]")
+    parser.add_argument('--scale', choices=SCALES, default='prefecture')
+    parser.add_argument('--election-level', choices=SCALES, default='prefecture')
+    parser.add_argument('--dataset', default=None, help="JSON/CSV scenario file (default: built-in map)")
+    parser.add_argument('--param', action='append', metavar='NAME=VALUE', help="override a balance parameter")
+    parser.add_argument('--out', default=None, help="result file (default: stdout)")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m pmsim", description=__doc__.split('\n\n')[0])
+    parser.add_argument('--quiet', action='store_true', help="no progress on stderr")
+    parser.add_argument('--log-level', choices=instrument.LEVELS, help="print engine events at this level to stderr")
+    parser.add_argument('--profile', help="write timing counters (JSON) for games played in this process")
+    parser.add_argument('--trace', help="write a Chrome trace of games played in this process")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="play one game")
+    _add_game_arguments(run)
+    run.add_argument('--save', help="also write the finished game as a save file")
+    run.add_argument('--log', help="write the action log (for replay)")
+    run.set_defaults(handler=cmd_run)
+
+    ensemble = commands.add_parser('ensemble', help="play many seeded games in parallel (JSONL results)")
+    _add_game_arguments(ensemble, seed=False)
+    ensemble.add_argument('--seeds', default='0:100', help="N (seeds 0..N-1), START:STOP or a,b,c")
+    ensemble.add_argument('--workers', type=int, default=None, help="processes (default: all cores)")
+    ensemble.add_argument('--save-dir', help="write every finished game as a save file here")
+    ensemble.add_argument('--trajectories', help="write the daily approval of every game (.npy, games x days + 1, "
+                                                 "NaN after a game ended)")
+    ensemble.set_defaults(handler=cmd_ensemble)
+
+    replay = commands.add_parser('replay', help="re-play an action log and check the score")
+    replay.add_argument('log')
+    replay.add_argument('--out', default=None)
+    replay.set_defaults(handler=cmd_replay)
+
+    bench = commands.add_parser('bench', help="benchmark suite without the GUI group (see pmsim.benchmarks)",
+                                add_help=False)
+    bench.add_argument('args', nargs=argparse.REMAINDER)
+    bench.set_defaults(handler=cmd_bench)
+
+    export = commands.add_parser('export', help="export saves or the game history (see pmsim.export)",
+                                 add_help=False)
+    export.add_argument('args', nargs=argparse.REMAINDER)
+    export.set_defaults(handler=cmd_export)
+    return parser
+
+PASSTHROUGH = ('bench', 'export') # Commands whose arguments belong to another parser
+GLOBAL_VALUE_OPTIONS = ('--log-level', '--profile', '--trace') # Global options followed by a value
+
+def _command_index(argv):
+    """Index of the subcommand in argv (skipping global options and their values), or None."""
+    i = 0
+    while i < len(argv):
+        if argv[i] in GLOBAL_VALUE_OPTIONS: i += 2
+        elif argv[i].startswith('-'): i += 1
+        else: return i
+    return None
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    parser = build_parser()
+    command = _command_index(argv)
+    if command is not None and argv[command] in PASSTHROUGH:
+        # argparse.REMAINDER drops leading options, so hand the rest over untouched
+        args = parser.parse_args(argv[:command + 1])
+        args.args = argv[command + 1:]
+    else:
+        args = parser.parse_args(argv)
+    if args.log_level: instrument.set_level(args.log_level, echo=True)
+    if args.profile or args.trace: instrument.enable(trace=bool(args.trace))
+    try:
+        return args.handler(args)
+    except (OSError, ValueError, KeyError, saves.SaveError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        if args.profile: instrument.dump_json(args.profile)
+        if args.trace: instrument.dump_chrome_trace(args.trace)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,279 @@
+# pmsim/datasets.py
+"""Scenario datasets: units, their prefecture/region membership, stats and adjacency.
+
+A dataset file is JSON or CSV. It is parsed and validated once, then stored as an
+uncompressed ``.npz`` cache named after the SHA-256 of the source bytes. Later loads
+of the same content read the arrays back directly and skip parsing and validation;
+any edit to the source changes the hash and so invalidates the cache.
+
+JSON layout::
+
+    {"name": "...",
+     "units": [{"name": "Tokyo", "prefecture": "Tokyo", "region": "Kanto",
+                "population": 14038167, "gdp": 1000, "growth_rate": 0.4}, ...],
+     "adjacency": [["Tokyo", "Kanagawa"], ...]}
+
+CSV layout: one row per unit with the header ``name,prefecture,region,population,gdp,
+growth_rate`` (``prefecture`` may be left out or blank for prefecture-level data), and
+an optional ``<stem>.adjacency.csv`` beside it with the header ``a,b``.
+"""
+import csv
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+
+from pmsim import instrument
+from pmsim.geography import AdjacencyGraph
+from pmsim.hierarchy import Hierarchy
+
+CACHE_VERSION = 1 # Bump when the cached array layout changes
+CACHE_DIR = os.environ.get('PMSIM_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'pmsim', 'datasets'))
+UNIT_COLUMNS = ('name', 'prefecture', 'region', 'population', 'gdp', 'growth_rate')
+
+
+class DatasetError(ValueError):
+    """Raised when a dataset file is malformed or inconsistent."""
+
+
+class Dataset:
+    """Validated scenario data. Units are ordered so each prefecture is one contiguous block."""
+    ARRAYS = ('unit_names', 'unit_prefecture', 'prefecture_names', 'prefecture_region', 'region_names',
+              'population', 'gdp', 'growth_rate', 'edges')
+
+    def __init__(self, name, unit_names, unit_prefecture, prefecture_names, prefecture_region, region_names,
+                 population, gdp, growth_rate, edges):
+        self.name = name
+        self.unit_names = list(unit_names)
+        self.unit_prefecture = np.asarray(unit_prefecture, dtype=np.int64)
+        self.prefecture_names = list(prefecture_names)
+        self.prefecture_region = np.asarray(prefecture_region, dtype=np.int64)
+        self.region_names = list(region_names)
+        self.population = np.asarray(population, dtype=float)
+        self.gdp = np.asarray(gdp, dtype=float)
+        self.growth_rate = np.asarray(growth_rate, dtype=float)
+        self.edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2) # Unit index pairs
+        self._graph = None
+
+    @classmethod
+    def from_records(cls, name, records, adjacency=()):
+        """Build and validate a dataset from unit dicts (keys as in UNIT_COLUMNS) and name pairs."""
+        records = list(records)
+        if not records: raise DatasetError(f"{name}: dataset has no units")
+        try:
+            names = [str(r['name']).strip() for r in records]
+            prefectures = [str(r.get('prefecture') or r['name']).strip() for r in records]
+            regions = [str(r['region']).strip() for r in records]
+            population = [float(r['population']) for r in records]
+            gdp = [float(r['gdp']) for r in records]
+            growth_rate = [float(r['growth_rate']) for r in records]
+        except KeyError as e:
+            raise DatasetError(f"{name}: unit record is missing column {e}") from None
+        except (TypeError, ValueError) as e:
+            raise DatasetError(f"{name}: bad numeric value ({e})") from None
+
+        prefecture_names = list(dict.fromkeys(prefectures)) # First-appearance order
+        region_names = list(dict.fromkeys(regions))
+        prefecture_index = {p: i for i, p in enumerate(prefecture_names)}
+        region_of = {}
+        for unit, prefecture, region in zip(names, prefectures, regions):
+            if region_of.setdefault(prefecture, region) != region:
+                raise DatasetError(f"{name}: {unit} puts {prefecture} in {region}, "
+                                   f"but it is already in {region_of[prefecture]}")
+
+        # Group units by prefecture (stable, so the file order is kept within a prefecture)
+        unit_prefecture = np.array([prefecture_index[p] for p in prefectures], dtype=np.int64)
+        order = np.argsort(unit_prefecture, kind='stable')
+        unit_names = [names[i] for i in order]
+        unit_index = {unit: i for i, unit in enumerate(unit_names)}
+        if len(unit_index) != len(unit_names):
+            duplicates = sorted({n for n in unit_names if unit_names.count(n) > 1})
+            raise DatasetError(f"{name}: duplicate unit names {duplicates[:5]}")
+        edges = []
+        for pair in adjacency:
+            if len(pair) != 2: raise DatasetError(f"{name}: adjacency entry {pair!r} is not a pair")
+            a, b = (str(v).strip() for v in pair)
+            if a not in unit_index or b not in unit_index:
+                raise DatasetError(f"{name}: adjacency {a!r}-{b!r} names an unknown unit")
+            edges.append((unit_index[a], unit_index[b]))
+
+        dataset = cls(name, unit_names, unit_prefecture[order], prefecture_names,
+                      [region_names.index(region_of[p]) for p in prefecture_names], region_names,
+                      np.array(population)[order], np.array(gdp)[order], np.array(growth_rate)[order], edges)
+        dataset.validate()
+        return dataset
+
+    def validate(self):
+        """Check value ranges and internal consistency; raises DatasetError."""
+        n_units = len(self.unit_names)
+        for field in ('unit_prefecture', 'population', 'gdp', 'growth_rate'):
+            if getattr(self, field).shape != (n_units,):
+                raise DatasetError(f"{self.name}: {field} has {getattr(self, field).size} entries, expected {n_units}")
+        if not np.all(np.isfinite(self.population)) or np.any(self.population <= 0):
+            raise DatasetError(f"{self.name}: populations must be positive numbers")
+        if not np.all(np.isfinite(self.gdp)) or np.any(self.gdp < 0):
+            raise DatasetError(f"{self.name}: GDP values must be non-negative numbers")
+        if not np.all(np.isfinite(self.growth_rate)):
+            raise DatasetError(f"{self.name}: growth rates must be finite")
+        if np.any((self.edges < 0) | (self.edges >= n_units)):
+            raise DatasetError(f"{self.name}: adjacency refers to a unit index out of range")
+        if np.any(self.edges[:, 0] == self.edges[:, 1]):
+            raise DatasetError(f"{self.name}: a unit cannot border itself")
+        if np.any((self.prefecture_region < 0) | (self.prefecture_region >= len(self.region_names))):
+            raise DatasetError(f"{self.name}: prefecture region index out of range")
+        try:
+            self.hierarchy()
+        except ValueError as e:
+            raise DatasetError(f"{self.name}: {e}") from None
+
+    # --- Views used by the simulation ---
+    @property
+    def n_units(self):
+        return len(self.unit_names)
+
+    @property
+    def is_prefecture_level(self):
+        return self.n_units == len(self.prefecture_names)
+
+    @property
+    def regions(self):
+        """{region: [prefecture names]} (same shape as geography.REGIONS)."""
+        regions = {region: [] for region in self.region_names}
+        for name, r in zip(self.prefecture_names, self.prefecture_region):
+            regions[self.region_names[r]].append(name)
+        return regions
+
+    def edge_names(self):
+        return [(self.unit_names[a], self.unit_names[b]) for a, b in self.edges]
+
+    def hierarchy(self):
+        return Hierarchy(self.unit_prefecture, self.prefecture_names, self.prefecture_region, self.region_names)
+
+    def groups(self):
+        """Names a shock can target: regions (and prefectures, below prefecture level) -> unit names."""
+        if self.is_prefecture_level: return self.regions
+        hierarchy = self.hierarchy()
+        groups = {name: self.unit_names[hierarchy.units_of(p)] for p, name in enumerate(self.prefecture_names)}
+        for region, members in self.regions.items():
+            groups[region] = [unit for name in members for unit in groups[name]]
+        return groups
+
+    def graph(self):
+        """Adjacency graph over the units (built once per dataset)."""
+        if self._graph is None:
+            self._graph = AdjacencyGraph(self.unit_names, self.edge_names(), self.groups())
+        return self._graph
+
+    def prefecture_level(self):
+        """Same scenario aggregated to one unit per prefecture (self if already so)."""
+        if self.is_prefecture_level: return self
+        hierarchy = self.hierarchy()
+        borders = self.unit_prefecture[self.edges]
+        borders = np.unique(np.sort(borders[borders[:, 0] != borders[:, 1]], axis=1), axis=0)
+        return Dataset(self.name, self.prefecture_names, np.arange(len(self.prefecture_names)),
+                       self.prefecture_names, self.prefecture_region, self.region_names,
+                       hierarchy.prefecture_sum(self.population), hierarchy.prefecture_sum(self.gdp),
+                       hierarchy.prefecture_mean(self.growth_rate, self.population), borders)
+
+    # --- Binary form ---
+    def to_arrays(self):
+        arrays = {field: getattr(self, field) for field in self.ARRAYS}
+        for field in ('unit_names', 'prefecture_names', 'region_names'):
+            arrays[field] = np.array(arrays[field], dtype=str)
+        arrays['name'] = np.array(self.name)
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        values = {field: arrays[field] for field in cls.ARRAYS}
+        for field in ('unit_names', 'prefecture_names', 'region_names'):
+            values[field] = values[field].tolist()
+        return cls(str(arrays['name']), **values)
+
+    def fingerprint(self):
+        """Content hash of the binary form (identifies the map in result caches)."""
+        arrays = self.to_arrays()
+        return content_hash(*(np.ascontiguousarray(arrays[key]).tobytes() for key in sorted(arrays)))
+
+    def to_records(self):
+        """Unit dicts in the JSON layout (round-trips through from_records)."""
+        return [{'name': name, 'prefecture': self.prefecture_names[p],
+                 'region': self.region_names[self.prefecture_region[p]],
+                 'population': float(pop), 'gdp': float(gdp), 'growth_rate': float(growth)}
+                for name, p, pop, gdp, growth in zip(self.unit_names, self.unit_prefecture,
+                                                     self.population, self.gdp, self.growth_rate)]
+
+
+# --- Parsing ---
+def _parse_json(name, data):
+    try:
+        document = json.loads(data)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise DatasetError(f"{name}: not valid JSON ({e})") from None
+    if not isinstance(document, dict) or 'units' not in document:
+        raise DatasetError(f"{name}: expected an object with a 'units' list")
+    return Dataset.from_records(document.get('name', name), document['units'], document.get('adjacency', ()))
+
+
+def _parse_csv(name, data, adjacency_data=None):
+    rows = list(csv.DictReader(io.StringIO(data.decode('utf-8-sig'))))
+    adjacency = []
+    if adjacency_data is not None:
+        adjacency = [(row['a'], row['b']) for row in csv.DictReader(io.StringIO(adjacency_data.decode('utf-8-sig')))]
+    return Dataset.from_records(name, rows, adjacency)
+
+
+def adjacency_path(path):
+    """Sibling adjacency file of a CSV dataset (<stem>.adjacency.csv)."""
+    return os.path.splitext(path)[0] + '.adjacency.csv'
+
+
+def content_hash(*parts):
+    digest = hashlib.sha256(f"pmsim-dataset-v{CACHE_VERSION}".encode())
+    for part in parts:
+        digest.update(len(part).to_bytes(8, 'little')); digest.update(part)
+    return digest.hexdigest()
+
+
+def load(path, cache_dir=None, use_cache=True):
+    """Load a JSON/CSV dataset, using (and filling) the content-hash binary cache."""
+    cache_dir = CACHE_DIR if cache_dir is None else cache_dir
+    name = os.path.splitext(os.path.basename(path))[0]
+    with open(path, 'rb') as f: data = f.read()
+    parts = [os.path.splitext(path)[1].lower().encode(), data]
+    adjacency_data = None
+    if path.lower().endswith('.csv') and os.path.exists(adjacency_path(path)):
+        with open(adjacency_path(path), 'rb') as f: adjacency_data = f.read()
+        parts.append(adjacency_data)
+
+    cache_path = os.path.join(cache_dir, content_hash(*parts) + '.npz')
+    if use_cache and os.path.exists(cache_path):
+        try:
+            with np.load(cache_path, allow_pickle=False) as arrays:
+                return Dataset.from_arrays(arrays)
+        except (OSError, ValueError, KeyError):
+            pass # Unreadable or stale cache entry: fall through and rebuild it
+
+    if path.lower().endswith('.json'): dataset = _parse_json(name, data)
+    elif path.lower().endswith('.csv'): dataset = _parse_csv(name, data, adjacency_data)
+    else: raise DatasetError(f"{path}: unsupported dataset format (use .json or .csv)")
+
+    if use_cache:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            temp_path = f"{cache_path}.{os.getpid()}.tmp"
+            with open(temp_path, 'wb') as f: np.savez(f, **dataset.to_arrays())
+            os.replace(temp_path, cache_path) # Atomic: readers never see a half-written cache
+        except OSError as e:
+            if instrument.level <= instrument.WARNING:
+                instrument.emit(instrument.WARNING, 'dataset.cache_failed', path=cache_path, error=repr(e))
+    return dataset
+
+
+def write_json(dataset, path):
+    """Write a dataset in the JSON layout (e.g. to edit the built-in scenario)."""
+    document = {'name': dataset.name, 'units': dataset.to_records(),
+                'adjacency': [list(pair) for pair in dataset.edge_names()]}
+    with open(path, 'w', encoding='utf-8') as f: json.dump(document, f, indent=1)
@@ -0,0 +1,93 @@
+# pmsim/election.py
+"""Vectorized election kernel: rival attacks, local hits and the vote tally.
+
+Every function works on the trailing "unit" axis (one entry per prefecture), so the
+same code handles a single election (shape ``(n_units,)``) and a batch of sampled
+elections (shape ``(n_samples, n_units)``) in one call.
+"""
+import numpy as np
+
+ELECTION_THRESHOLD = 30.0 # Global approval below this triggers an election
+KEEP_THRESHOLD = 50.0 # A prefecture votes to keep the PM at or above this approval
+
+# Attack draw ranges (same numbers the per-rival loop used)
+ATTACK_BASE_RANGE = (0.5, 2.5)
+ATTACK_VARIATION_RANGE = (0.8, 1.2)
+LOCAL_HIT_RANGE = (0.7, 1.3)
+SURVIVAL_BOOST_RANGE = (1.0, 4.0) # Approval bounce after surviving a vote
+
+# Daily approval drift magnitude used when forecasting the days left before voting
+FORECAST_DRIFT = 0.1
+
+
+def draw_attack_impacts(rng, attack_skills, size=()):
+    """Draw each rival's attack impact, shape ``size + (n_rivals,)``."""
+    skills = np.asarray(attack_skills, dtype=float)
+    base = rng.uniform(*ATTACK_BASE_RANGE, size=tuple(size) + skills.shape)
+    return base * skills
+
+
+def draw_local_hits(rng, impacts, n_units, spread=1.0):
+    """Turn rival impacts into a per-unit approval hit, shape ``impacts.shape[:-1] + (n_units,)``.
+
+    ``spread`` scales the local factors' deviation from 1 (per unit or scalar); values
+    below 1 describe units that average many independent local draws."""
+    batch_shape = impacts.shape[:-1]
+    actual_hit = impacts.sum(axis=-1) * rng.uniform(*ATTACK_VARIATION_RANGE, size=batch_shape)
+    local_factors = rng.uniform(*LOCAL_HIT_RANGE, size=batch_shape + (n_units,))
+    if not np.isscalar(spread) or spread != 1.0: local_factors = 1.0 + (local_factors - 1.0) * spread
+    return actual_hit[..., None] * local_factors
+
+
+def apply_hits(approval, hits):
+    """Subtract hits from approval and clamp to 0-100 (returns a new array)."""
+    return np.clip(approval - hits, 0.0, 100.0)
+
+
+def tally_votes(approval, keep_threshold=KEEP_THRESHOLD):
+    """Count keep/oust votes along the unit axis."""
+    approval = np.asarray(approval)
+    votes_to_keep = np.count_nonzero(approval >= keep_threshold, axis=-1)
+    votes_to_oust = approval.shape[-1] - votes_to_keep
+    return votes_to_keep, votes_to_oust
+
+
+def pm_survives(votes_to_oust, n_units):
+    """PM keeps office unless more than half of the units vote to oust."""
+    return np.asarray(votes_to_oust) <= n_units / 2
+
+
+def forecast_survival(approval, attack_skills, rng, n_samples=5000, attacks_pending=True,
+                      drift_days=0, keep_threshold=KEEP_THRESHOLD, spread=1.0, chunk_elements=2_000_000,
+                      drift=FORECAST_DRIFT):
+    """Monte Carlo probability of surviving an election from the given approval.
+
+    ``approval`` may be ``(n_units,)`` or a batch ``(n_games, n_units)``; the result is a
+    float or an array with one probability per game. ``attacks_pending`` says whether the
+    rival attack phase still lies ahead, ``drift_days`` how many days of daily drift (of
+    magnitude ``drift``) remain before the vote. ``spread`` scales the per-unit noise (local hit factors and drift)
+    when each voting unit is a population-weighted mean of smaller units, so the sample
+    can be drawn at the voting level directly. Samples are processed in chunks of about
+    ``chunk_elements`` values to bound memory.
+    """
+    approval = np.asarray(approval, dtype=float)
+    n_units = approval.shape[-1]
+    chunk = max(1, chunk_elements // approval.size)
+    survived = 0
+
+    for start in range(0, n_samples, chunk):
+        size = min(chunk, n_samples - start)
+        samples = np.broadcast_to(approval, (size,) + approval.shape)
+        if attacks_pending:
+            impacts = draw_attack_impacts(rng, attack_skills, size=samples.shape[:-1])
+            samples = apply_hits(samples, draw_local_hits(rng, impacts, n_units, spread))
+        if drift_days > 0:
+            # Sum of drift_days uniform(-d, d) draws, approximated by its exact mean/variance
+            drift_sd = drift * np.sqrt(drift_days / 3.0)
+            samples = np.clip(samples + rng.normal(0.0, drift_sd, size=samples.shape) * spread, 0.0, 100.0)
+
+        _, votes_to_oust = tally_votes(samples, keep_threshold)
+        survived = survived + pm_survives(votes_to_oust, n_units).sum(axis=0)
+
+    win_probability = np.asarray(survived / n_samples)
+    return float(win_probability) if win_probability.ndim == 0 else win_probability
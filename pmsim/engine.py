@@ -0,0 +1,911 @@
+# pmsim/engine.py
+"""Game engine: the built-in map, the Simulation and the actors it drives.
+
+Everything here runs without a display; simulator.py builds the Tk GUI on top of it
+and re-exports these names, so ``from simulator import Simulation`` keeps working (and
+saves written before the split still load, see saves.load).
+"""
+import math
+import random
+import sys
+import uuid
+
+import numpy as np
+
+from pmsim import election, scheduler
+from pmsim.calendar_table import CALENDAR
+from pmsim import migration, geography
+from pmsim.units import UnitArrays, UnitField, FIELDS as UNIT_FIELDS, draw_starting_stats
+from pmsim.hierarchy import Hierarchy
+from pmsim.aggregates import NationalAggregates
+from pmsim.changes import ChangeBus
+from pmsim.eventlog import EventLog, INFO, WARNING, CRITICAL
+from pmsim import municipalities, datasets, policies, events, instrument
+from pmsim.events import LOCAL_EVENT_TARGETS
+from pmsim.scheduler import EventScheduler
+from pmsim.params import DEFAULT_PARAMS, PM_SKILL_RANGE, RIVAL_SKILL_RANGE
+
+# Prefecture Data
+PREFECTURE_NAMES = [
+    "Hokkaido", "Aomori", "Iwate", "Miyagi", "Akita", "Yamagata", "Fukushima", "Ibaraki", "Tochigi", "Gunma",
+    "Saitama", "Chiba", "Tokyo", "Kanagawa", "Niigata", "Toyama", "Ishikawa", "Fukui", "Yamanashi", "Nagano",
+    "Gifu", "Shizuoka", "Aichi", "Mie", "Shiga", "Kyoto", "Osaka", "Hyogo", "Nara", "Wakayama", "Tottori",
+    "Shimane", "Okayama", "Hiroshima", "Yamaguchi", "Tokushima", "Kagawa", "Ehime", "Kochi", "Fukuoka",
+    "Saga", "Nagasaki", "Kumamoto", "Oita", "Miyazaki", "Kagoshima", "Okinawa"
+]
+
+# Placeholder GDP data (e.g., in Billions USD) - From previous step
+PREFECTURE_GDP_PLACEHOLDERS = {
+    "Tokyo": 1000, "Osaka": 400, "Aichi": 380, "Kanagawa": 350, "Saitama": 230, "Chiba": 210, "Hyogo": 200,
+    "Fukuoka": 190, "Hokkaido": 180, "Shizuoka": 170, "Ibaraki": 130, "Hiroshima": 120, "Kyoto": 110,
+    "Niigata": 100, "Miyagi": 95, "Gunma": 90, "Tochigi": 88, "Okayama": 85, "Gifu": 80, "Nagano": 78,
+    "Mie": 75, "Fukushima": 70, "Shiga": 68, "Yamaguchi": 65, "Kumamoto": 60, "Ehime": 58, "Kagoshima": 55,
+    "Toyama": 53, "Ishikawa": 52, "Wakayama": 50, "Oita": 48, "Yamagata": 46, "Nagasaki": 45, "Yamanashi": 44,
+    "Aomori": 43, "Iwate": 42, "Akita": 40, "Miyazaki": 38, "Fukui": 37, "Kagawa": 36, "Tokushima": 35,
+    "Saga": 34, "Nara": 33, "Okinawa": 32, "Kochi": 30, "Shimane": 28, "Tottori": 25
+}
+
+# ** NEW: Placeholder Population Growth Rates (% per year) **
+# Based on general trends (Tokyo/Okinawa positive, many rural negative) - Needs real data
+PREFECTURE_GROWTH_RATES = {
+    "Tokyo": 0.4, "Kanagawa": 0.1, "Saitama": 0.05, "Chiba": 0.0, "Aichi": 0.0, "Osaka": -0.1, "Fukuoka": 0.05,
+    "Okinawa": 0.3, "Shiga": 0.0,
+    # Most others slightly negative or more significantly negative
+    "Hokkaido": -0.5, "Aomori": -1.0, "Iwate": -0.9, "Miyagi": -0.3, "Akita": -1.5, "Yamagata": -1.1, "Fukushima": -0.8,
+    "Ibaraki": -0.4, "Tochigi": -0.5, "Gunma": -0.6, "Niigata": -0.9, "Toyama": -0.7, "Ishikawa": -0.6, "Fukui": -0.7,
+    "Yamanashi": -0.6, "Nagano": -0.7, "Gifu": -0.5, "Shizuoka": -0.4, "Mie": -0.6, "Kyoto": -0.3, "Hyogo": -0.3,
+    "Nara": -0.7, "Wakayama": -1.0, "Tottori": -0.9, "Shimane": -1.1, "Okayama": -0.3, "Hiroshima": -0.2, "Yamaguchi": -0.8,
+    "Tokushima": -1.0, "Kagawa": -0.6, "Ehime": -0.9, "Kochi": -1.1, "Saga": -0.7, "Nagasaki": -1.0, "Kumamoto": -0.5,
+    "Oita": -0.8, "Miyazaki": -0.9, "Kagoshima": -0.8
+}
+
+# ** NEW: Population data parsed from Wikipedia search results (Oct 1, 2022 figures) **
+PREFECTURE_POPULATIONS = {
+    'Tokyo': 14038167, 'Kanagawa': 9232489, 'Osaka': 8782484, 'Aichi': 7495171,
+    'Saitama': 7337089, 'Chiba': 6265975, 'Hyogo': 5402493, 'Hokkaido': 5140354,
+    'Fukuoka': 5116046, 'Shizuoka': 3582297, 'Ibaraki': 2839555, 'Hiroshima': 2759500,
+    'Kyoto': 2549749, 'Miyagi': 2279977, 'Niigata': 2152693, 'Nagano': 2019993,
+    'Gifu': 1945763, 'Gunma': 1913254, 'Tochigi': 1908821, 'Okayama': 1862317,
+    'Fukushima': 1790181, 'Mie': 1742174, 'Kumamoto': 1718327, 'Kagoshima': 1562662,
+    'Okinawa': 1468318, 'Shiga': 1408931, 'Yamaguchi': 1313403, 'Ehime': 1306486,
+    'Nara': 1305812, 'Nagasaki': 1283128, 'Aomori': 1204392, 'Iwate': 1180595,
+    'Ishikawa': 1117637, 'Oita': 1106831, 'Miyazaki': 1052338, 'Yamagata': 1041025,
+    'Toyama': 1016534, 'Kagawa': 934060, 'Akita': 929901, 'Wakayama': 903265,
+    'Yamanashi': 801874, 'Saga': 800787, 'Fukui': 752855, 'Tokushima': 703852,
+    'Kochi': 675705, 'Shimane': 657909, 'Tottori': 543620
+}
+
+
+DEFAULT_PM_NAME = "Shigeru Ishiba"
+DEFAULT_PARTY_NAME = "Liberal Democratic Party"
+SCALES = ('prefecture', 'municipality') # Simulation granularity / election counting levels
+
+FORECAST_ELEMENT_BUDGET = 2_000_000 # Max sampled unit approvals per election forecast
+
+# ** NEW: Rival attack lines, shared by every RivalParty and formatted only for the line picked **
+ATTACK_MESSAGES = {
+    "economy": (
+        "{rival} criticizes the government's failed economic policies!",
+        "'{target}'s economic plan is hurting families,' claims {rival}.",
+        "{rival} points to rising inflation under the current administration.",
+    ),
+    "scandal": (
+        "{rival} hints at potential corruption within the cabinet.",
+        "Questions raised by {rival} about the PM's transparency.",
+        "{rival} calls for an investigation into government spending.",
+    ),
+    "welfare": (
+        "{rival} argues that welfare programs are being neglected.",
+        "'{target} doesn't care about the elderly,' says {rival}.",
+        "{rival} promises better social support if elected.",
+    ),
+    "competence": (
+        "{rival} slams the government's handling of recent events.",
+        "'{target} is out of touch with the people,' states {rival}.",
+        "{rival} questions the PM's leadership abilities.",
+    ),
+}
+# Immigration figures never change during a game, so every CountryStatistics shares them
+IMMIGRATION_STATS = {
+    'total_foreigners': 3768977,
+    'source_countries': [("China", 873286), ("Vietnam", 634361), ("South Korea", 409238), ("Nepal", 124356), ("Brazil", 206886)],
+    'immigration_rate': 10.5
+}
+
+def _restore_slots(obj, state):
+    """Set the attributes of a slotted object from pickled state: (None, slots) for
+    objects pickled with __slots__, a plain attribute dict for older saves."""
+    if isinstance(state, tuple): state = {**(state[0] or {}), **state[1]}
+    for name, value in state.items(): setattr(obj, name, value)
+
+BUILTIN_DATASET_NAME = "Japan (47 prefectures)"
+_builtin_dataset = None
+
+def builtin_dataset():
+    """The built-in 47-prefecture scenario assembled from the tables above (built once)."""
+    global _builtin_dataset
+    if _builtin_dataset is None:
+        region_of = {name: region for region, members in geography.REGIONS.items() for name in members}
+        records = []
+        for name in PREFECTURE_NAMES:
+            if name not in PREFECTURE_POPULATIONS:
+                print(f"Warning: Missing population data for {name}, using default.")
+            records.append({
+                'name': name, 'region': region_of[name],
+                'population': PREFECTURE_POPULATIONS.get(name, 500000.0), # Default fallback
+                'gdp': PREFECTURE_GDP_PLACEHOLDERS.get(name, random.uniform(20.0, 100.0)),
+                'growth_rate': PREFECTURE_GROWTH_RATES.get(name, random.uniform(-1.0, 0.5)),
+            })
+        _builtin_dataset = datasets.Dataset.from_records(BUILTIN_DATASET_NAME, records, geography.PREFECTURE_BORDERS)
+    return _builtin_dataset
+
+class Prefecture:
+    # ** MODIFIED: Stats live in a shared UnitArrays store; a Prefecture is a view onto one row **
+    __slots__ = ('name', 'store', 'index')
+    population = UnitField('population') # Float internally to handle fractional growth
+    gdp = UnitField('gdp') # Billions USD
+    economy = UnitField('economy')
+    approval = UnitField('approval')
+    unemployment = UnitField('unemployment')
+    population_growth_rate = UnitField('population_growth_rate') # Annual rate (% per year)
+
+    def __init__(self, name, population=None, gdp=None, growth_rate=None, store=None, index=0):
+        self.name = sys.intern(name)
+        if store is None: # Standalone prefecture: draw missing stats and keep a one-row store
+            store = UnitArrays.generate(
+                [name],
+                [float(population) if population is not None else float(random.randint(500000, 10000000))],
+                [float(gdp) if gdp is not None else random.uniform(20.0, 100.0)],
+                [float(growth_rate) if growth_rate is not None else random.uniform(-1.0, 0.5)],
+                np.random.default_rng())
+        self.store = store
+        self.index = index
+
+    def __setstate__(self, state):
+        """Restore the slots; convert prefectures pickled before the array store (plain attribute dicts)."""
+        if isinstance(state, tuple): state = state[1]
+        if 'store' not in state:
+            values = {field: [state[field]] for field in UNIT_FIELDS}
+            state = {'name': state['name'], 'store': UnitArrays([state['name']], **values), 'index': 0}
+        _restore_slots(self, dict(state, name=sys.intern(state['name'])))
+
+    # ** NEW: Method for daily population update **
+    def update_daily_population(self, days=1):
+        """Updates population based on the annual growth rate, applied daily (compounded over days)."""
+        # Convert annual rate to daily rate (approximation)
+        daily_rate_multiplier = (1.0 + self.population_growth_rate / 100.0)**(days/365.0)
+        self.population *= daily_rate_multiplier
+        # Keep population as float internally, can round for display if needed
+
+    def normalize_values(self):
+        """Ensure all values are within valid ranges"""
+        self.store.normalize(self.index)
+
+    def get_gdp_per_capita(self):
+        if self.population > 0:
+            return (self.gdp * 1_000_000_000) / self.population
+        return 0
+
+    # ** NEW: Convenience method to get integer population for display/some calcs **
+    def get_population_int(self):
+        return int(round(self.population))
+
+
+class PrimeMinister:
+    __slots__ = ('name', 'party_name', 'global_approval', 'base_popularity', 'economy_skill',
+                 'unemployment_skill', 'welfare_skill', 'demographics_skill')
+
+    def __init__(self, name, party_name, skill_range=PM_SKILL_RANGE, rng=random):
+        self.name = sys.intern(name)
+        self.party_name = sys.intern(party_name)
+        self.global_approval = 50.0
+        self.base_popularity = rng.uniform(50.0, 70.0)
+        self.economy_skill = rng.uniform(*skill_range)
+        self.unemployment_skill = rng.uniform(*skill_range)
+        self.welfare_skill = rng.uniform(*skill_range)
+        # ** NEW: Skill related to demographics/growth policies? **
+        self.demographics_skill = rng.uniform(*skill_range)
+
+    def __setstate__(self, state):
+        _restore_slots(self, state)
+
+    @instrument.timed('calculate_global_approval', 'approval')
+    def calculate_global_approval(self, prefectures):
+        # ** NEW: Cached national aggregates (recomputed only after approval/population changed) **
+        if isinstance(prefectures, NationalAggregates):
+            self.global_approval = prefectures.approval
+            return self.global_approval
+        # ** NEW: Vectorized path for the array store **
+        if isinstance(prefectures, UnitArrays):
+            weights = np.rint(prefectures.population) # Use integer pop for weighting
+            total_population = weights.sum()
+            self.global_approval = (min(100.0, max(0.0, float(weights @ prefectures.approval) / total_population))
+                                    if total_population > 0 else 0.0)
+            return self.global_approval
+        total_approval = 0
+        total_population = 0
+        for prefecture in prefectures:
+            pop_int = prefecture.get_population_int() # Use integer pop for weighting
+            total_approval += prefecture.approval * pop_int
+            total_population += pop_int
+        if total_population > 0:
+            self.global_approval = min(100.0, max(0.0, (total_approval / total_population)))
+        else:
+            self.global_approval = 0.0 # Handle case of zero population
+        return self.global_approval
+
+class RivalParty:
+    __slots__ = ('name', 'base_popularity', 'attack_skill', 'preferred_attack')
+
+    def __init__(self, name, skill_range=RIVAL_SKILL_RANGE, rng=random):
+        self.name = sys.intern(name)
+        self.base_popularity = rng.uniform(40.0, 60.0)
+        # ** NEW: Attributes for attack strength? **
+        self.attack_skill = rng.uniform(*skill_range)
+        self.preferred_attack = rng.choice(["economy", "scandal", "welfare", "competence"])
+
+    def __setstate__(self, state):
+        _restore_slots(self, state)
+
+    # ** NEW: Method to generate an attack message/effect **
+    def generate_attack(self, target_party, impact=None, rng=random):
+        """Generates a random attack message against target_party and its approval impact.
+
+        The election kernel draws impacts for all rivals at once and passes them in;
+        when impact is None a single impact is drawn here as before. rng is the
+        random.Random (or the random module) to draw from."""
+        attack_type = self.preferred_attack
+        if impact is None:
+            # Base impact range before skill modification
+            base_impact = rng.uniform(*election.ATTACK_BASE_RANGE)
+            # Modify impact by party's skill
+            impact = base_impact * self.attack_skill
+
+        template = rng.choice(ATTACK_MESSAGES.get(attack_type, ATTACK_MESSAGES["competence"]))
+        message = template.format(rival=self.name, target=target_party)
+        return message, impact # Returns the message and the calculated approval hit
+
+
+class CountryStatistics:
+    __slots__ = ('economy', 'demographics')
+
+    def __init__(self):
+        self.economy = {
+            'gdp_ppp': 6.31, 'gdp_nominal': 4.204, 'gdp_per_capita': 36990.33,
+            'inflation': 3.2, 'growth_rate': 0.9,
+        }
+        self.demographics = {
+            'population': 125921755, 'density': 333.2, 'migration_rate': 0.08,
+            'birth_rate': 5.7,
+            'immigration': IMMIGRATION_STATS,
+        }
+
+    def __setstate__(self, state):
+        _restore_slots(self, state)
+        self.demographics['immigration'] = IMMIGRATION_STATS
+
+
+class Simulation:
+    def __init__(self, fresh=True, pm_name=None, party_name=None, seed=None, scale='prefecture',
+                 election_level='prefecture', dataset=None, params=None, record_units=False):
+        self.stats = CountryStatistics()
+        # ** NEW: Balance knobs (thresholds, probabilities, drift, skills, policy ranges) **
+        self.params = DEFAULT_PARAMS if params is None else params
+        # ** NEW: NumPy generator for the vectorized kernels (elections, forecasts) **
+        self.rng = np.random.default_rng(seed)
+        # ** NEW: Python generator for the scalar draws (skills, policy rolls, events), seeded alike **
+        self.random = random.Random(seed)
+
+        # ** NEW: Scenario data comes from a Dataset (built-in prefectures, or a JSON/CSV file path) **
+        if dataset is None: dataset = builtin_dataset()
+        elif not isinstance(dataset, datasets.Dataset): dataset = datasets.load(dataset)
+
+        # ** MODIFIED: State lives in one UnitArrays store of simulated units (prefectures or
+        # municipalities); self.prefectures are views onto the prefecture level **
+        if scale not in SCALES: raise ValueError(f"Unknown scale '{scale}', expected one of {SCALES}")
+        if election_level not in SCALES: raise ValueError(f"Unknown election level '{election_level}'")
+        self.scale = scale
+        self.election_level = election_level # Which level casts the keep/oust votes
+        self.dataset_name = dataset.name
+        if scale == 'prefecture':
+            dataset = dataset.prefecture_level()
+            self.hierarchy = dataset.hierarchy()
+            self.units = UnitArrays.generate(dataset.unit_names, dataset.population, dataset.gdp,
+                                             dataset.growth_rate, self.rng)
+            # ** NEW: Sparse prefecture adjacency graph for local shocks and approval diffusion **
+            self.graph = dataset.graph()
+            self._prefecture_store = self.units
+        else:
+            if dataset.is_prefecture_level: dataset = municipalities.split_dataset(dataset)
+            self._init_municipalities(dataset)
+        self.dataset = dataset # The map actually simulated (after aggregation or splitting)
+        # ** NEW: National totals kept in step with the units (mutations below report what they change) **
+        self.national = NationalAggregates(self.units)
+        # ** NEW: Change notifications for whatever displays this game (see pmsim.changes) **
+        self.changes = ChangeBus()
+        self._prefecture_views = [Prefecture(name, store=self._prefecture_store, index=i)
+                                  for i, name in enumerate(self.hierarchy.prefecture_names)]
+        
+        self.pm_name = pm_name if pm_name else DEFAULT_PM_NAME
+        self.party_name = party_name if party_name else DEFAULT_PARTY_NAME
+        self.pm = PrimeMinister(self.pm_name, self.party_name, self.params.pm_skill_range, self.random)
+        # ** MODIFIED: Date is a day ordinal on the precomputed game calendar (day 0 = 1 Jan 2025) **
+        self.tick = CALENDAR.ordinal(2025, 1, 1)
+        self.running = True
+        self.game_over_reason = None
+        self.game_over_cause = None # One of history.CAUSES once the game is over
+        self.game_id = uuid.uuid4().hex # Identifies this game in the history store
+        
+        # ** NEW: Election state management **
+        self.election_in_progress = None # Can be None, 'triggered', 'attack_phase', 'voting_day'
+        self.election_attack_messages = [] # Store messages for the popup
+        
+        # Initial calculation
+        self.pm.calculate_global_approval(self.national)
+        self.approval_history = [self.pm.global_approval]
+        self.approval_ordinals = [self.tick] # Day ordinals matching approval_history
+        # ** NEW: Optional per-prefecture approval series (one float32 row per approval_history entry) **
+        self.unit_history = [] if record_units else None
+        if record_units: self.unit_history.append(self.refresh_prefecture_aggregates().approval.astype(np.float32))
+        
+        self.rivals = [
+            RivalParty("Constitutional Democratic Party", self.params.rival_skill_range, self.random),
+            RivalParty("Democratic Party for the People", self.params.rival_skill_range, self.random),
+            RivalParty("Nihon Ishin no Kai", self.params.rival_skill_range, self.random),
+        ]
+        
+        # ** MODIFIED: Full, indexed event log (see pmsim.eventlog) instead of the last 10 messages **
+        self.events = EventLog()
+        self._forecast_cache = None # (approval, election state, probability) of the last forecast
+        self._migration_net = None # Cached net migration vector, see get_net_migration
+        self._migration_refresh_tick = 0
+
+        # ** NEW: Discrete-event scheduler shared by advance_day and skip_year (keyed by self.tick) **
+        self.scheduler = EventScheduler(self.rng)
+        self.scheduler.set_event_probability(self.tick, self.params['event_probability'])
+
+    # ** NEW: Municipality-scale setup (municipality -> prefecture -> region) **
+    def _init_municipalities(self, dataset):
+        self.hierarchy = dataset.hierarchy()
+        # Municipalities start close to their prefecture's mood rather than fully independent
+        self.units = UnitArrays(dataset.unit_names, population=dataset.population, gdp=dataset.gdp,
+                                population_growth_rate=dataset.growth_rate,
+                                **draw_starting_stats(self.rng, dataset.n_units, hierarchy=self.hierarchy))
+        self.units.normalize()
+        n_prefectures = len(dataset.prefecture_names)
+
+        self.graph = dataset.graph()
+        self._prefecture_store = UnitArrays(dataset.prefecture_names,
+                                            **{field: np.zeros(n_prefectures) for field in UNIT_FIELDS})
+        self.refresh_prefecture_aggregates()
+
+    @property
+    def prefectures(self):
+        """Prefecture views (aggregated from the municipalities at municipality scale)."""
+        if not self.hierarchy.is_identity: self.refresh_prefecture_aggregates()
+        return self._prefecture_views
+
+    def refresh_prefecture_aggregates(self):
+        """Recompute prefecture totals/averages from the units with segmented reductions."""
+        units, hierarchy, store = self.units, self.hierarchy, self._prefecture_store
+        if store is units: return store
+        store.population[:] = hierarchy.prefecture_sum(units.population)
+        store.gdp[:] = hierarchy.prefecture_sum(units.gdp)
+        for field in ('economy', 'approval', 'unemployment', 'population_growth_rate'):
+            getattr(store, field)[:] = hierarchy.prefecture_mean(getattr(units, field), units.population)
+        return store
+
+    def __setstate__(self, state):
+        """Fill in attributes added after older save files were written."""
+        self.__dict__.update(state)
+        old_views = self.__dict__.pop('prefectures', None) # Now a property
+        if 'rng' not in state: self.rng = np.random.default_rng()
+        if 'random' not in state: self.random = random.Random() # Older games drew from the random module
+        if 'params' not in state: self.params = DEFAULT_PARAMS
+        if 'game_id' not in state: self.game_id = uuid.uuid4().hex
+        if 'unit_history' not in state: self.unit_history = None
+        if 'game_over_cause' not in state: self.game_over_cause = (None if self.running else 'election'
+                                    if (self.game_over_reason or "").startswith("Lost Election") else 'unknown')
+        self._forecast_cache = None
+        if '_migration_net' not in state: self._migration_net, self._migration_refresh_tick = None, 0
+        if 'units' not in state: # Saved before the array store: gather prefecture stats into one
+            self.units = UnitArrays([p.name for p in old_views],
+                                    **{field: [getattr(p, field) for p in old_views] for field in UNIT_FIELDS})
+        if 'national' not in state: self.national = NationalAggregates(self.units)
+        if 'changes' not in state: self.changes = ChangeBus()
+        if 'graph' not in state: self.graph = geography.prefecture_graph(self.units.names)
+        if 'dataset_name' not in state: self.dataset_name = BUILTIN_DATASET_NAME
+        if 'dataset' not in state: # Saved before the dataset was kept: those games used the built-in map
+            self.dataset = (builtin_dataset() if self.scale == 'prefecture'
+                            else municipalities.split_dataset(builtin_dataset()))
+        if 'hierarchy' not in state: # Saved before municipality scale: always prefecture level
+            self.scale = self.election_level = 'prefecture'
+            self.hierarchy = Hierarchy.identity(self.units.names, geography.REGIONS)
+            self._prefecture_store = self.units
+            self._prefecture_views = [Prefecture(name, store=self.units, index=i) for i, name in enumerate(self.units.names)]
+        if 'day' in state: # Saved before the calendar table: convert date fields to ordinals
+            for key in ('day', 'month', 'year', 'approval_dates'): del self.__dict__[key]
+            self.tick = CALENDAR.ordinal(state['year'], state['month'], state['day'])
+            self.approval_ordinals = [CALENDAR.ordinal(d.year, d.month, d.day) for d in state['approval_dates']]
+        if 'scheduler' not in state:
+            self.scheduler = EventScheduler(self.rng)
+            self.scheduler.set_event_probability(self.tick, self.params['event_probability'])
+            # Re-queue the remaining phases of an election saved mid-way
+            remaining = {'triggered': 0, 'attack_phase': 1, 'voting_day': 2}.get(self.election_in_progress)
+            if remaining is not None:
+                for kind, offset in scheduler.ELECTION_PHASE_OFFSETS[remaining:]:
+                    self.scheduler.schedule(self.tick + offset - remaining, kind)
+        if isinstance(self.events, list): # Saved before the event log: the last few messages, dated today
+            self.events = EventLog.from_messages(self.events, self.tick)
+
+    # ** NEW: Every change to the game state goes through these, so views can follow it **
+    def _units_changed(self, *fields, mask=None):
+        """Report modified unit fields to the national aggregates and the change bus.
+
+        mask marks the changed units (None: all of them); views get it as prefecture rows."""
+        self.national.changed(*fields)
+        if mask is not None and not self.hierarchy.is_identity:
+            mask = self.hierarchy.prefecture_sum(np.asarray(mask, dtype=float)) > 0
+        self.changes.publish('units', fields, mask)
+        if 'approval' in fields or 'population' in fields: self.changes.publish('approval')
+
+    def _log_event(self, message, kind, severity=INFO):
+        self.events.append(self.tick, kind, message, severity)
+        self.changes.publish('events')
+
+    def _set_election(self, state):
+        self.election_in_progress = state
+        self.changes.publish('election')
+
+    # ** NEW: Calendar fields are lookups into the precomputed table **
+    @property
+    def year(self): return CALENDAR.ymd(self.tick)[0]
+
+    @property
+    def month(self): return CALENDAR.ymd(self.tick)[1]
+
+    @property
+    def day(self): return CALENDAR.ymd(self.tick)[2]
+
+    @property
+    def approval_dates(self):
+        """Dates of approval_history entries (built on demand for display)."""
+        return [CALENDAR.to_date(ordinal) for ordinal in self.approval_ordinals]
+
+    @instrument.timed('make_policy', 'policy')
+    def make_policy(self, policy_type):
+        """Make a policy and influence stats"""
+        if not self.running or self.election_in_progress: # Prevent actions during election
+            return None, "Game Over" if not self.running else "Election in Progress"
+
+        policy_effect = 0; policy_name = ""; catastrophic = False; positive = False # Define positive here
+
+        def high_risk_outcome(pos_range, neg_range):
+            success = self.random.random() < self.params['policy_success_probability']
+            value = self.random.uniform(*pos_range) if success else -self.random.uniform(*neg_range)
+            return value, success # Return value and success boolean
+
+        # ** MODIFIED: Effects on the unit arrays come from the shared policy kernel **
+        if policy_type in policies.POLICY_TYPES:
+            policy_effect, positive = high_risk_outcome(*self.params.outcome_ranges(policy_type))
+            policies.apply_policy(self.units, policy_type, policy_effect, positive, self.pm, self.rng)
+            self._units_changed(*policies.CHANGED_FIELDS[policy_type])
+
+        # --- Names and national statistics ---
+        if policy_type == "economy":
+            policy_name = self.random.choice(["Economic Stimulus", "Industrial Plan", "Trade Initiative", "Investment Promotion"])
+            self.stats.economy['gdp_nominal'] = self.national.gdp
+            self.stats.economy['growth_rate'] += (0.1 if positive else -0.1)
+
+        elif policy_type == "unemployment":
+            policy_name = self.random.choice(["Job Creation", "Workforce Training", "Small Business Support", "Employment Subsidy"])
+
+        elif policy_type == "welfare":
+            policy_name = self.random.choice(["Healthcare Reform", "Pension Overhaul", "Social Security Boost", "Family Support"])
+            self.stats.demographics['birth_rate'] += 0.1 if positive else -0.05 # Simplified national effect
+
+        # ** NEW POLICY EXAMPLE: Childcare Subsidies **
+        elif policy_type == "childcare_subsidies":
+            policy_name = "Childcare Subsidy Program"
+            self.stats.demographics['birth_rate'] += 0.15 if positive else -0.02 # Small national effect
+
+        # --- Other policies (Austerity, Corruption, Gambles) ---
+        elif policy_type == "austerity":
+            policy_name = self.random.choice(["Austerity Budget", "Public Sector Cuts", "Welfare Reduction"])
+
+        elif policy_type == "corrupt_deal": # Risk of scandal
+            policy_name = self.random.choice(["Secret Deal", "Crony Contract", "Illegal Funding"])
+            if positive: # Got away with it (small temporary boost)
+                 policy_name += " (Successful)"
+            else: # Scandal!
+                policy_name += " Scandal Exposed!"
+                catastrophic = True # Treat exposure as catastrophic
+                self._log_event(f"SCANDAL! {policy_name}", 'scandal', CRITICAL)
+
+        elif policy_type == "nuclear_energy_gamble":
+            if positive:
+                policy_name = "Nuclear Expansion Success"
+            else:
+                policy_name = "Nuclear Accident Disaster"
+                catastrophic = True
+                self._log_event(f"CATASTROPHE: {policy_name}", 'catastrophe', CRITICAL)
+
+        elif policy_type == "tech_gamble":
+            policy_name = "AI Tech Revolution" if positive else "Tech Bubble Burst"
+
+        # Recalculate global approval after policy effects
+        self.pm.calculate_global_approval(self.national)
+
+        # Add event message (avoiding duplicate scandal/catastrophe messages)
+        if not catastrophic and "Scandal" not in policy_name:
+             outcome = "Success" if positive else "Failure"
+             self._log_event(f"Policy: {policy_name} ({outcome})", 'policy', INFO if positive else WARNING)
+
+        # Check for election trigger
+        self.check_for_election()
+
+        return policy_effect, policy_name
+
+    @instrument.timed('random_event', 'event')
+    def random_event(self):
+        """Random events affecting approval"""
+        if not self.running or self.election_in_progress: return None, None
+        # (Timing is decided by the event scheduler; every call produces an event)
+
+        event_type = self.random.choice(events.EVENT_TYPES)
+        event_name = self.random.choice(events.EVENT_NAMES[event_type])
+        effect = self.random.uniform(*events.EVENT_EFFECT_RANGES[event_type]); target = None
+
+        if event_type == "natural_disaster":
+            target = LOCAL_EVENT_TARGETS.get(event_name)
+            if isinstance(target, list): target = self.random.choice(target)
+            if target is not None and not self.graph.knows(target): target = None # Not on this scenario's map
+            # Disasters can impact growth negatively (hardest around the epicentre)
+            self.units.population_growth_rate -= self.rng.uniform(*events.DISASTER_GROWTH_HIT, len(self.units)) * self.get_shock_weights(target)
+            self._units_changed('population_growth_rate')
+        elif event_type == "economic_boom":
+            # Booms might slightly increase growth
+            self.units.population_growth_rate += self.rng.uniform(*events.BOOM_GROWTH_GAIN, len(self.units))
+            self._units_changed('population_growth_rate')
+
+        # Apply approval effect locally
+        self.apply_approval_shock(effect, target)
+
+        self._log_event(f"Event: {event_name}" + (f" ({target})" if target else ""), 'event',
+                        WARNING if effect < 0 else INFO)
+
+        self.check_for_election()
+        return event_type, event_name
+
+    # ** NEW: Shocks that can target a prefecture or region and spread over the adjacency graph **
+    def get_shock_weights(self, target=None):
+        """Per-prefecture shock multiplier: 1 everywhere for national shocks, otherwise a
+        national share plus a boost decaying with hops from the target prefecture/region,
+        normalised to a population-weighted mean of 1."""
+        return events.shock_weights(self.graph, target, self.units.population)
+
+    def apply_approval_shock(self, effect, target=None, noise=events.SHOCK_NOISE):
+        """Add effect (scaled by noise and shock weights) to prefecture approval and refresh the global rating."""
+        weights = self.get_shock_weights(target)
+        self.units.approval += effect * weights * self.rng.uniform(*noise, len(self.units))
+        self.units.normalize()
+        self._units_changed('approval')
+        self.pm.calculate_global_approval(self.national)
+
+    # ** MODIFIED: Advance day runs through the shared event scheduler **
+    @instrument.timed('advance_day', 'tick')
+    def advance_day(self):
+        """Advance the simulation by one day, handling growth, events and elections."""
+        if not self.running: return None, None
+
+        self.scheduler.set_event_probability(self.tick, self.params['event_probability'])
+        event_type, event_name = self._simulate_day()
+
+        # Record history every day during normal play
+        self.record_approval()
+
+        # Final check (mainly for game over state after events/voting)
+        if not self.running: return None, None # Ensure game over state stops further processing
+
+        return event_type, event_name
+
+    # ** NEW: Shared day/stretch machinery used by advance_day and skip_year **
+    def _advance_date(self, days=1):
+        """Move the calendar forward; dates are day ordinals so this is an increment."""
+        self.tick += days
+        self.changes.publish('date')
+
+    def record_approval(self):
+        """Append the current global approval and date to the history."""
+        self.approval_history.append(self.pm.global_approval)
+        self.approval_ordinals.append(self.tick)
+        self.changes.publish('history')
+        if self.unit_history is not None:
+            self.unit_history.append(self.refresh_prefecture_aggregates().approval.astype(np.float32))
+
+    def _apply_daily_changes(self, days=1):
+        """Population growth, migration and random drift for a stretch of days with nothing scheduled.
+
+        One day uses the usual uniform drift; longer stretches draw the summed drift
+        from a normal with the same mean and variance, so quiet periods cost one pass."""
+        units = self.units
+        n_units = len(units)
+
+        def drift(magnitude):
+            if days == 1: return self.rng.uniform(-magnitude, magnitude, n_units)
+            return self.rng.normal(0.0, magnitude * math.sqrt(days / 3.0), n_units)
+
+        # Natural growth, then internal migration (net flows sum to zero)
+        units.population *= (1.0 + units.population_growth_rate / 100.0) ** (days / 365.0)
+        units.population += self.get_net_migration() * (days / 365.0)
+        units.approval[:] = self.graph.diffuse(units.approval, days=days) # Opinion spreads between neighbours
+        magnitudes = self.params.daily_drift
+        units.approval += drift(magnitudes['approval']) # Random drift
+        units.economy += drift(magnitudes['economy'])
+        units.unemployment += drift(magnitudes['unemployment'])
+        units.normalize()
+        self._units_changed('population', 'approval', 'economy', 'unemployment')
+
+        # Recalculate global approval after drift
+        self.pm.calculate_global_approval(self.national)
+
+    # ** NEW: Inter-prefecture migration (flows refreshed monthly, applied daily) **
+    def get_net_migration(self):
+        """Net annual migration per prefecture (people/year), recomputed every migration.REFRESH_DAYS."""
+        if self._migration_net is None or self.tick >= self._migration_refresh_tick:
+            units = self.units
+            self._migration_net = migration.net_migration(units.population, units.gdp,
+                                                          units.unemployment, units.approval)
+            self._migration_refresh_tick = self.tick + migration.REFRESH_DAYS
+        return self._migration_net
+
+    def get_migration_flows(self):
+        """Full prefecture-to-prefecture annual flow matrix (for analysis and display)."""
+        units = self.units
+        return migration.flow_matrix(units.population, units.gdp, units.unemployment, units.approval)
+
+    def _fast_forward(self, days):
+        """Jump over a quiet stretch analytically (no events or elections may be scheduled in it)."""
+        if days <= 0: return
+        self._advance_date(days)
+        self._apply_daily_changes(days)
+
+    def _simulate_day(self):
+        """Advance one day and run whatever the scheduler has queued for it."""
+        self._advance_date()
+        self._apply_daily_changes()
+
+        outcome = (None, None)
+        for kind in self.scheduler.pop_due(self.tick):
+            if kind == scheduler.RANDOM_EVENT:
+                self.scheduler.schedule_random_event(self.tick)
+                event_type, event_name = self.random_event()
+                if event_type: outcome = (event_type, event_name)
+            elif kind == scheduler.ELECTION_ATTACK:
+                self._set_election('attack_phase')
+                self.handle_election_attacks() # Run attacks, update approval
+                outcome = ("election_attack", "Rival parties launch attacks!")
+            elif kind == scheduler.ELECTION_VOTING:
+                self._set_election('voting_day') # No approval change today
+                outcome = ("election_voting", "Election voting begins!")
+            elif kind == scheduler.ELECTION_RESULT:
+                self.handle_election_voting() # This will set running=False if lost
+                self._set_election(None) # Election cycle ends
+                outcome = ("election_result", "Election results are in!")
+            if not self.running: break
+        return outcome
+
+
+    # ** NEW: Election attack phase logic **
+    @instrument.timed('handle_election_attacks', 'election')
+    def handle_election_attacks(self):
+        """Simulates rival attacks during the election campaign."""
+        if not self.running: return
+
+        self.election_attack_messages = ["Election Attack Phase! Rivals respond:"] # Reset messages
+
+        # Draw all rival impacts and per-prefecture hit factors in one vectorized call
+        impacts = election.draw_attack_impacts(self.rng, [rival.attack_skill for rival in self.rivals])
+        for rival, impact in zip(self.rivals, impacts):
+            message, _ = rival.generate_attack(self.party_name, impact, self.random)
+            self.election_attack_messages.append(f"- {message} (Impact: ~{impact:.1f}%)")
+
+        # Apply the hit - reduce global approval and slightly randomized local approval
+        hits = election.draw_local_hits(self.rng, impacts, len(self.units))
+        if instrument.level <= instrument.DEBUG:
+            instrument.emit(instrument.DEBUG, 'election.attacks', total_impact=float(impacts.sum()),
+                            mean_hit=float(hits.mean())) # Mean approval hit per unit
+
+        self.units.approval[:] = election.apply_hits(self.units.approval, hits)
+        self._units_changed('approval')
+
+        # Recalculate precise global approval after local hits
+        self.pm.calculate_global_approval(self.national)
+
+        self._log_event("Election: Rivals launch attacks!", 'election', WARNING)
+        # The messages stored in self.election_attack_messages will be shown by the App
+
+
+    # ** NEW: Election voting logic (separated from check) **
+    @instrument.timed('handle_election_voting', 'election')
+    def handle_election_voting(self):
+        """Counts votes and determines election outcome."""
+        if not self.running: return
+
+        voting_approval = self.get_voting_approval()
+        total_prefectures = len(voting_approval) # Voting units (prefectures or municipalities)
+        voter_label = "prefectures" if self.election_level == 'prefecture' else "municipalities"
+        votes_to_keep, votes_to_oust = election.tally_votes(voting_approval, self.params['keep_threshold'])
+        votes_to_keep, votes_to_oust = int(votes_to_keep), int(votes_to_oust)
+
+        if instrument.level <= instrument.DEBUG:
+            instrument.emit(instrument.DEBUG, 'election.votes', keep=votes_to_keep, oust=votes_to_oust)
+
+        # PM loses if more than half vote to oust
+        if not election.pm_survives(votes_to_oust, total_prefectures):
+            self.running = False # Set game state to over
+            self.changes.publish('running')
+            self.game_over_cause = 'election'
+            self.game_over_reason = (f"Lost Election!\n"
+                                     f"Final Vote: Keep {votes_to_keep}, Oust {votes_to_oust}. "
+                                     f"({votes_to_oust}/{total_prefectures} {voter_label} voted against you).")
+            self._log_event("Election Result: Lost!", 'election', CRITICAL)
+            if instrument.level <= instrument.INFO:
+                instrument.emit(instrument.INFO, 'election.lost', keep=votes_to_keep, oust=votes_to_oust)
+        else:
+             # PM survives the election
+             self._log_event("Election Result: Survived!", 'election')
+             # Store message to be shown by App
+             self.election_survival_message = (f"Election Survived!\n"
+                                               f"Votes to Keep: {votes_to_keep}\n"
+                                               f"Votes to Oust: {votes_to_oust}\n"
+                                               f"Your position is secure... for now.")
+             # Optional: Small approval boost for surviving?
+             boost = self.random.uniform(*election.SURVIVAL_BOOST_RANGE)
+             self.units.approval += boost
+             self.units.normalize()
+             self._units_changed('approval')
+             self.pm.calculate_global_approval(self.national)
+             self._log_event(f"Approval boosted slightly after surviving election (+{boost:.1f}% approx).", 'election')
+
+
+    # ** NEW: Vectorized win-probability forecast **
+    def get_approval_array(self):
+        """Copy of the prefecture approvals (same order as self.prefectures)."""
+        return self.units.approval.copy()
+
+    def get_voting_approval(self, approval=None):
+        """Approval of each voting unit for the tally: population-weighted prefecture means at
+        prefecture level, the units themselves at municipality level. Accepts batched approval."""
+        approval = self.units.approval if approval is None else approval
+        if self.election_level == 'municipality': return approval
+        return self.hierarchy.prefecture_mean(approval, self.units.population)
+
+    @instrument.timed('forecast_election', 'election')
+    def forecast_election(self, n_samples=5000):
+        """Probability of keeping office, estimated from n_samples simulated elections.
+
+        Before the attack phase the rival attacks are sampled too; once they have landed
+        only the vote remains. Outside an election this answers "what if one were called now".
+        The result is cached until approval or the election state changes. With very many
+        voting units (municipality level) the sample count is capped so one forecast
+        stays within FORECAST_ELEMENT_BUDGET drawn values."""
+        approval = self.get_approval_array()
+        cache = self._forecast_cache
+        if (cache is not None and cache[1] == self.election_in_progress
+                and np.array_equal(cache[0], approval)):
+            return cache[2]
+
+        # Sample at the voting level: a prefecture mean of independent municipal noise has
+        # its spread shrunk by sqrt(sum w^2) / sum w (w = municipal population)
+        voting_approval, spread = approval, 1.0
+        if self.election_level == 'prefecture' and not self.hierarchy.is_identity:
+            weights = self.units.population
+            voting_approval = self.get_voting_approval(approval)
+            spread = np.sqrt(self.hierarchy.prefecture_sum(weights ** 2)) / self.hierarchy.prefecture_sum(weights)
+
+        n_samples = max(100, min(n_samples, FORECAST_ELEMENT_BUDGET // voting_approval.shape[-1]))
+
+        attacks_pending = self.election_in_progress in (None, 'triggered')
+        result_day = self.scheduler.next_day_of(scheduler.ELECTION_RESULT)
+        drift_days = result_day - self.tick if result_day is not None else len(scheduler.ELECTION_PHASE_OFFSETS)
+        probability = election.forecast_survival(voting_approval, [rival.attack_skill for rival in self.rivals],
+                                                 self.rng, n_samples=n_samples,
+                                                 attacks_pending=attacks_pending, drift_days=drift_days,
+                                                 keep_threshold=self.params['keep_threshold'], spread=spread,
+                                                 drift=self.params['approval_drift'])
+        self._forecast_cache = (approval, self.election_in_progress, probability)
+        return probability
+
+
+    # ** MODIFIED: Election check only triggers the process **
+    @instrument.timed('check_for_election', 'election')
+    def check_for_election(self):
+        """Checks if global approval triggers an election."""
+        if not self.running or self.election_in_progress: return # Don't trigger if game over or election already happening
+
+        election_threshold = self.params['election_threshold'] # ** CHANGED THRESHOLD **
+        if self.pm.global_approval < election_threshold:
+            self._set_election('triggered')
+            self.scheduler.schedule_election(self.tick) # Attack, voting and result days
+            if instrument.level <= instrument.INFO:
+                instrument.emit(instrument.INFO, 'election.triggered', approval=self.pm.global_approval,
+                                threshold=election_threshold)
+            self._log_event(f"Approval below {election_threshold}%! Election Triggered!", 'election', WARNING)
+            # Message will be shown by App based on state change
+
+
+    @instrument.timed('skip_year', 'tick')
+    def skip_year(self):
+        """Skip ahead by one year, jumping between scheduled events."""
+        if not self.running or self.election_in_progress:
+             if instrument.level <= instrument.WARNING:
+                 instrument.emit(instrument.WARNING, 'skip_year.refused', running=self.running,
+                                 election=self.election_in_progress)
+             return self.running
+
+        start_tick = self.tick
+        num_days_to_skip = 365 # Approximate a year
+        record_interval = 30 # Record approval roughly monthly for the graph
+
+        # Events are rarer while skipping; the scheduler redraws the pending event time
+        self.scheduler.set_event_probability(self.tick, self.params['skip_event_probability'])
+        end_tick = self.tick + num_days_to_skip
+        next_record = self.tick + record_interval
+
+        while self.tick < end_tick:
+            # Quiet stretch up to the next scheduled event or recording point: one analytic step
+            stop = min(end_tick, next_record)
+            self._fast_forward(self.scheduler.quiet_days(self.tick, stop - self.tick))
+            if self.tick < stop:
+                event_type, _ = self._simulate_day()
+                if not self.running: # Check if an event or election caused game over
+                    if instrument.level <= instrument.INFO:
+                        instrument.emit(instrument.INFO, 'skip_year.game_over', date=CALENDAR.isoformat(self.tick),
+                                        reason="election" if event_type == "election_result" else "event")
+                    self.record_approval()
+                    return False # Stop skipping
+
+            if self.tick >= next_record:
+                self.record_approval()
+                next_record += record_interval
+
+        # Add final data point
+        self.record_approval()
+
+        # Final check for election trigger after skip (if still running)
+        if self.running: self.check_for_election()
+
+        if instrument.level <= instrument.INFO:
+            instrument.emit(instrument.INFO, 'skip_year.done', start=CALENDAR.isoformat(start_tick),
+                            end=CALENDAR.isoformat(self.tick))
+        return self.running
+
+    # ** MODIFIED: Return prefecture data including growth rate **
+    def get_prefecture_data(self):
+        """Return data about all prefectures for display"""
+        return [(p.name, p.get_population_int(), p.economy, p.approval, p.unemployment,
+                 p.gdp, p.get_gdp_per_capita(), p.population_growth_rate)
+                for p in self.prefectures]
+
+    def get_recent_events(self):
+        return self.events.recent()
+
+    def calculate_final_score(self):
+        if not self.approval_history: return 0.0
+        return sum(self.approval_history) / len(self.approval_history)
+
+    # ** NEW: Compact summary of a game, used for batch/ensemble reporting **
+    def get_summary(self, forecast_samples=5000):
+        """Return a dict summarizing the current game state, including the election forecast."""
+        return {
+            'pm_name': self.pm.name,
+            'party_name': self.party_name,
+            'date': CALENDAR.isoformat(self.tick),
+            'running': self.running,
+            'game_over_reason': self.game_over_reason,
+            'global_approval': self.pm.global_approval,
+            'final_score': self.calculate_final_score(),
+            'election_in_progress': self.election_in_progress,
+            'election_win_probability': self.forecast_election(forecast_samples) if self.running else None,
+        }
@@ -0,0 +1,100 @@
+# pmsim/env.py
+"""Gym-style environments for policy-choosing agents.
+
+``PMEnv`` wraps one interactive ``Simulation``; ``VectorPMEnv`` steps many games in
+lockstep on the batch engine. Both follow the Gymnasium API without depending on it:
+
+* ``reset(seed=None) -> (observation, info)``
+* ``step(action) -> (observation, reward, terminated, truncated, info)``
+
+Actions are indices into ACTIONS: 0 waits, the rest make the matching policy. Each
+step applies the action and then advances one day. Observations are the unit state
+arrays, shape ``(len(OBSERVATION_FIELDS), n_units)`` (with a leading game axis for the
+vector env). The reward is the change in the game's final score (the mean of its
+approval history), so the rewards of an episode sum to its final score minus the
+starting approval.
+"""
+import numpy as np
+
+from pmsim import policies
+from pmsim.batch import BatchSimulation
+from pmsim.engine import Simulation, builtin_dataset
+from pmsim.units import FIELDS as OBSERVATION_FIELDS
+
+ACTIONS = ("wait",) + policies.POLICY_TYPES
+DEFAULT_MAX_DAYS = 4 * 365 # Episodes are truncated after one parliamentary term
+
+
+class PMEnv:
+    """Single game around Simulation (full game logic, messages and history)."""
+    def __init__(self, dataset=None, max_days=DEFAULT_MAX_DAYS, **simulation_options):
+        self.dataset = dataset
+        self.max_days = max_days
+        self.simulation_options = simulation_options
+        self.simulation = None
+        self.n_actions = len(ACTIONS)
+
+    def _observe(self):
+        units = self.simulation.units
+        return np.stack([getattr(units, field) for field in OBSERVATION_FIELDS]).astype(np.float32)
+
+    def _info(self):
+        sim = self.simulation
+        return {'global_approval': sim.pm.global_approval, 'score': sim.calculate_final_score(),
+                'election_in_progress': sim.election_in_progress, 'days': len(sim.approval_history) - 1}
+
+    def reset(self, seed=None):
+        """Start a new game; seeded episodes are reproducible (the game owns its generators)."""
+        self.simulation = Simulation(seed=seed, dataset=self.dataset, **self.simulation_options)
+        return self._observe(), self._info()
+
+    def step(self, action):
+        sim = self.simulation
+        score = sim.calculate_final_score()
+        blocked = action != 0 and (not sim.running or sim.election_in_progress is not None)
+        if action != 0 and not blocked: sim.make_policy(ACTIONS[action])
+        if sim.running: sim.advance_day()
+
+        info = self._info(); info['action_blocked'] = blocked
+        terminated = not sim.running
+        truncated = not terminated and info['days'] >= self.max_days
+        return self._observe(), info['score'] - score, terminated, truncated, info
+
+
+class VectorPMEnv:
+    """n_envs games stepped in lockstep on the batch engine, with automatic reset.
+
+    When a game ends its row is reset within the same step: the returned observation is
+    the new game's first one, and info carries 'final_observation', 'final_score' and
+    'final_days' for the finished rows (selected by terminated | truncated)."""
+    def __init__(self, n_envs, dataset=None, max_days=DEFAULT_MAX_DAYS, seed=None, **batch_options):
+        self.batch = BatchSimulation(builtin_dataset() if dataset is None else dataset, n_envs, seed=seed, **batch_options)
+        self.n_envs = n_envs
+        self.max_days = max_days
+        self.n_actions = len(ACTIONS)
+        self.observation_shape = (len(OBSERVATION_FIELDS), self.batch.dataset.n_units)
+
+    def _observe(self):
+        return self.batch.buffer.astype(np.float32)
+
+    def reset(self, seed=None):
+        self.batch.reset(seed)
+        return self._observe(), {'global_approval': self.batch.global_approval.copy()}
+
+    def step(self, actions):
+        batch = self.batch
+        score = batch.score()
+        blocked = batch.apply_actions(actions)
+        terminated = batch.step_day()
+        new_score = batch.score()
+        truncated = ~terminated & (batch.days >= self.max_days)
+
+        info = {'global_approval': batch.global_approval.copy(), 'action_blocked': blocked,
+                'election_in_progress': batch.election_day >= 0}
+        done = np.flatnonzero(terminated | truncated)
+        if done.size:
+            info['final_observation'] = batch.buffer[done].astype(np.float32)
+            info['final_score'] = new_score[done]
+            info['final_days'] = batch.days[done].copy()
+            batch.reset_games(done)
+        return self._observe(), new_score - score, terminated, truncated, info
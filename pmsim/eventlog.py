@@ -0,0 +1,118 @@
+# pmsim/eventlog.py
+"""The game's event log: every entry of a game, compact and indexed.
+
+An entry is a day ordinal, a type (TYPES), a severity (INFO, WARNING, CRITICAL) and
+the message text. Entries are only appended, in date order. Ordinals, types and
+severities live in typed arrays (array.array, 6 bytes per entry). Besides the
+messages, each type keeps an array of the rows it occupies. This gives two indexes:
+
+* a date range is found by bisecting the ordinals
+* a type's rows in that range are found by bisecting its row array
+
+So ``select(types=..., start=..., end=...)`` costs O(log n) plus the size of the
+result, however long the game. Severity and text filters then run over the selected
+rows only.
+
+The log also reads like the list of messages it replaced: len(log), log[-1],
+log[a:b] and iteration give message strings. recent() returns the last
+RECENT_EVENTS messages, the window the game used to keep.
+"""
+import array
+import bisect
+import collections
+
+import numpy as np
+
+TYPES = ('policy', 'event', 'scandal', 'catastrophe', 'election')
+INFO, WARNING, CRITICAL = 0, 1, 2
+SEVERITIES = ('info', 'warning', 'critical')
+RECENT_EVENTS = 10
+
+# Message prefixes of logs saved as plain lists, for classifying them on load
+_LEGACY_PREFIXES = (("Policy:", 'policy', INFO), ("Event:", 'event', INFO), ("SCANDAL!", 'scandal', CRITICAL),
+                    ("CATASTROPHE:", 'catastrophe', CRITICAL), ("Election Result: Lost", 'election', CRITICAL),
+                    ("Election", 'election', WARNING), ("Approval boosted", 'election', INFO),
+                    ("Approval", 'election', WARNING))
+
+Entry = collections.namedtuple('Entry', 'tick type severity message')
+
+
+class EventLog:
+    """Append-only, indexed log of game events (see the module docstring)."""
+    def __init__(self):
+        self._ticks = array.array('i')
+        self._types = array.array('B')
+        self._severities = array.array('B')
+        self._messages = []
+        self._by_type = {kind: array.array('i') for kind in TYPES} # Rows of each type, ascending
+
+    @classmethod
+    def from_messages(cls, messages, tick):
+        """Log of a plain message list (older saves), dated tick and typed by message prefix."""
+        log = cls()
+        for message in messages:
+            kind, severity = next(((kind, severity) for prefix, kind, severity in _LEGACY_PREFIXES
+                                   if message.startswith(prefix)), ('event', INFO))
+            log.append(tick, kind, message, severity)
+        return log
+
+    def append(self, tick, kind, message, severity=INFO):
+        if self._ticks and tick < self._ticks[-1]: raise ValueError("Events must be appended in date order")
+        self._by_type[kind].append(len(self._messages))
+        self._ticks.append(tick)
+        self._types.append(TYPES.index(kind))
+        self._severities.append(severity)
+        self._messages.append(message)
+
+    # --- The message list interface ---
+    def __len__(self):
+        return len(self._messages)
+
+    def __getitem__(self, index):
+        return self._messages[index]
+
+    def __iter__(self):
+        return iter(self._messages)
+
+    def recent(self, n=RECENT_EVENTS):
+        """The last n messages, oldest first."""
+        return self._messages[-n:]
+
+    # --- Entries and queries ---
+    def entry(self, row):
+        return Entry(self._ticks[row], TYPES[self._types[row]], self._severities[row], self._messages[row])
+
+    def columns(self, first=0, stop=None):
+        """(ticks, type codes, severities, messages) of rows first..stop, as arrays (for export)."""
+        stop = len(self) if stop is None else min(stop, len(self))
+        return (np.array(self._ticks[first:stop], dtype=np.int64), np.array(self._types[first:stop], dtype=np.uint8),
+                np.array(self._severities[first:stop], dtype=np.uint8), self._messages[first:stop])
+
+    def counts(self):
+        """Number of entries of each type."""
+        return {kind: len(rows) for kind, rows in self._by_type.items()}
+
+    def select(self, types=None, start=None, end=None, min_severity=INFO, contains=None, first=0):
+        """Rows (ascending int64 array) of the entries matching every given filter.
+
+        types: iterable of TYPES; start/end: day ordinals (start inclusive, end exclusive);
+        contains: case-insensitive message substring; first: only rows from this one on."""
+        lo = max(first, bisect.bisect_left(self._ticks, start) if start is not None else 0)
+        hi = bisect.bisect_left(self._ticks, end) if end is not None else len(self)
+        if lo >= hi: return np.empty(0, dtype=np.int64)
+        if types is None:
+            rows = np.arange(lo, hi, dtype=np.int64)
+        else:
+            parts = []
+            for kind in types:
+                positions = self._by_type[kind]
+                parts.append(np.array(positions[bisect.bisect_left(positions, lo):bisect.bisect_left(positions, hi)],
+                                      dtype=np.int64))
+            rows = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+        if min_severity > INFO and rows.size:
+            severities = np.frombuffer(self._severities, dtype=np.uint8) # Zero-copy, dropped on return
+            rows = rows[severities[rows] >= min_severity]
+        if contains:
+            needle, messages = contains.lower(), self._messages
+            rows = np.array([row for row in rows.tolist() if needle in messages[row].lower()], dtype=np.int64)
+        return rows
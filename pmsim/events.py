@@ -0,0 +1,64 @@
+# pmsim/events.py
+"""Random event definitions shared by the interactive game and the batch engine."""
+import numpy as np
+
+EVENT_TYPES = ("scandal", "natural_disaster", "economic_boom", "foreign_success")
+
+EVENT_NAMES = {
+    "scandal": ["Minister Resigns", "Corruption Allegations", "Funds Misuse Exposed", "Gaffe Backlash"],
+    "natural_disaster": ["Typhoon Strike", "Kansai Earthquake", "Northern Flooding", "Volcano Warning"],
+    "economic_boom": ["Stock Market Rally", "Major Investment Deal", "Tourism Boom", "Tech Sector Growth"],
+    "foreign_success": ["Trade Deal Signed", "Diplomatic Victory", "Peace Initiative Success", "New Alliance Formed"],
+}
+
+# Approval effect range per event type (before local noise and shock weights)
+EVENT_EFFECT_RANGES = {
+    "scandal": (-8.0, -3.0),
+    "natural_disaster": (-5.0, -2.0),
+    "economic_boom": (3.0, 7.0),
+    "foreign_success": (2.0, 6.0),
+}
+DISASTER_GROWTH_HIT = (0.01, 0.1) # Growth rate lost per unit (scaled by shock weight)
+BOOM_GROWTH_GAIN = (0.01, 0.05) # Growth rate gained everywhere
+SHOCK_NOISE = (0.7, 1.3) # Per-unit multiplier on approval shocks
+
+# Where localized events strike (prefecture or region names; a list means pick one)
+LOCAL_EVENT_TARGETS = {
+    "Kansai Earthquake": "Kansai",
+    "Northern Flooding": "Tohoku",
+    "Typhoon Strike": ["Okinawa", "Kagoshima", "Miyazaki", "Kochi", "Wakayama"],
+    "Volcano Warning": ["Kagoshima", "Kumamoto", "Nagano", "Hokkaido", "Shizuoka"],
+}
+LOCAL_EVENT_NATIONAL_SHARE = 0.3 # Share of a local shock felt everywhere
+LOCAL_EVENT_EPICENTRE_BOOST = 2.0 # Extra multiplier at the epicentre (decaying with distance)
+
+
+def shock_weights(graph, target=None, population=None):
+    """Per-unit shock multiplier: 1 everywhere for national shocks, otherwise a national
+    share plus a boost decaying with hops from the target unit/group.
+
+    Local weights are scaled so their population-weighted mean is 1: a local shock moves
+    national figures as much as a national one and only changes where it lands.
+    population defaults to equal weights."""
+    if target is None: return np.ones(len(graph.names))
+    weights = LOCAL_EVENT_NATIONAL_SHARE + LOCAL_EVENT_EPICENTRE_BOOST * graph.hop_weights(target)
+    population = np.ones(len(weights)) if population is None else np.asarray(population, dtype=float)
+    return weights * (population.sum() / (population @ weights))
+
+
+def disaster_weight_table(graph, population=None):
+    """Shock weights (see shock_weights) for every disaster target, for drawing disasters in bulk.
+
+    Returns (weights, options): weights has one row per target (targets missing from the
+    graph get the national row) and options[k] lists the rows disaster name k of
+    EVENT_NAMES["natural_disaster"] picks from uniformly."""
+    rows, options = [], []
+    for name in EVENT_NAMES["natural_disaster"]:
+        targets = LOCAL_EVENT_TARGETS.get(name)
+        targets = [targets] if isinstance(targets, str) else list(targets or [None])
+        picks = []
+        for target in targets:
+            if target is not None and not graph.knows(target): target = None
+            picks.append(len(rows)); rows.append(shock_weights(graph, target, population))
+        options.append(picks)
+    return np.array(rows), options
@@ -0,0 +1,246 @@
+# pmsim/export.py
+"""Streaming export of game data to CSV, Parquet or Arrow.
+
+Tables are produced as chunks (dicts of equal-length column arrays) and each chunk is
+written as soon as it is built, so exports never hold a whole table in memory:
+
+* ``approval``: day, date, approval (a game's approval_history)
+* ``events``: index, day, date, type, severity, event (the game's full event log)
+* ``units``: day, date, prefecture, approval (only for games created with record_units)
+* ``games`` and ``curves``: the finished-games history store (see pmsim.history), read
+  from SQLite with a cursor chunk by chunk
+
+Parquet and Arrow (IPC file) output need pyarrow, which is imported only when one of
+those formats is used. Run headless as::
+
+    python -m pmsim.export SAVES_OR_DIRS... --out DIR [--format parquet] [--workers N]
+    python -m pmsim.export --history [DB] --out DIR
+
+Each save file gives ``<stem>.<table>.<ext>`` files; directories are searched for
+``*.pkl`` saves and all files are exported in one parallel pass.
+"""
+import argparse
+import concurrent.futures
+import csv
+import os
+import sqlite3
+import sys
+
+import numpy as np
+
+from pmsim import eventlog, history, saves
+from pmsim.calendar_table import CALENDAR
+
+FORMATS = ('csv', 'parquet', 'arrow')
+EXTENSIONS = {'csv': '.csv', 'parquet': '.parquet', 'arrow': '.arrow'}
+DEFAULT_CHUNK_ROWS = 65_536
+
+
+# --- Writers ---
+class _CSVWriter:
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.writer(self.file)
+        self.columns = None
+
+    def write(self, chunk):
+        if self.columns is None:
+            self.columns = list(chunk)
+            self.writer.writerow(self.columns)
+        self.writer.writerows(zip(*(chunk[column].tolist() if isinstance(chunk[column], np.ndarray)
+                                    else chunk[column] for column in self.columns)))
+
+    def close(self):
+        self.file.close()
+
+
+class _ArrowWriter:
+    """Parquet or Arrow IPC writer; the schema is taken from the first chunk."""
+    def __init__(self, path, fmt):
+        try:
+            import pyarrow
+        except ImportError:
+            raise RuntimeError(f"{fmt} export needs pyarrow (pip install pyarrow); csv works without it") from None
+        self.pa, self.path, self.fmt = pyarrow, path, fmt
+        self.writer = self.sink = None
+
+    def write(self, chunk):
+        table = self.pa.table({column: values for column, values in chunk.items()})
+        if self.writer is None:
+            if self.fmt == 'parquet':
+                import pyarrow.parquet
+                self.writer = pyarrow.parquet.ParquetWriter(self.path, table.schema)
+            else:
+                import pyarrow.ipc
+                self.sink = self.pa.OSFile(self.path, 'wb')
+                self.writer = pyarrow.ipc.new_file(self.sink, table.schema)
+        else:
+            table = table.cast(self.writer.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None: self.writer.close()
+        if self.sink is not None: self.sink.close()
+
+
+def write_table(chunks, path, fmt='csv'):
+    """Stream chunks into path in fmt; returns the number of rows written (0 writes no file)."""
+    if fmt not in FORMATS: raise ValueError(f"Unknown format '{fmt}', expected one of {FORMATS}")
+    writer, rows = None, 0
+    try:
+        for chunk in chunks:
+            length = len(next(iter(chunk.values())))
+            if length == 0: continue
+            if writer is None: writer = _CSVWriter(path) if fmt == 'csv' else _ArrowWriter(path, fmt)
+            writer.write(chunk)
+            rows += length
+    finally:
+        if writer is not None: writer.close()
+    return rows
+
+
+# --- Game tables ---
+def _dates(ordinals):
+    return CALENDAR.to_datetime64(ordinals).astype('datetime64[D]')
+
+def approval_chunks(sim, chunk_rows=DEFAULT_CHUNK_ROWS):
+    ordinals = np.asarray(sim.approval_ordinals, dtype=np.int64)
+    start = ordinals[0] if ordinals.size else 0
+    for first in range(0, len(sim.approval_history), chunk_rows):
+        block = ordinals[first:first + chunk_rows]
+        yield {'day': block - start, 'date': _dates(block),
+               'approval': np.asarray(sim.approval_history[first:first + chunk_rows], dtype=float)}
+
+def event_chunks(sim, chunk_rows=DEFAULT_CHUNK_ROWS):
+    start = sim.approval_ordinals[0] if sim.approval_ordinals else 0
+    for first in range(0, len(sim.events), chunk_rows):
+        ticks, types, severities, messages = sim.events.columns(first, first + chunk_rows)
+        yield {'index': np.arange(first, first + len(messages)), 'day': ticks - start, 'date': _dates(ticks),
+               'type': [eventlog.TYPES[code] for code in types.tolist()],
+               'severity': [eventlog.SEVERITIES[code] for code in severities.tolist()], 'event': messages}
+
+def unit_chunks(sim, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Long-format prefecture approval series (nothing if the game did not record them)."""
+    series = getattr(sim, 'unit_history', None)
+    if not series: return
+    names = np.array(sim.hierarchy.prefecture_names)
+    ordinals = np.asarray(sim.approval_ordinals, dtype=np.int64)
+    days_per_chunk = max(1, chunk_rows // len(names))
+    for first in range(0, len(series), days_per_chunk):
+        block = ordinals[first:first + days_per_chunk]
+        n = min(len(block), len(series) - first)
+        yield {'day': np.repeat(block[:n] - ordinals[0], len(names)), 'date': np.repeat(_dates(block[:n]), len(names)),
+               'prefecture': np.tile(names, n).tolist(),
+               'approval': np.concatenate(series[first:first + n]).astype(float)}
+
+GAME_TABLES = {'approval': approval_chunks, 'events': event_chunks, 'units': unit_chunks}
+
+
+def export_simulation(sim, out_dir, stem, fmt='csv', chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Write every non-empty game table of sim to out_dir/<stem>.<table>.<ext>; returns the paths."""
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for table, chunks in GAME_TABLES.items():
+        path = os.path.join(out_dir, f"{stem}.{table}{EXTENSIONS[fmt]}")
+        if write_table(chunks(sim, chunk_rows), path, fmt): paths.append(path)
+    return paths
+
+def export_save(path, out_dir, fmt='csv', chunk_rows=DEFAULT_CHUNK_ROWS):
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return export_simulation(saves.load(path), out_dir, stem, fmt, chunk_rows)
+
+def export_saves(paths, out_dir, fmt='csv', workers=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Export many save files in parallel (one process per file); returns {path: outputs or error}."""
+    results = {}
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if workers <= 1 or len(paths) <= 1:
+        for path in paths:
+            try: results[path] = export_save(path, out_dir, fmt, chunk_rows)
+            except Exception as e: results[path] = e # Report the file and carry on with the rest
+        return results
+    with concurrent.futures.ProcessPoolExecutor(min(workers, len(paths))) as pool:
+        futures = {pool.submit(export_save, path, out_dir, fmt, chunk_rows): path for path in paths}
+        for future in concurrent.futures.as_completed(futures):
+            try: results[futures[future]] = future.result()
+            except Exception as e: results[futures[future]] = e
+    return results
+
+
+# --- History store ---
+def history_chunks(db_path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Finished games (without curves) straight from a cursor over the history database."""
+    columns = ['id'] + [column for column in history.COLUMNS if column != 'curve']
+    connection = sqlite3.connect(db_path)
+    try:
+        cursor = connection.execute(f"SELECT {', '.join(columns)} FROM games ORDER BY id")
+        while True:
+            rows = cursor.fetchmany(chunk_rows)
+            if not rows: break
+            yield {column: list(values) for column, values in zip(columns, zip(*rows))}
+    finally:
+        connection.close()
+
+def curve_chunks(db_path, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Long-format downsampled approval curves: game (row id), point, approval."""
+    connection = sqlite3.connect(db_path)
+    try:
+        cursor = connection.execute("SELECT id, curve FROM games ORDER BY id")
+        games_per_chunk = max(1, chunk_rows // history.CURVE_POINTS)
+        while True:
+            rows = cursor.fetchmany(games_per_chunk)
+            if not rows: break
+            curves = [np.frombuffer(curve, dtype=np.float32) for _, curve in rows]
+            yield {'game': np.repeat([game for game, _ in rows], [len(c) for c in curves]),
+                   'point': np.concatenate([np.arange(len(c)) for c in curves]),
+                   'approval': np.concatenate(curves).astype(float)}
+    finally:
+        connection.close()
+
+def export_history(db_path, out_dir, fmt='csv', chunk_rows=DEFAULT_CHUNK_ROWS):
+    if not os.path.exists(db_path): raise FileNotFoundError(f"No game history database at {db_path}")
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for table, chunks in (('games', history_chunks), ('curves', curve_chunks)):
+        path = os.path.join(out_dir, f"history.{table}{EXTENSIONS[fmt]}")
+        if write_table(chunks(db_path, chunk_rows), path, fmt): paths.append(path)
+    return paths
+
+
+# --- Command line ---
+def find_saves(inputs):
+    """Save files named directly, plus every *.pkl file under the named directories."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for root, _, names in os.walk(item):
+                paths += sorted(os.path.join(root, name) for name in names if name.endswith('.pkl'))
+        else:
+            paths.append(item)
+    return paths
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m pmsim.export", description=__doc__.split('\n\n')[0])
+    parser.add_argument('inputs', nargs='*', help="save files or directories of saves")
+    parser.add_argument('--out', required=True, help="output directory")
+    parser.add_argument('--format', choices=FORMATS, default='csv')
+    parser.add_argument('--workers', type=int, default=None, help="parallel processes (default: all cores)")
+    parser.add_argument('--chunk-rows', type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument('--history', nargs='?', const=history.DEFAULT_DB, default=None,
+                        help="also export the finished-games database (default location if no path)")
+    args = parser.parse_args(argv)
+    if not args.inputs and args.history is None: parser.error("nothing to export (give saves or --history)")
+
+    failed = 0
+    if args.history is not None:
+        for path in export_history(args.history, args.out, args.format, args.chunk_rows): print(path)
+    for source, result in export_saves(find_saves(args.inputs), args.out, args.format, args.workers,
+                                       args.chunk_rows).items():
+        if isinstance(result, Exception):
+            failed += 1; print(f"{source}: {result}", file=sys.stderr)
+        else:
+            for path in result: print(path)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
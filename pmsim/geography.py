@@ -0,0 +1,179 @@
+# pmsim/geography.py
+"""Prefecture adjacency graph (CSR sparse matrix) and graph-based spreading/diffusion.
+
+The graph is stored in compressed sparse row form with plain NumPy arrays, so every
+operation here is a sparse matrix-vector product whose cost scales with the number of
+edges. That keeps the same code usable for municipality-sized graphs.
+"""
+import numpy as np
+
+# Regions (same grouping as the Regional Analysis tab)
+REGIONS = {
+    "Hokkaido": ["Hokkaido"],
+    "Tohoku": ["Aomori", "Iwate", "Miyagi", "Akita", "Yamagata", "Fukushima"],
+    "Kanto": ["Ibaraki", "Tochigi", "Gunma", "Saitama", "Chiba", "Tokyo", "Kanagawa"],
+    "Chubu": ["Niigata", "Toyama", "Ishikawa", "Fukui", "Yamanashi", "Nagano", "Gifu", "Shizuoka", "Aichi"],
+    "Kansai": ["Mie", "Shiga", "Kyoto", "Osaka", "Hyogo", "Nara", "Wakayama"],
+    "Chugoku": ["Tottori", "Shimane", "Okayama", "Hiroshima", "Yamaguchi"],
+    "Shikoku": ["Tokushima", "Kagawa", "Ehime", "Kochi"],
+    "Kyushu & Okinawa": ["Fukuoka", "Saga", "Nagasaki", "Kumamoto", "Oita", "Miyazaki", "Kagoshima", "Okinawa"]
+}
+
+# Land borders plus the fixed links between the main islands (Seikan Tunnel, Kanmon Straits,
+# Honshu-Shikoku bridges, Tokyo Bay Aqua-Line) and the Kagoshima-Okinawa sea route
+PREFECTURE_BORDERS = [
+    ("Hokkaido", "Aomori"),
+    ("Aomori", "Iwate"), ("Aomori", "Akita"),
+    ("Iwate", "Akita"), ("Iwate", "Miyagi"),
+    ("Miyagi", "Akita"), ("Miyagi", "Yamagata"), ("Miyagi", "Fukushima"),
+    ("Akita", "Yamagata"),
+    ("Yamagata", "Fukushima"), ("Yamagata", "Niigata"),
+    ("Fukushima", "Niigata"), ("Fukushima", "Gunma"), ("Fukushima", "Tochigi"), ("Fukushima", "Ibaraki"),
+    ("Ibaraki", "Tochigi"), ("Ibaraki", "Saitama"), ("Ibaraki", "Chiba"),
+    ("Tochigi", "Gunma"), ("Tochigi", "Saitama"),
+    ("Gunma", "Saitama"), ("Gunma", "Nagano"), ("Gunma", "Niigata"),
+    ("Saitama", "Nagano"), ("Saitama", "Yamanashi"), ("Saitama", "Tokyo"), ("Saitama", "Chiba"),
+    ("Chiba", "Tokyo"), ("Chiba", "Kanagawa"),
+    ("Tokyo", "Kanagawa"), ("Tokyo", "Yamanashi"),
+    ("Kanagawa", "Yamanashi"), ("Kanagawa", "Shizuoka"),
+    ("Niigata", "Nagano"), ("Niigata", "Toyama"),
+    ("Toyama", "Nagano"), ("Toyama", "Gifu"), ("Toyama", "Ishikawa"),
+    ("Ishikawa", "Gifu"), ("Ishikawa", "Fukui"),
+    ("Fukui", "Gifu"), ("Fukui", "Shiga"), ("Fukui", "Kyoto"),
+    ("Yamanashi", "Shizuoka"), ("Yamanashi", "Nagano"),
+    ("Nagano", "Shizuoka"), ("Nagano", "Aichi"), ("Nagano", "Gifu"),
+    ("Gifu", "Aichi"), ("Gifu", "Mie"), ("Gifu", "Shiga"),
+    ("Shizuoka", "Aichi"),
+    ("Aichi", "Mie"),
+    ("Mie", "Shiga"), ("Mie", "Kyoto"), ("Mie", "Nara"), ("Mie", "Wakayama"),
+    ("Shiga", "Kyoto"),
+    ("Kyoto", "Nara"), ("Kyoto", "Osaka"), ("Kyoto", "Hyogo"),
+    ("Osaka", "Nara"), ("Osaka", "Wakayama"), ("Osaka", "Hyogo"),
+    ("Hyogo", "Okayama"), ("Hyogo", "Tottori"), ("Hyogo", "Tokushima"),
+    ("Nara", "Wakayama"),
+    ("Tottori", "Okayama"), ("Tottori", "Shimane"), ("Tottori", "Hiroshima"),
+    ("Shimane", "Hiroshima"), ("Shimane", "Yamaguchi"),
+    ("Okayama", "Hiroshima"), ("Okayama", "Kagawa"),
+    ("Hiroshima", "Yamaguchi"), ("Hiroshima", "Ehime"),
+    ("Yamaguchi", "Fukuoka"),
+    ("Tokushima", "Kagawa"), ("Tokushima", "Ehime"), ("Tokushima", "Kochi"),
+    ("Kagawa", "Ehime"),
+    ("Ehime", "Kochi"),
+    ("Fukuoka", "Saga"), ("Fukuoka", "Kumamoto"), ("Fukuoka", "Oita"),
+    ("Saga", "Nagasaki"),
+    ("Kumamoto", "Oita"), ("Kumamoto", "Miyazaki"), ("Kumamoto", "Kagoshima"),
+    ("Oita", "Miyazaki"),
+    ("Miyazaki", "Kagoshima"),
+    ("Kagoshima", "Okinawa"),
+]
+
+DIFFUSION_RATE = 0.02 # Share of the gap to the neighbour average closed per day
+SHOCK_DECAY = 0.5 # Shock strength multiplier per hop away from the epicentre
+SHOCK_MAX_HOPS = 3
+
+
+class CSRMatrix:
+    """Minimal compressed-sparse-row matrix with (batched) matrix-vector products."""
+    def __init__(self, indptr, indices, data, n_rows):
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int64)
+        self.data = np.asarray(data, dtype=float)
+        self.n_rows = n_rows
+        self.row_ids = np.repeat(np.arange(n_rows), np.diff(self.indptr)) # Row of each stored entry
+
+    @classmethod
+    def from_edges(cls, n_rows, rows, cols, data=None):
+        """Build from COO triplets (duplicates are summed)."""
+        rows = np.asarray(rows, dtype=np.int64); cols = np.asarray(cols, dtype=np.int64)
+        data = np.ones(len(rows)) if data is None else np.asarray(data, dtype=float)
+        order = np.lexsort((cols, rows))
+        rows, cols, data = rows[order], cols[order], data[order]
+        if len(rows): # Merge duplicate (row, col) entries
+            keep = np.ones(len(rows), dtype=bool); keep[1:] = (rows[1:] != rows[:-1]) | (cols[1:] != cols[:-1])
+            group = np.cumsum(keep) - 1
+            data = np.bincount(group, weights=data); rows, cols = rows[keep], cols[keep]
+        indptr = np.zeros(n_rows + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n_rows), out=indptr[1:])
+        return cls(indptr, cols, data, n_rows)
+
+    @property
+    def nnz(self):
+        return len(self.indices)
+
+    def row_sums(self):
+        return self.matvec(np.ones(self.n_rows))
+
+    def matvec(self, x):
+        """A @ x along the last axis of x (x may carry leading batch axes)."""
+        x = np.asarray(x)
+        products = x[..., self.indices] * self.data
+        if x.ndim == 1: return np.bincount(self.row_ids, weights=products, minlength=self.n_rows)
+        # Batched: segment sums via a prefix sum, which also handles empty rows
+        cumulative = np.concatenate([np.zeros(products.shape[:-1] + (1,)), np.cumsum(products, axis=-1)], axis=-1)
+        return cumulative[..., self.indptr[1:]] - cumulative[..., self.indptr[:-1]]
+
+    def scaled_rows(self, factors):
+        """New matrix with row i multiplied by factors[i]."""
+        return CSRMatrix(self.indptr, self.indices, self.data * np.asarray(factors)[self.row_ids], self.n_rows)
+
+
+class AdjacencyGraph:
+    """Undirected unit graph with the precomputed operators used by the simulation.
+
+    groups maps a group name (region, or prefecture at municipality scale) to unit names
+    so shocks can target it by name; it defaults to the prefecture-level REGIONS."""
+    def __init__(self, names, edges, groups=None):
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.groups = REGIONS if groups is None else groups
+        pairs = np.array([(self.index[a], self.index[b]) for a, b in edges
+                          if a in self.index and b in self.index], dtype=np.int64).reshape(-1, 2)
+        rows = np.concatenate([pairs[:, 0], pairs[:, 1]]); cols = np.concatenate([pairs[:, 1], pairs[:, 0]])
+        self.adjacency = CSRMatrix.from_edges(len(self.names), rows, cols)
+        self.adjacency.data[:] = 1.0 # Unweighted even if an edge was listed twice
+        self.degree = self.adjacency.row_sums()
+        # Row-normalised adjacency: (mean_neighbours @ x)[i] is the average of i's neighbours
+        self.mean_neighbours = self.adjacency.scaled_rows(1.0 / np.maximum(self.degree, 1.0))
+        self.has_neighbours = self.degree > 0 # Isolated units keep their own value
+
+    def neighbours(self, name):
+        i = self.index[name]
+        return [self.names[j] for j in self.adjacency.indices[self.adjacency.indptr[i]:self.adjacency.indptr[i + 1]]]
+
+    def knows(self, name):
+        """Whether name is a unit or group shocks can target."""
+        return name in self.groups or name in self.index
+
+    def indicator(self, targets):
+        """0/1 vector marking the named units; group names expand to their members."""
+        vector = np.zeros(len(self.names))
+        for target in ([targets] if isinstance(targets, str) else targets):
+            for name in self.groups.get(target, [target]):
+                if name not in self.index: raise KeyError(f"Unknown prefecture or region: {target}")
+                vector[self.index[name]] = 1.0
+        return vector
+
+    def hop_weights(self, targets, decay=SHOCK_DECAY, max_hops=SHOCK_MAX_HOPS):
+        """Shock weight per unit: 1 at the targets, decay**h at h hops away, 0 beyond max_hops."""
+        reached = self.indicator(targets)
+        weights = reached.copy()
+        for hop in range(1, max_hops + 1):
+            frontier = (self.adjacency.matvec(reached) > 0) & (reached == 0)
+            if not frontier.any(): break
+            weights[frontier] = decay ** hop
+            reached[frontier] = 1.0
+        return weights
+
+    def diffuse(self, values, rate=DIFFUSION_RATE, days=1):
+        """Move each value towards its neighbour average; k days collapse into one blend step."""
+        blend = 1.0 - (1.0 - rate) ** days
+        return values + blend * self.has_neighbours * (self.mean_neighbours.matvec(values) - values)
+
+
+_BUILTIN_GRAPHS = {}
+
+def prefecture_graph(names):
+    """Adjacency graph for the given prefecture names (cached per name tuple)."""
+    key = tuple(names)
+    if key not in _BUILTIN_GRAPHS: _BUILTIN_GRAPHS[key] = AdjacencyGraph(key, PREFECTURE_BORDERS)
+    return _BUILTIN_GRAPHS[key]
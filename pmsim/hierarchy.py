@@ -0,0 +1,67 @@
+# pmsim/hierarchy.py
+"""Unit -> prefecture -> region membership and segmented reductions over it.
+
+Units are stored grouped by prefecture (each prefecture's units form one contiguous
+block), so prefecture totals are a single ``np.add.reduceat`` over the unit axis. All
+reductions work on the last axis and accept leading batch axes.
+"""
+import numpy as np
+
+
+class Hierarchy:
+    """Membership tables for units, prefectures and regions."""
+    def __init__(self, unit_prefecture, prefecture_names, prefecture_region, region_names):
+        self.unit_prefecture = np.asarray(unit_prefecture, dtype=np.int64)
+        self.prefecture_names = list(prefecture_names)
+        self.prefecture_region = np.asarray(prefecture_region, dtype=np.int64)
+        self.region_names = list(region_names)
+        n_prefectures = len(self.prefecture_names)
+
+        if np.any(np.diff(self.unit_prefecture) < 0):
+            raise ValueError("Units must be ordered by prefecture (contiguous blocks)")
+        counts = np.bincount(self.unit_prefecture, minlength=n_prefectures)
+        if counts.size != n_prefectures or np.any(counts == 0):
+            raise ValueError("Every prefecture needs at least one unit")
+        self.units_per_prefecture = counts
+        self.block_starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        self.is_identity = len(self.unit_prefecture) == n_prefectures
+        # One-hot prefecture -> region matrix (regions need not be contiguous)
+        self.region_matrix = np.zeros((n_prefectures, len(self.region_names)))
+        self.region_matrix[np.arange(n_prefectures), self.prefecture_region] = 1.0
+
+    @classmethod
+    def identity(cls, prefecture_names, regions):
+        """One unit per prefecture; regions is a {region: [prefecture names]} mapping."""
+        region_names = list(regions)
+        region_of = {name: r for r, members in enumerate(regions.values()) for name in members}
+        return cls(np.arange(len(prefecture_names)), prefecture_names,
+                   [region_of[name] for name in prefecture_names], region_names)
+
+    @property
+    def n_units(self):
+        return len(self.unit_prefecture)
+
+    def units_of(self, prefecture_index):
+        start = self.block_starts[prefecture_index]
+        return slice(start, start + self.units_per_prefecture[prefecture_index])
+
+    # --- Segmented reductions ---
+    def prefecture_sum(self, values):
+        values = np.asarray(values, dtype=float)
+        if self.is_identity: return values
+        return np.add.reduceat(values, self.block_starts, axis=-1)
+
+    def prefecture_mean(self, values, weights):
+        """Weighted mean of unit values within each prefecture."""
+        if self.is_identity: return np.asarray(values, dtype=float)
+        return self.prefecture_sum(np.asarray(values) * weights) / self.prefecture_sum(weights)
+
+    def region_sum(self, prefecture_values):
+        return np.asarray(prefecture_values, dtype=float) @ self.region_matrix
+
+    def region_mean(self, prefecture_values, prefecture_weights):
+        return self.region_sum(np.asarray(prefecture_values) * prefecture_weights) / self.region_sum(prefecture_weights)
+
+    def expand(self, prefecture_values):
+        """Broadcast per-prefecture values down to units."""
+        return np.asarray(prefecture_values)[..., self.unit_prefecture]
@@ -0,0 +1,141 @@
+# pmsim/history.py
+"""Local record of finished games (high scores and game history) in SQLite.
+
+One row per finished game stores who played, on which map, the in-game start and
+end dates, the score, why the game ended, and the approval curve downsampled to
+CURVE_POINTS values (float32 blob). Indexes cover the leaderboard (score) and the
+usual filters (party, PM name, cause, most recent). Screens query this table directly
+and never open save files.
+
+Writes are buffered and sent in batches of ``batch_size`` rows per transaction; call
+flush() to write immediately. Every Simulation has a game_id, so the same game
+(e.g. a finished game loaded again from a save) is recorded once.
+"""
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+from pmsim.calendar_table import CALENDAR
+
+DEFAULT_DB = os.environ.get('PMSIM_HISTORY_DB',
+                            os.path.join(os.path.expanduser('~'), '.local', 'share', 'pmsim', 'history.sqlite3'))
+CURVE_POINTS = 100
+DEFAULT_BATCH_SIZE = 64
+CAUSES = ('election', 'conceded', 'resigned', 'unknown') # Values of the cause column
+
+COLUMNS = ('game_id', 'pm_name', 'party_name', 'dataset', 'scale', 'start_date', 'end_date',
+           'days', 'score', 'cause', 'reason', 'finished_at', 'curve')
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    game_id TEXT NOT NULL UNIQUE,
+    pm_name TEXT NOT NULL,
+    party_name TEXT NOT NULL,
+    dataset TEXT NOT NULL,
+    scale TEXT NOT NULL,
+    start_date TEXT NOT NULL,
+    end_date TEXT NOT NULL,
+    days INTEGER NOT NULL,
+    score REAL NOT NULL,
+    cause TEXT NOT NULL,
+    reason TEXT NOT NULL,
+    finished_at REAL NOT NULL,
+    curve BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_by_score ON games (score DESC);
+CREATE INDEX IF NOT EXISTS games_by_party ON games (party_name, score DESC);
+CREATE INDEX IF NOT EXISTS games_by_pm ON games (pm_name, score DESC);
+CREATE INDEX IF NOT EXISTS games_by_cause ON games (cause, score DESC);
+CREATE INDEX IF NOT EXISTS games_by_finished ON games (finished_at DESC);
+"""
+
+
+def downsample(values, n_points=CURVE_POINTS):
+    """Resample a curve to at most n_points values (linear interpolation, ends kept)."""
+    values = np.asarray(values, dtype=float)
+    if values.size <= n_points: return values
+    return np.interp(np.linspace(0, values.size - 1, n_points), np.arange(values.size), values)
+
+
+def game_record(sim):
+    """Row values (dict keyed by COLUMNS) for a finished Simulation."""
+    ordinals = sim.approval_ordinals
+    return {
+        'game_id': sim.game_id, 'pm_name': sim.pm_name, 'party_name': sim.party_name,
+        'dataset': sim.dataset_name, 'scale': sim.scale,
+        'start_date': CALENDAR.to_date(ordinals[0]).isoformat(),
+        'end_date': CALENDAR.to_date(ordinals[-1]).isoformat(),
+        'days': int(ordinals[-1] - ordinals[0]), 'score': float(sim.calculate_final_score()),
+        'cause': sim.game_over_cause or 'unknown', 'reason': sim.game_over_reason or "Game Ended",
+        'finished_at': time.time(),
+        'curve': downsample(sim.approval_history).astype(np.float32).tobytes(),
+    }
+
+
+class GameHistory:
+    """SQLite store of finished games with buffered, batched inserts."""
+    def __init__(self, path=DEFAULT_DB, batch_size=DEFAULT_BATCH_SIZE):
+        if path != ':memory:': os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+        self._pending = []
+
+    # --- Writing ---
+    def add(self, record):
+        """Queue one game_record (written once batch_size records are queued)."""
+        self._pending.append(tuple(record[column] for column in COLUMNS))
+        if len(self._pending) >= self.batch_size: self.flush()
+
+    def record(self, sim, flush=True):
+        """Record a finished Simulation (written right away unless flush is False)."""
+        self.add(game_record(sim))
+        if flush: self.flush()
+
+    def flush(self):
+        if not self._pending: return
+        with self.connection:
+            self.connection.executemany(f"INSERT OR IGNORE INTO games ({', '.join(COLUMNS)}) "
+                                        f"VALUES ({', '.join('?' * len(COLUMNS))})", self._pending)
+        self._pending = []
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # --- Queries ---
+    def query(self, party=None, pm_name=None, cause=None, order='score', limit=50, offset=0):
+        """Finished games (dicts without the curve), best score first or (order='recent')
+        most recent first, optionally filtered by exact party, PM name or cause."""
+        if order not in ('score', 'recent'): raise ValueError(f"Unknown order '{order}'")
+        filters, arguments = [], []
+        for column, value in (('party_name', party), ('pm_name', pm_name), ('cause', cause)):
+            if value is not None: filters.append(f"{column} = ?"); arguments.append(value)
+        where = f"WHERE {' AND '.join(filters)}" if filters else ""
+        order_by = "score DESC" if order == 'score' else "finished_at DESC"
+        columns = [column for column in COLUMNS if column != 'curve']
+        rows = self.connection.execute(f"SELECT id, {', '.join(columns)} FROM games {where} "
+                                       f"ORDER BY {order_by} LIMIT ? OFFSET ?", arguments + [limit, offset])
+        return [dict(zip(['id'] + columns, row)) for row in rows]
+
+    def curve(self, row_id):
+        """Downsampled approval curve of one game (by row id), or None."""
+        row = self.connection.execute("SELECT curve FROM games WHERE id = ?", (row_id,)).fetchone()
+        return None if row is None else np.frombuffer(row[0], dtype=np.float32)
+
+    def parties(self):
+        """Distinct party names (for filter pickers)."""
+        return [name for (name,) in self.connection.execute("SELECT DISTINCT party_name FROM games ORDER BY party_name")]
+
+    def count(self):
+        return self.connection.execute("SELECT COUNT(*) FROM games").fetchone()[0]
@@ -0,0 +1,252 @@
+# pmsim/instrument.py
+"""Opt-in instrumentation: per-phase timing counters and structured debug events.
+
+Hot paths are wrapped with ``@timed(name, category)``. While instrumentation is off
+(the default) a wrapped call costs one flag check. Once it is enabled, every call
+adds to the counters for its name:
+
+* count and cumulative seconds
+* latency percentiles over the last RESERVOIR_SIZE calls (a ring buffer)
+* net memory blocks allocated during the call (sys.getallocatedblocks before and
+  after, so frees inside the call are netted out)
+
+Categories group the names: tick, policy, event, election, approval and gui. With
+trace=True each call is also kept as a Chrome trace event (up to MAX_TRACE_EVENTS);
+load the dump in chrome://tracing or Perfetto.
+
+Structured events replace debug prints. Call sites check the level before building
+anything, so a disabled event costs one comparison::
+
+    if instrument.level <= instrument.DEBUG:
+        instrument.emit(instrument.DEBUG, 'election.votes', keep=keep, oust=oust)
+
+Events are kept (last MAX_EVENTS) and go into the trace; with echo=True they are
+also printed to stderr. Setting PMSIM_LOG_LEVEL (debug/info/warning), PMSIM_PROFILE
+(stats JSON path) or PMSIM_TRACE (Chrome trace path) turns this on for a whole run
+via configure_from_env, which writes the files at exit.
+"""
+import atexit
+import collections
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+import numpy as np
+
+DEBUG, INFO, WARNING, OFF = 10, 20, 30, 100
+LEVELS = {'debug': DEBUG, 'info': INFO, 'warning': WARNING, 'off': OFF}
+CATEGORIES = ('tick', 'policy', 'event', 'election', 'approval', 'gui')
+RESERVOIR_SIZE = 4096
+MAX_TRACE_EVENTS = 200_000
+MAX_EVENTS = 10_000
+PERCENTILES = (50, 90, 99)
+
+level = OFF # Events below this level are skipped by their call sites
+
+
+class Counter:
+    """Calls of one instrumented name."""
+    __slots__ = ('name', 'category', 'count', 'total', 'max', 'blocks', 'latencies')
+
+    def __init__(self, name, category):
+        self.name, self.category = name, category
+        self.count, self.total, self.max, self.blocks = 0, 0.0, 0.0, 0
+        self.latencies = np.zeros(RESERVOIR_SIZE)
+
+    def add(self, seconds, blocks):
+        self.latencies[self.count % RESERVOIR_SIZE] = seconds
+        self.count += 1
+        self.total += seconds
+        self.blocks += blocks
+        if seconds > self.max: self.max = seconds
+
+    def summary(self):
+        recent = self.latencies[:min(self.count, RESERVOIR_SIZE)]
+        percentiles = np.percentile(recent, PERCENTILES) if recent.size else [0.0] * len(PERCENTILES)
+        return {'category': self.category, 'count': self.count, 'total': self.total,
+                'mean': self.total / self.count if self.count else 0.0, 'max': self.max,
+                **{f'p{p}': float(value) for p, value in zip(PERCENTILES, percentiles)},
+                'alloc_blocks': self.blocks}
+
+
+class Instruments:
+    """Counters, trace and events of one process (use the module-level INSTRUMENTS)."""
+    def __init__(self):
+        self.enabled = False
+        self.trace = False
+        self.memory = True
+        self.echo = False
+        self.origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters = {}
+            self.trace_events = []
+            self.events = collections.deque(maxlen=MAX_EVENTS)
+
+    def call(self, name, category, function, args, kwargs):
+        blocks = sys.getallocatedblocks() if self.memory else 0
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            end = time.perf_counter()
+            blocks = sys.getallocatedblocks() - blocks if self.memory else 0
+            self.record(name, category, start, end, blocks)
+
+    def record(self, name, category, start, end, blocks=0):
+        with self._lock:
+            counter = self.counters.get(name)
+            if counter is None: counter = self.counters[name] = Counter(name, category)
+            counter.add(end - start, blocks)
+            if self.trace and len(self.trace_events) < MAX_TRACE_EVENTS:
+                self.trace_events.append({'name': name, 'cat': category, 'ph': 'X', 'ts': (start - self.origin) * 1e6,
+                                          'dur': (end - start) * 1e6, 'pid': os.getpid(),
+                                          'tid': threading.get_ident()})
+
+    def emit(self, event_level, name, fields):
+        now = time.perf_counter()
+        event = {'time': now - self.origin, 'level': event_level, 'name': name, **fields}
+        with self._lock:
+            self.events.append(event)
+            if self.trace and len(self.trace_events) < MAX_TRACE_EVENTS:
+                self.trace_events.append({'name': name, 'cat': 'event', 'ph': 'i', 's': 't',
+                                          'ts': (now - self.origin) * 1e6, 'pid': os.getpid(),
+                                          'tid': threading.get_ident(), 'args': fields})
+        if self.echo:
+            details = ' '.join(f"{key}={value}" for key, value in fields.items())
+            print(f"[{_level_name(event_level)}] {name} {details}".rstrip(), file=sys.stderr)
+
+    def stats(self):
+        """{name: summary dict} of every instrumented name called so far."""
+        with self._lock:
+            return {name: counter.summary() for name, counter in sorted(self.counters.items())}
+
+    def snapshot(self, name):
+        """(count, total seconds) for one name, cheap enough to poll from a UI timer."""
+        counter = self.counters.get(name)
+        return (counter.count, counter.total) if counter is not None else (0, 0.0)
+
+
+INSTRUMENTS = Instruments()
+
+def _level_name(value):
+    return next((name for name, number in LEVELS.items() if number == value), str(value))
+
+
+# --- Instrumenting code ---
+def timed(name, category):
+    """Decorator counting and timing calls under name while instrumentation is enabled."""
+    if category not in CATEGORIES: raise ValueError(f"Unknown category '{category}', expected one of {CATEGORIES}")
+    def wrap(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not INSTRUMENTS.enabled: return function(*args, **kwargs)
+            return INSTRUMENTS.call(name, category, function, args, kwargs)
+        return wrapper
+    return wrap
+
+def emit(event_level, name, **fields):
+    """Record a structured event (call sites check ``level`` first)."""
+    if event_level >= level: INSTRUMENTS.emit(event_level, name, fields)
+
+
+# --- Control ---
+def enable(trace=False, memory=True):
+    """Start collecting counters (and Chrome trace events with trace=True)."""
+    INSTRUMENTS.trace, INSTRUMENTS.memory = trace, memory
+    INSTRUMENTS.enabled = True
+
+def disable():
+    INSTRUMENTS.enabled = False
+
+def set_level(value, echo=None):
+    """Set the event level (a LEVELS name or number); echo=True also prints events to stderr."""
+    global level
+    level = LEVELS[value.lower()] if isinstance(value, str) else int(value)
+    if echo is not None: INSTRUMENTS.echo = echo
+
+def reset():
+    INSTRUMENTS.reset()
+
+def stats():
+    return INSTRUMENTS.stats()
+
+def events(min_level=DEBUG, name=None):
+    """Recorded structured events at or above min_level (optionally with an exact name)."""
+    return [event for event in list(INSTRUMENTS.events)
+            if event['level'] >= min_level and (name is None or event['name'] == name)]
+
+
+# --- Sampling (for live displays) ---
+def process_memory():
+    """Resident memory of this process in bytes (peak RSS where current RSS is unavailable), or None."""
+    try:
+        with open('/proc/self/statm') as f: return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024 # Bytes on macOS, KiB elsewhere
+
+
+class Sampler:
+    """Rates between successive samples of the counters (cheap enough for a UI timer).
+
+    sample(tick) returns simulated days per second, and for each watched name the
+    calls per second and mean milliseconds per call over the interval since the
+    previous sample, plus the process memory."""
+    def __init__(self, names):
+        self.names = tuple(names)
+        self._last = None
+
+    def sample(self, tick, now=None):
+        now = time.perf_counter() if now is None else now
+        counts = {name: INSTRUMENTS.snapshot(name) for name in self.names}
+        last, self._last = self._last, (now, tick, counts)
+        if last is None: return None
+        elapsed = max(now - last[0], 1e-9)
+        result = {'interval': elapsed, 'days_per_second': (tick - last[1]) / elapsed, 'memory': process_memory()}
+        for name in self.names:
+            calls = counts[name][0] - last[2][name][0]
+            seconds = counts[name][1] - last[2][name][1]
+            result[name] = {'calls_per_second': calls / elapsed, 'ms_per_call': 1000 * seconds / calls if calls else None}
+        return result
+
+
+# --- Output ---
+def _write(path, value):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(value, f, indent=1, default=float) # NumPy scalars in event fields
+
+def dump_json(path):
+    """Counters and events as JSON."""
+    _write(path, {'stats': stats(), 'events': events()})
+
+def dump_chrome_trace(path):
+    """Trace events in the Chrome trace format (enable(trace=True) to collect them)."""
+    with INSTRUMENTS._lock: trace_events = list(INSTRUMENTS.trace_events)
+    _write(path, {'traceEvents': trace_events, 'displayTimeUnit': 'ms'})
+
+def configure_from_env(environ=os.environ):
+    """Apply PMSIM_LOG_LEVEL / PMSIM_PROFILE / PMSIM_TRACE; returns True if anything was turned on."""
+    log_level, profile, trace = (environ.get(key) for key in ('PMSIM_LOG_LEVEL', 'PMSIM_PROFILE', 'PMSIM_TRACE'))
+    if log_level: set_level(log_level, echo=True)
+    if profile or trace:
+        enable(trace=bool(trace))
+        if profile: atexit.register(dump_json, profile)
+        if trace: atexit.register(dump_chrome_trace, trace)
+    return bool(log_level or profile or trace)
@@ -0,0 +1,118 @@
+# pmsim/kernels.py
+"""Optional compiled kernels for the batch engine, with the NumPy code as the reference.
+
+BatchSimulation runs on one of two backends:
+
+* ``numpy``: the whole-array operations in pmsim.batch (always available; the reference)
+* ``numba``: the daily update fused into one compiled pass per game. It needs numba,
+  which is imported only here and only if installed.
+
+The backend is chosen at runtime: BatchSimulation(backend=...) or the PMSIM_BACKEND
+environment variable, where ``auto`` (the default) picks numba when it can be imported
+and NumPy otherwise. Asking for numba when it is missing raises ValueError.
+
+For one day the NumPy path makes a separate pass over the unit arrays for each of:
+population growth, migration, every drift field, every clipped field, the rounded
+population weights, the weighted approval and the two sums. daily_changes does all of
+that in one loop over each game's units, so every value is read and written once.
+The results are identical, not just close:
+
+* random numbers are still drawn by NumPy, in the same order
+* the growth factor (a pow) and the diffusion (a sparse product) are computed with
+  NumPy too
+* the kernel does the same IEEE operations element by element
+* sums use NumPy's pairwise summation order (_pairwise_sum)
+
+Without numba the kernels are plain Python. They stay importable (slowly) so the
+compiled path can be checked against the reference anywhere.
+"""
+import os
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+BACKENDS = ('numpy', 'numba')
+PAIRWISE_BLOCK = 128 # NumPy's pairwise summation block size (PW_BLOCKSIZE)
+
+_jit = numba.njit(cache=True, nogil=True) if numba is not None else (lambda function: function)
+
+
+def available_backends():
+    return tuple(name for name in BACKENDS if name != 'numba' or numba is not None)
+
+def resolve(backend=None):
+    """Backend name for backend (None: $PMSIM_BACKEND, default 'auto')."""
+    backend = (backend or os.environ.get('PMSIM_BACKEND') or 'auto').lower()
+    if backend == 'auto': return 'numba' if numba is not None else 'numpy'
+    if backend not in BACKENDS: raise ValueError(f"Unknown backend '{backend}', expected auto or one of {BACKENDS}")
+    if backend == 'numba' and numba is None: raise ValueError("The numba backend needs numba (pip install numba)")
+    return backend
+
+
+@_jit
+def _pairwise_sum(values, start, n):
+    """Sum of values[start:start + n] added in the order np.add.reduce uses for float64."""
+    if n < 8:
+        total = 0.0
+        for i in range(start, start + n): total += values[i]
+        return total
+    if n <= PAIRWISE_BLOCK:
+        r0, r1, r2, r3 = values[start], values[start + 1], values[start + 2], values[start + 3]
+        r4, r5, r6, r7 = values[start + 4], values[start + 5], values[start + 6], values[start + 7]
+        i = 8
+        while i < n - n % 8:
+            j = start + i
+            r0 += values[j]; r1 += values[j + 1]; r2 += values[j + 2]; r3 += values[j + 3]
+            r4 += values[j + 4]; r5 += values[j + 5]; r6 += values[j + 6]; r7 += values[j + 7]
+            i += 8
+        total = ((r0 + r1) + (r2 + r3)) + ((r4 + r5) + (r6 + r7))
+        while i < n:
+            total += values[start + i]
+            i += 1
+        return total
+    half = n // 2
+    half -= half % 8
+    return _pairwise_sum(values, start, half) + _pairwise_sum(values, start + half, n - half)
+
+
+@_jit
+def daily_changes(buffer, growth_factor, migration_net, diffused, drift, drift_fields, low, high,
+                  population_field, approval_field, global_approval):
+    """One day of growth, migration, diffusion and drift for every game in buffer, in place.
+
+    buffer is (n_games, n_fields, n_units). growth_factor holds the population multiplier.
+    migration_net holds the annual net migration. diffused holds the approval after diffusion.
+    drift is (n_drift, n_games, n_units) of values added to the fields drift_fields.
+    Every field is then clipped to [low, high] (±inf when unbounded). Finally
+    global_approval gets the rounded-population-weighted mean approval of each game."""
+    n_games, n_fields, n_units = buffer.shape
+    weights = np.empty(n_units)
+    weighted = np.empty(n_units)
+    for game in range(n_games):
+        state = buffer[game]
+        for unit in range(n_units):
+            population = state[population_field, unit] * growth_factor[game, unit]
+            state[population_field, unit] = population + migration_net[game, unit] / 365.0
+            state[approval_field, unit] = diffused[game, unit]
+        for k in range(drift_fields.shape[0]):
+            row = state[drift_fields[k]]
+            for unit in range(n_units): row[unit] += drift[k, game, unit]
+        for field in range(n_fields):
+            row = state[field]
+            for unit in range(n_units):
+                value = row[unit]
+                if value < low[field]: row[unit] = low[field]
+                elif value > high[field]: row[unit] = high[field]
+        for unit in range(n_units):
+            weights[unit] = np.rint(state[population_field, unit])
+            weighted[unit] = weights[unit] * state[approval_field, unit]
+        total = _pairwise_sum(weights, 0, n_units)
+        if total > 0:
+            approval = _pairwise_sum(weighted, 0, n_units) / max(total, 1.0)
+            global_approval[game] = min(max(approval, 0.0), 100.0)
+        else:
+            global_approval[game] = 0.0
@@ -0,0 +1,58 @@
+# pmsim/migration.py
+"""Inter-unit migration driven by GDP per capita, unemployment and approval gaps.
+
+The annual flow from unit i to unit j is a gravity model
+
+    F[i, j] = rate * pop[i] * (pop[j] / total) * exp(sensitivity * (score[j] - score[i]))
+
+where score rewards richer, lower-unemployment, higher-approval units. Because the
+exponential splits into exp(s_j) / exp(s_i), F is a rank-one outer product, so the net
+inflow per unit can be computed in O(n) without materialising the n x n matrix. The
+net vector sums to zero, i.e. migration conserves total population.
+"""
+import numpy as np
+
+GROSS_RATE = 0.02 # Share of a unit's population moving elsewhere per year (order of magnitude)
+SENSITIVITY = 0.15 # How strongly movers prefer attractive destinations
+UNEMPLOYMENT_WEIGHT = 0.15 # Score penalty per point of unemployment above the national average
+APPROVAL_WEIGHT = 0.01 # Score bonus per point of approval above the national average
+REFRESH_DAYS = 30 # Flows are re-derived from current stats about monthly and applied daily in between
+
+
+def attractiveness(population, gdp, unemployment, approval):
+    """Relative attractiveness score per unit (0 = national average), along the last axis."""
+    total = population.sum(axis=-1, keepdims=True)
+    gdp_per_capita = gdp / population
+    national_gdp_per_capita = gdp.sum(axis=-1, keepdims=True) / total
+    mean_unemployment = (population * unemployment).sum(axis=-1, keepdims=True) / total
+    mean_approval = (population * approval).sum(axis=-1, keepdims=True) / total
+    return (np.log(gdp_per_capita / national_gdp_per_capita)
+            - UNEMPLOYMENT_WEIGHT * (unemployment - mean_unemployment)
+            + APPROVAL_WEIGHT * (approval - mean_approval))
+
+
+def _factors(population, score, gross_rate, sensitivity):
+    pull = np.exp(sensitivity * score)
+    total = population.sum(axis=-1, keepdims=True)
+    return gross_rate * population / pull, population * pull / total # origin, destination
+
+
+def flow_matrix(population, gdp, unemployment, approval, gross_rate=GROSS_RATE, sensitivity=SENSITIVITY):
+    """Full annual flow matrix F[..., i, j] (people per year moving from i to j)."""
+    score = attractiveness(population, gdp, unemployment, approval)
+    origin, destination = _factors(population, score, gross_rate, sensitivity)
+    flows = origin[..., :, None] * destination[..., None, :]
+    n_units = population.shape[-1]
+    flows[..., np.arange(n_units), np.arange(n_units)] = 0.0
+    return flows
+
+
+def net_migration(population, gdp, unemployment, approval, gross_rate=GROSS_RATE, sensitivity=SENSITIVITY):
+    """Net annual inflow per unit, equal to flow_matrix(...).sum(-2) - flow_matrix(...).sum(-1).
+
+    Uses the rank-one form: inflow_j = d_j * sum(o) and outflow_i = o_i * sum(d) (the
+    diagonal terms cancel), so the cost is linear in the number of units."""
+    score = attractiveness(population, gdp, unemployment, approval)
+    origin, destination = _factors(population, score, gross_rate, sensitivity)
+    return (destination * origin.sum(axis=-1, keepdims=True)
+            - origin * destination.sum(axis=-1, keepdims=True))
@@ -0,0 +1,84 @@
+# pmsim/municipalities.py
+"""Synthetic municipality layer for municipality-scale games.
+
+No municipal statistics ship with the game, so each prefecture is split into a
+realistic number of municipalities with a heavy-tailed size distribution. Prefecture
+totals (population, GDP) and the population-weighted growth rate are preserved
+exactly. The split is seeded, so a given seed always produces the same map.
+"""
+import numpy as np
+
+from pmsim.datasets import Dataset
+
+MUNICIPALITY_COUNT = 1741 # Municipalities including Tokyo's 23 special wards
+SIZE_EXPONENT = 1.0 # Zipf exponent for municipal populations within a prefecture
+GROWTH_SPREAD = 0.3 # Extra growth (%/yr) per unit of log relative size (cities grow, villages shrink)
+
+
+def allocate_counts(weights, total):
+    """Split total into integer counts proportional to weights (largest remainder, min 1 each)."""
+    weights = np.asarray(weights, dtype=float)
+    quotas = weights / weights.sum() * (total - len(weights))
+    counts = np.floor(quotas).astype(np.int64)
+    remainder = total - len(weights) - counts.sum()
+    counts[np.argsort(quotas - counts)[::-1][:remainder]] += 1
+    return counts + 1
+
+
+def generate_municipalities(prefecture_names, population, gdp, growth_rate, borders, total=MUNICIPALITY_COUNT, seed=0):
+    """Split prefectures into municipalities.
+
+    Returns a dict with unit names, population, gdp, growth_rate, unit_prefecture (index
+    into prefecture_names, units grouped by prefecture) and adjacency edges (name pairs).
+    """
+    rng = np.random.default_rng(seed)
+    population = np.asarray(population, dtype=float); gdp = np.asarray(gdp, dtype=float)
+    growth_rate = np.asarray(growth_rate, dtype=float)
+    counts = allocate_counts(np.sqrt(population), total)
+
+    names, unit_prefecture, pops, gdps, growths, edges = [], [], [], [], [], []
+    first_unit = {}
+    for p, pref in enumerate(prefecture_names):
+        n = int(counts[p])
+        shares = np.arange(1, n + 1) ** -SIZE_EXPONENT * rng.lognormal(0.0, 0.3, n)
+        shares = np.sort(shares)[::-1] / shares.sum() # Largest municipality first (the capital)
+        productivity = shares ** 0.05 # Cities are slightly more productive per head
+        gdp_shares = shares * productivity / (shares * productivity).sum()
+        relative_size = np.log(shares * n)
+        growth = growth_rate[p] + GROWTH_SPREAD * (relative_size - (shares * relative_size).sum())
+
+        unit_names = [f"{pref} {k + 1:03d}" for k in range(n)]
+        first_unit[pref] = len(names)
+        names += unit_names; unit_prefecture += [p] * n
+        pops.append(population[p] * shares); gdps.append(gdp[p] * gdp_shares); growths.append(growth)
+
+        # Local graph: a chain of neighbouring municipalities plus a few random shortcuts
+        edges += [(unit_names[k], unit_names[k + 1]) for k in range(n - 1)]
+        for _ in range(n // 3):
+            a, b = rng.choice(n, size=2, replace=False)
+            edges.append((unit_names[a], unit_names[b]))
+
+    # Across prefecture borders: link the capitals and one random pair of municipalities
+    for a, b in borders:
+        if a not in first_unit or b not in first_unit: continue
+        edges.append((names[first_unit[a]], names[first_unit[b]]))
+        ia = first_unit[a] + int(rng.integers(counts[prefecture_names.index(a)]))
+        ib = first_unit[b] + int(rng.integers(counts[prefecture_names.index(b)]))
+        edges.append((names[ia], names[ib]))
+
+    return {
+        'names': names, 'unit_prefecture': np.array(unit_prefecture, dtype=np.int64),
+        'population': np.concatenate(pops), 'gdp': np.concatenate(gdps),
+        'growth_rate': np.concatenate(growths), 'edges': edges,
+    }
+
+
+def split_dataset(dataset, total=MUNICIPALITY_COUNT, seed=0):
+    """Municipality-level Dataset generated from a prefecture-level one."""
+    layout = generate_municipalities(dataset.prefecture_names, dataset.population, dataset.gdp,
+                                     dataset.growth_rate, dataset.edge_names(), total, seed)
+    index = {name: i for i, name in enumerate(layout['names'])}
+    return Dataset(f"{dataset.name} (municipalities)", layout['names'], layout['unit_prefecture'],
+                   dataset.prefecture_names, dataset.prefecture_region, dataset.region_names,
+                   layout['population'], layout['gdp'], layout['growth_rate'],
+                   [(index[a], index[b]) for a, b in layout['edges']])
@@ -0,0 +1,93 @@
+# pmsim/params.py
+"""Balance parameters as one flat, overridable set.
+
+Every knob that shapes how hard the game is lives in DEFAULTS under a flat name, with
+its value taken from the module constant the engines used before (so the defaults
+play exactly as before). Policy outcome ranges are flattened to
+``<policy>.success_min``/``success_max``/``failure_min``/``failure_max`` so that every
+parameter is a single number a sweep can vary.
+
+Both Simulation and BatchSimulation take ``params=`` (a Params) and read their knobs
+from it.
+"""
+import hashlib
+import json
+
+from pmsim import election, policies, scheduler
+from pmsim.units import DAILY_DRIFT
+
+PM_SKILL_RANGE = (0.5, 1.5) # PrimeMinister skill draw
+RIVAL_SKILL_RANGE = (0.8, 1.2) # RivalParty attack skill draw
+
+DEFAULTS = {
+    'election_threshold': election.ELECTION_THRESHOLD,
+    'keep_threshold': election.KEEP_THRESHOLD,
+    'event_probability': scheduler.EVENT_DAILY_PROBABILITY,
+    'skip_event_probability': scheduler.SKIP_EVENT_DAILY_PROBABILITY,
+    'approval_drift': DAILY_DRIFT['approval'],
+    'economy_drift': DAILY_DRIFT['economy'],
+    'unemployment_drift': DAILY_DRIFT['unemployment'],
+    'pm_skill_min': PM_SKILL_RANGE[0],
+    'pm_skill_max': PM_SKILL_RANGE[1],
+    'rival_skill_min': RIVAL_SKILL_RANGE[0],
+    'rival_skill_max': RIVAL_SKILL_RANGE[1],
+    'policy_success_probability': policies.SUCCESS_PROBABILITY,
+}
+for _policy, ((_pos_low, _pos_high), (_neg_low, _neg_high)) in policies.OUTCOME_RANGES.items():
+    DEFAULTS.update({f'{_policy}.success_min': _pos_low, f'{_policy}.success_max': _pos_high,
+                     f'{_policy}.failure_min': _neg_low, f'{_policy}.failure_max': _neg_high})
+DEFAULTS = {name: float(value) for name, value in DEFAULTS.items()}
+
+
+class Params:
+    """A full parameter set: DEFAULTS with some values overridden (unknown names raise KeyError)."""
+    def __init__(self, values=None):
+        values = dict(values or {})
+        unknown = sorted(set(values) - set(DEFAULTS))
+        if unknown: raise KeyError(f"Unknown parameters: {', '.join(unknown)}")
+        self.values = {**DEFAULTS, **{name: float(value) for name, value in values.items()}}
+
+    def __getitem__(self, name):
+        return self.values[name]
+
+    def __eq__(self, other):
+        return isinstance(other, Params) and self.values == other.values
+
+    def __repr__(self):
+        return f"Params({self.overrides()})"
+
+    def replace(self, values):
+        """Copy with some values changed."""
+        return Params({**self.values, **values})
+
+    def overrides(self):
+        """The values that differ from DEFAULTS."""
+        return {name: value for name, value in self.values.items() if value != DEFAULTS[name]}
+
+    def key(self):
+        """Stable content hash of the full set (for caching results per parameter set)."""
+        encoded = json.dumps(sorted(self.values.items())).encode()
+        return hashlib.sha256(encoded).hexdigest()
+
+    # --- Grouped views used by the engines ---
+    def outcome_ranges(self, policy_type):
+        """((success_min, success_max), (failure_min, failure_max)) like policies.OUTCOME_RANGES."""
+        v = self.values
+        return ((v[f'{policy_type}.success_min'], v[f'{policy_type}.success_max']),
+                (v[f'{policy_type}.failure_min'], v[f'{policy_type}.failure_max']))
+
+    @property
+    def daily_drift(self):
+        """Field -> drift magnitude like units.DAILY_DRIFT."""
+        return {field: self.values[f'{field}_drift'] for field in DAILY_DRIFT}
+
+    @property
+    def pm_skill_range(self):
+        return self.values['pm_skill_min'], self.values['pm_skill_max']
+
+    @property
+    def rival_skill_range(self):
+        return self.values['rival_skill_min'], self.values['rival_skill_max']
+
+
+DEFAULT_PARAMS = Params()
@@ -0,0 +1,99 @@
+# pmsim/policies.py
+"""Policy effects as array operations.
+
+``apply_policy`` updates the unit arrays of one game (fields of shape ``(n_units,)``)
+or of a batch of games (``(n_games, n_units)``) in one call. Per-game values (the
+drawn effect, whether the policy succeeded, PM skills) are scalars or arrays with the
+batch shape and are broadcast over the unit axis.
+"""
+import numpy as np
+
+POLICY_TYPES = ("economy", "unemployment", "welfare", "childcare_subsidies", "austerity",
+                "corrupt_deal", "nuclear_energy_gamble", "tech_gamble")
+
+# Approval effect ranges on success / failure (failure values are subtracted)
+OUTCOME_RANGES = {
+    "economy": ((6, 14), (7, 15)),
+    "unemployment": ((5, 10), (6, 12)),
+    "welfare": ((6, 12), (7, 14)),
+    "childcare_subsidies": ((5, 10), (4, 8)), # Usually positive effect expected
+    "austerity": ((2, 6), (8, 16)), # More likely negative
+    "corrupt_deal": ((1, 5), (10, 20)), # High risk of large negative if discovered
+    "nuclear_energy_gamble": ((12, 20), (15, 30)),
+    "tech_gamble": ((15, 25), (12, 20)),
+}
+SUCCESS_PROBABILITY = 0.5
+
+# Unit fields each policy changes (for change tracking, see pmsim.aggregates)
+CHANGED_FIELDS = {
+    "economy": ("gdp", "approval", "economy", "population_growth_rate"),
+    "unemployment": ("unemployment", "approval", "population_growth_rate"),
+    "welfare": ("approval", "population_growth_rate"),
+    "childcare_subsidies": ("approval", "population_growth_rate"),
+    "austerity": ("approval", "economy", "unemployment", "population_growth_rate"),
+    "corrupt_deal": ("approval",),
+    "nuclear_energy_gamble": ("gdp", "approval", "economy", "population_growth_rate"),
+    "tech_gamble": ("gdp", "approval", "economy", "unemployment", "population_growth_rate"),
+}
+
+
+def draw_outcomes(rng, policy_type, size=(), ranges=None, success_probability=SUCCESS_PROBABILITY):
+    """Draw (effect, success) for policy_type with the given batch shape (ranges defaults
+    to OUTCOME_RANGES[policy_type])."""
+    (pos_low, pos_high), (neg_low, neg_high) = OUTCOME_RANGES[policy_type] if ranges is None else ranges
+    success = rng.random(size) < success_probability
+    effect = np.where(success, rng.uniform(pos_low, pos_high, size), -rng.uniform(neg_low, neg_high, size))
+    return effect, success
+
+
+def apply_policy(units, policy_type, effect, positive, skills, rng):
+    """Apply policy_type's effects to units (a UnitArrays, possibly batched) in place.
+
+    skills is anything with economy/unemployment/welfare/demographics_skill attributes
+    (a PrimeMinister, or per-game arrays for a batch)."""
+    def col(value): return np.asarray(value, dtype=float)[..., None] # Per-game value -> unit axis
+    def noise(low, high): return rng.uniform(low, high, units.approval.shape) # Per-unit variation
+
+    pos = np.asarray(positive)[..., None]
+    e = col(effect)
+    es, us = col(skills.economy_skill), col(skills.unemployment_skill)
+    ws, ds = col(skills.welfare_skill), col(skills.demographics_skill)
+
+    if policy_type == "economy":
+        units.gdp *= 1 + np.where(pos, 0.02 + 0.03 * es, -0.01 - 0.03 / es)
+        units.approval += e * noise(0.8, 1.2)
+        units.economy += np.where(pos, 0.1 * es, -0.1 / es)
+        # Economy policy might slightly affect growth rate
+        units.population_growth_rate += np.where(pos, 0.05 * es, -0.05 / es)
+    elif policy_type == "unemployment":
+        units.unemployment -= np.where(pos, 1.0 + 1.0 * us, -0.5 - 1.0 / us)
+        units.approval += e * noise(0.7, 1.3)
+        # Boost growth where unemployment dropped below 4%
+        units.population_growth_rate += np.where(pos & (units.unemployment < 4.0), 0.02 * us, 0.0)
+    elif policy_type == "welfare":
+        units.approval += e * noise(0.9, 1.1)
+        units.population_growth_rate += np.where(pos, 0.1 + 0.1 * ws, -0.1 - 0.1 / ws)
+    elif policy_type == "childcare_subsidies":
+        units.approval += e * noise(0.8, 1.2)
+        units.population_growth_rate += np.where(pos, 0.15 + 0.1 * ds, -0.05 / ds)
+    elif policy_type == "austerity":
+        units.approval += e * noise(0.8, 1.2)
+        units.economy -= 0.1 / es # Austerity usually hurts economy score
+        units.unemployment += 0.5 / us # And increases unemployment
+        units.population_growth_rate -= 0.1 + 0.1 / ds
+    elif policy_type == "corrupt_deal":
+        units.approval += e # Small boost if it worked, scandal if exposed
+    elif policy_type == "nuclear_energy_gamble":
+        units.gdp *= np.where(pos, 1 + noise(0.03, 0.06), 1.0)
+        units.approval += e * np.where(pos, noise(0.8, 1.2), noise(0.9, 1.1))
+        units.economy += np.where(pos, 0.2 * es, 0.0)
+        units.population_growth_rate -= np.where(pos, 0.0, noise(0.1, 0.5)) # People leave affected areas
+    elif policy_type == "tech_gamble":
+        units.gdp *= np.where(pos, 1 + noise(0.05, 0.10), 1 - noise(0.02, 0.05))
+        units.approval += e * np.where(pos, noise(0.8, 1.2), noise(0.9, 1.1))
+        units.economy += np.where(pos, 0.3 * es, -0.2 / es)
+        units.unemployment -= np.where(pos, 0.5 * us, 0.0)
+        units.population_growth_rate += np.where(pos, noise(0.05, 0.15) * ds, -noise(0.05, 0.1) / ds)
+    else:
+        raise ValueError(f"Unknown policy type '{policy_type}'")
+    units.normalize()
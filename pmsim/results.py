@@ -0,0 +1,98 @@
+# pmsim/results.py
+"""Result buffers in shared memory for worker processes.
+
+SharedResults is a set of named NumPy arrays, each with one row per run, stored in a
+single multiprocessing.shared_memory block. A layout maps names to (dtype, shape of one
+run's row). For example, the ensemble uses a column per summary figure and an optional
+(days + 1)-long approval trajectory per game.
+
+* The parent creates the block with ``SharedResults(layout, n_runs)`` and passes
+  ``handle()`` (a small tuple) to its workers.
+* Each worker attaches once with ``SharedResults.attach(handle)``. It then writes the
+  rows of the runs it plays straight into the block with ``write(run, values)``.
+* The arrays the parent reads (``results['score']``) are views of the block, so no
+  result is pickled or copied.
+
+write() sets the run's ``done`` flag last. A parent can therefore look at the runs
+finished so far (``completed()``, ``finished('score')``) while the others are still
+playing, for example to update live progress.
+
+The parent owns the block. Closing its SharedResults (or leaving its ``with`` block)
+frees the memory, so copy any arrays that must outlive it.
+"""
+import math
+from multiprocessing import shared_memory
+
+import numpy as np
+
+ALIGNMENT = 64 # Each array starts on a cache line
+
+
+def _offsets(layout, n_runs):
+    """(name, dtype, shape, offset) of every array in layout, plus the block size."""
+    placed, offset = [], 0
+    for name, (dtype, shape) in layout.items():
+        dtype, shape = np.dtype(dtype), (n_runs,) + tuple(shape)
+        placed.append((name, dtype, shape, offset))
+        offset += -(-math.prod(shape) * dtype.itemsize // ALIGNMENT) * ALIGNMENT
+    return placed, max(offset, 1)
+
+
+class SharedResults:
+    """Per-run result arrays in one shared memory block (see the module docstring)."""
+    def __init__(self, layout, n_runs, name=None):
+        if 'done' in layout: raise ValueError("'done' is reserved for the completion flags")
+        self.layout = {name: (np.dtype(dtype).str, tuple(shape)) for name, (dtype, shape) in layout.items()}
+        self.n_runs = n_runs
+        placed, size = _offsets({**self.layout, 'done': (np.bool_, ())}, n_runs)
+        self.owner = name is None
+        self.block = shared_memory.SharedMemory(name=name, create=self.owner, size=size if self.owner else 0)
+        self.arrays = {name: np.ndarray(shape, dtype, buffer=self.block.buf, offset=offset)
+                       for name, dtype, shape, offset in placed}
+        if self.owner:
+            for array in self.arrays.values(): array.fill(0)
+        self.done = self.arrays.pop('done')
+
+    @classmethod
+    def attach(cls, handle):
+        """The buffers of handle (from handle() in the creating process)."""
+        name, layout, n_runs = handle
+        return cls(layout, n_runs, name=name)
+
+    def handle(self):
+        """Picklable description for attach() in another process."""
+        return (self.block.name, self.layout, self.n_runs)
+
+    def __getitem__(self, name):
+        return self.arrays[name]
+
+    def __len__(self):
+        return self.n_runs
+
+    def write(self, run, values):
+        """Store values ({name: row}) as run's results and mark the run done."""
+        for name, value in values.items(): self.arrays[name][run] = value
+        self.done[run] = True
+
+    def completed(self):
+        """Runs written so far (ascending)."""
+        return np.flatnonzero(self.done)
+
+    def finished(self, name):
+        """Rows of the array name for the completed runs (a copy)."""
+        return self.arrays[name][self.done]
+
+    def close(self):
+        """Drop the views and the mapping; the owner also frees the block."""
+        self.arrays, self.done = {}, None
+        try:
+            self.block.close()
+        except BufferError:
+            pass # Views still held elsewhere keep the mapping until they are dropped
+        if self.owner: self.block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
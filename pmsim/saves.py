@@ -0,0 +1,199 @@
+# pmsim/saves.py
+"""Save files with a fixed-layout header in front of the pickled game.
+
+Layout (little-endian, HEADER.size bytes, then the payload)::
+
+    magic        8s   b"PMSIMSAV"
+    version      H    FORMAT_VERSION
+    header_size  H    HEADER.size (lets later versions grow the header)
+    pm_name      64s  UTF-8, NUL padded (truncated on a character boundary)
+    party_name   64s
+    year, month, day  H B B   in-game date
+    approval     f    global approval
+    running      B    1 while the game is on
+    election     B    index into ELECTION_STATES
+    days         I    days in office
+    saved_at     d    wall-clock save time (Unix seconds)
+    payload_size Q    bytes of pickled Simulation after the header
+    payload_hash 32s  SHA-256 of the payload
+    header_crc   I    CRC-32 of every header byte before this field
+
+A slot list needs only one small read per file (read_header). The payload is checked
+against its size and hash before it is unpickled. Files without the magic are saves
+from before headers (a bare pickle). They still load, and their header is None.
+Games pickled before the engine moved out of simulator.py refer to simulator.<class>;
+the loader maps those to pmsim.engine so old saves load without importing the GUI.
+
+Files are written to a temporary file, fsynced and renamed over the target, so a
+crash leaves either the old save or the new one. Autosaves use their own rotating
+set of files next to the slots.
+"""
+import hashlib
+import io
+import os
+import pickle
+import re
+import struct
+import time
+import zlib
+
+from pmsim.calendar_table import CALENDAR
+
+MAGIC = b"PMSIMSAV"
+FORMAT_VERSION = 1
+HEADER_BODY = struct.Struct("<8sHH64s64sHBBfBBIdQ32s") # Everything the CRC covers
+HEADER = struct.Struct(HEADER_BODY.format + "I")
+NAME_BYTES = 64
+ELECTION_STATES = (None, 'triggered', 'attack_phase', 'voting_day')
+SAVE_PATTERN = "pm_simulator_save_{slot}.pkl" # In the save directory (the working directory by default)
+SLOT_RE = re.compile(r"^pm_simulator_save_(\d+)\.pkl$")
+AUTOSAVE_PATTERN = "pm_simulator_autosave_{index}.pkl"
+AUTOSAVE_RE = re.compile(r"^pm_simulator_autosave_(\d+)\.pkl$")
+MAX_SLOTS = 99
+ENGINE_CLASSES = ('Simulation', 'Prefecture', 'PrimeMinister', 'RivalParty', 'CountryStatistics')
+
+
+class SaveError(ValueError):
+    """A save file that is damaged or not a game save."""
+
+
+class SaveHeader:
+    """The metadata at the front of a save file."""
+    FIELDS = ('pm_name', 'party_name', 'year', 'month', 'day', 'approval', 'running', 'election',
+              'days', 'saved_at', 'version')
+
+    def __init__(self, pm_name, party_name, year, month, day, approval, running, election, days, saved_at,
+                 version=FORMAT_VERSION):
+        self.pm_name, self.party_name = pm_name, party_name
+        self.year, self.month, self.day = year, month, day
+        self.approval, self.running, self.election = approval, running, election
+        self.days, self.saved_at, self.version = days, saved_at, version
+
+    def __repr__(self):
+        return f"SaveHeader({', '.join(f'{name}={getattr(self, name)!r}' for name in self.FIELDS)})"
+
+    @classmethod
+    def from_simulation(cls, sim, saved_at):
+        year, month, day = CALENDAR.ymd(sim.tick)
+        return cls(sim.pm_name, sim.party_name, year, month, day, float(sim.pm.global_approval),
+                   bool(sim.running), sim.election_in_progress,
+                   sim.approval_ordinals[-1] - sim.approval_ordinals[0], saved_at) # Days in office, not history points
+
+    @property
+    def status(self):
+        """Short state description for slot lists."""
+        if not self.running: return "Game over"
+        return "Election in progress" if self.election else "In office"
+
+
+def _encode_name(name):
+    data = name.encode('utf-8')[:NAME_BYTES]
+    return data.decode('utf-8', 'ignore').encode('utf-8') # Drop a character cut in half
+
+def _decode_name(data):
+    return data.rstrip(b"\0").decode('utf-8', 'replace')
+
+
+def snapshot(sim, saved_at=None):
+    """(header, payload): the part of saving that must see a consistent game state."""
+    saved_at = time.time() if saved_at is None else saved_at
+    return SaveHeader.from_simulation(sim, saved_at), pickle.dumps(sim, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def pack(header, payload):
+    """File bytes for a header and pickled payload (safe off the UI thread)."""
+    fields = (MAGIC, FORMAT_VERSION, HEADER.size, _encode_name(header.pm_name), _encode_name(header.party_name),
+              header.year, header.month, header.day, header.approval, int(header.running),
+              ELECTION_STATES.index(header.election), header.days, header.saved_at, len(payload),
+              hashlib.sha256(payload).digest())
+    body = HEADER_BODY.pack(*fields)
+    return body + struct.pack("<I", zlib.crc32(body)) + payload
+
+
+def encode(sim, saved_at=None):
+    """Header plus payload bytes for a Simulation."""
+    return pack(*snapshot(sim, saved_at))
+
+
+def _parse_header(data):
+    if len(data) < HEADER.size or not data.startswith(MAGIC): return None
+    (_, version, header_size, pm_name, party_name, year, month, day, approval, running, election, days,
+     saved_at, payload_size, payload_hash, crc) = HEADER.unpack_from(data)
+    if zlib.crc32(data[:HEADER_BODY.size]) != crc: raise SaveError("save header is damaged (checksum mismatch)")
+    if version > FORMAT_VERSION: raise SaveError(f"save file version {version} is newer than this game")
+    if election >= len(ELECTION_STATES): raise SaveError("save header has an unknown election state")
+    header = SaveHeader(_decode_name(pm_name), _decode_name(party_name), year, month, day, approval,
+                        bool(running), ELECTION_STATES[election], days, saved_at, version)
+    return header, header_size, payload_size, payload_hash
+
+
+def read_header(path):
+    """The SaveHeader of a save file from one small read; None for a pre-header save."""
+    with open(path, 'rb') as f: data = f.read(HEADER.size)
+    parsed = _parse_header(data)
+    return None if parsed is None else parsed[0]
+
+
+class _Unpickler(pickle.Unpickler):
+    def find_class(self, module, name):
+        if module == 'simulator' and name in ENGINE_CLASSES: module = 'pmsim.engine'
+        return super().find_class(module, name)
+
+def _unpickle(data):
+    return _Unpickler(io.BytesIO(data)).load()
+
+
+def load(path):
+    """Unpickle the Simulation in a save file after checking the payload."""
+    with open(path, 'rb') as f: data = f.read()
+    parsed = _parse_header(data[:HEADER.size])
+    if parsed is None: return _unpickle(data) # Pre-header save: the whole file is the pickle
+    _, header_size, payload_size, payload_hash = parsed
+    payload = data[header_size:]
+    if len(payload) != payload_size: raise SaveError("save file is truncated")
+    if hashlib.sha256(payload).digest() != payload_hash: raise SaveError("save file is damaged (checksum mismatch)")
+    return _unpickle(payload)
+
+
+def write_bytes(path, data):
+    """Atomically replace path with data (temp file, fsync, rename, directory fsync)."""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data); f.flush(); os.fsync(f.fileno())
+    os.replace(temp_path, path)
+    if hasattr(os, 'O_DIRECTORY'): # Make the rename itself durable (POSIX)
+        directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+        try: os.fsync(directory)
+        finally: os.close(directory)
+
+
+def write(path, sim, saved_at=None):
+    """Write sim to path; the file is replaced in one step, so a failed write keeps the old save."""
+    write_bytes(path, encode(sim, saved_at))
+
+
+# --- Slots ---
+def slot_path(slot, directory="."):
+    return os.path.join(directory, SAVE_PATTERN.format(slot=slot))
+
+def autosave_path(index, directory="."):
+    return os.path.join(directory, AUTOSAVE_PATTERN.format(index=index))
+
+def _list_matching(pattern, directory):
+    found = {}
+    try: names = os.listdir(directory)
+    except OSError: return found
+    for name in names:
+        match = pattern.match(name)
+        if not match: continue
+        try: found[int(match.group(1))] = read_header(os.path.join(directory, name))
+        except (OSError, SaveError) as e: found[int(match.group(1))] = SaveError(str(e))
+    return dict(sorted(found.items()))
+
+def list_slots(directory="."):
+    """slot -> SaveHeader (None for pre-header saves, a SaveError for unreadable ones)."""
+    return _list_matching(SLOT_RE, directory)
+
+def list_autosaves(directory="."):
+    """Autosave index -> SaveHeader (or a SaveError), like list_slots."""
+    return _list_matching(AUTOSAVE_RE, directory)
@@ -0,0 +1,88 @@
+# pmsim/scheduler.py
+"""Discrete-event scheduler for random events and election phases.
+
+Instead of rolling a die every simulated day, the time of the next random event is
+drawn up front from the geometric distribution that a daily Bernoulli(p) roll implies.
+Election phases are ordinary scheduled entries, so every code path that advances time
+(a single day or a whole skipped year) walks the same queue.
+"""
+import heapq
+
+# Event kinds
+RANDOM_EVENT = 'random_event'
+ELECTION_ATTACK = 'election_attack'
+ELECTION_VOTING = 'election_voting'
+ELECTION_RESULT = 'election_result'
+
+# Days after the trigger on which each election phase happens
+ELECTION_PHASE_OFFSETS = ((ELECTION_ATTACK, 1), (ELECTION_VOTING, 2), (ELECTION_RESULT, 3))
+
+# Daily chance of a random event during normal play and during a year skip
+EVENT_DAILY_PROBABILITY = 0.2
+SKIP_EVENT_DAILY_PROBABILITY = 0.05
+
+
+class EventScheduler:
+    """Priority queue of (day, sequence, kind, token) entries keyed by simulation day."""
+    def __init__(self, rng):
+        self.rng = rng
+        self._queue = []
+        self._sequence = 0
+        self._random_token = 0 # Bumped to invalidate a pending random event
+        self.event_probability = None
+
+    def schedule(self, day, kind, token=0):
+        heapq.heappush(self._queue, (day, self._sequence, kind, token))
+        self._sequence += 1
+
+    def _is_live(self, entry):
+        return entry[2] != RANDOM_EVENT or entry[3] == self._random_token
+
+    def _drop_cancelled(self):
+        while self._queue and not self._is_live(self._queue[0]):
+            heapq.heappop(self._queue)
+
+    def next_day(self):
+        """Day of the next live scheduled event, or None if nothing is pending."""
+        self._drop_cancelled()
+        return self._queue[0][0] if self._queue else None
+
+    def next_day_of(self, kind):
+        """Day of the next pending event of the given kind, or None."""
+        days = [entry[0] for entry in self._queue if entry[2] == kind and self._is_live(entry)]
+        return min(days) if days else None
+
+    def pop_due(self, day):
+        """Remove and return the kinds of all live events scheduled on or before day, in order."""
+        due = []
+        while self._queue and self._queue[0][0] <= day:
+            entry = heapq.heappop(self._queue)
+            if self._is_live(entry): due.append(entry[2])
+        return due
+
+    def quiet_days(self, now, limit):
+        """Number of days after now (at most limit) on which nothing is scheduled."""
+        next_day = self.next_day()
+        if next_day is None: return limit
+        return max(0, min(limit, next_day - now - 1))
+
+    # --- Random events ---
+    def schedule_random_event(self, now):
+        """Pre-draw the day of the next random event from the current daily probability."""
+        self._random_token += 1
+        if self.event_probability and self.event_probability > 0:
+            self.schedule(now + int(self.rng.geometric(self.event_probability)), RANDOM_EVENT, self._random_token)
+
+    def set_event_probability(self, now, probability):
+        """Switch the daily event probability, redrawing the pending event if it changed.
+
+        Redrawing is exact because the geometric waiting time is memoryless."""
+        if probability != self.event_probability:
+            self.event_probability = probability
+            self.schedule_random_event(now)
+
+    # --- Elections ---
+    def schedule_election(self, now):
+        """Queue the attack, voting and result phases of an election triggered on day now."""
+        for kind, offset in ELECTION_PHASE_OFFSETS:
+            self.schedule(now + offset, kind)
@@ -0,0 +1,132 @@
+# pmsim/strategies.py
+"""Scripted strategies for the batch engine.
+
+A strategy maps the state of a BatchSimulation to one action per game (indices into
+env.ACTIONS: 0 waits, k makes policies.POLICY_TYPES[k - 1]). It is called once per day
+before the day is stepped, and it must only read per-game state (``batch.days``,
+``batch.global_approval``, ``batch.units`` ...) so every row plays its own game.
+
+Strategies are registered by name in STRATEGIES, either with the ``register``
+decorator or by registering one built from the rule helpers below. GameView presents
+one interactive Simulation with the same attributes (a batch of one), so the same
+strategies drive full games too. Strategy scripts are Python files that register
+strategies or define a ``strategy`` function (see load).
+"""
+import os
+import runpy
+
+import numpy as np
+
+from pmsim.env import ACTIONS
+
+STRATEGIES = {} # name -> strategy(batch) -> actions
+
+
+def register(name, strategy=None):
+    """Register strategy under name (usable as a decorator); names must be unique."""
+    def add(function):
+        if name in STRATEGIES: raise ValueError(f"Strategy '{name}' is already registered")
+        STRATEGIES[name] = function
+        return function
+    return add if strategy is None else add(strategy)
+
+
+def get(name):
+    try:
+        return STRATEGIES[name]
+    except KeyError:
+        raise KeyError(f"Unknown strategy '{name}', registered: {', '.join(sorted(STRATEGIES))}") from None
+
+
+def load(spec):
+    """Strategy for a registered name or a script path ("file.py" or "file.py:name").
+
+    A script runs once; it can register strategies (then name picks one, defaulting
+    to the script's only registration) or define a module-level ``strategy`` function."""
+    path, _, name = spec.partition(':') if spec.endswith('.py') or '.py:' in spec else ('', '', spec)
+    if not path: return get(name)
+    if not os.path.exists(path): raise FileNotFoundError(f"Strategy script {path} not found")
+    before = set(STRATEGIES)
+    namespace = runpy.run_path(path)
+    if name: return get(name)
+    added = sorted(set(STRATEGIES) - before)
+    if 'strategy' in namespace: return namespace['strategy']
+    if len(added) == 1: return STRATEGIES[added[0]]
+    raise ValueError(f"{path}: define strategy() or register exactly one strategy (or use {path}:NAME)")
+
+
+class GameView:
+    """One interactive Simulation seen through the batch attributes strategies read."""
+    n_games = 1
+
+    def __init__(self, sim):
+        self.sim = sim
+
+    @property
+    def days(self):
+        return np.array([len(self.sim.approval_history) - 1])
+
+    @property
+    def global_approval(self):
+        return np.array([self.sim.pm.global_approval])
+
+    @property
+    def running(self):
+        return np.array([self.sim.running])
+
+    @property
+    def election_day(self):
+        return np.array([-1 if self.sim.election_in_progress is None else 0])
+
+    @property
+    def units(self):
+        return self.sim.units # Fields have no game axis here
+
+
+# --- Rule helpers ---
+def _action(action):
+    if action not in ACTIONS: raise ValueError(f"Unknown action '{action}', expected one of {ACTIONS}")
+    return ACTIONS.index(action)
+
+def every(action, days, offset=0):
+    """Make action on every days-th day in office (starting at day offset)."""
+    index = _action(action)
+    def strategy(batch):
+        return np.where((batch.days - offset) % days == 0, index, 0)
+    return strategy
+
+def when_above(action, threshold):
+    """Make action on any day global approval is above threshold."""
+    index = _action(action)
+    def strategy(batch):
+        return np.where(batch.global_approval > threshold, index, 0)
+    return strategy
+
+def when_below(action, threshold):
+    """Make action on any day global approval is below threshold."""
+    index = _action(action)
+    def strategy(batch):
+        return np.where(batch.global_approval < threshold, index, 0)
+    return strategy
+
+def first_of(*strategies):
+    """Combine rules: each game takes the first non-wait action among strategies."""
+    def strategy(batch):
+        actions = np.zeros(batch.n_games, dtype=np.int64)
+        for rule in reversed(strategies):
+            chosen = rule(batch)
+            actions = np.where(chosen != 0, chosen, actions)
+        return actions
+    return strategy
+
+
+# --- Built-in strategies ---
+@register("wait")
+def wait(batch):
+    return np.zeros(batch.n_games, dtype=np.int64)
+
+register("welfare_every_30_days", every("welfare", 30))
+register("economy_every_14_days", every("economy", 14))
+register("gamble_above_60", when_above("tech_gamble", 60.0))
+register("economy_below_40", when_below("economy", 40.0))
+register("steady_hand", first_of(when_below("welfare", 35.0), every("economy", 30)))
@@ -0,0 +1,202 @@
+# pmsim/sweep.py
+"""Parameter sweeps over the balance knobs.
+
+A sweep varies some parameters (names from params.DEFAULTS, each with a (low, high)
+range) over a design of points: a full grid or a Latin hypercube. Every point is an
+ensemble of seeded games on the batch engine. All points share the same seed (common
+random numbers), so differences between points come from the parameters rather than
+the dice. In each game, every day has a chance of a random policy, otherwise the PM
+waits; games end when the PM loses an election or after ``days`` days.
+
+Points run in a process pool. Workers write their outcomes into shared memory
+(pmsim.results) rather than returning them, so nothing is pickled on the way back.
+Each finished point is written to a cache file keyed by
+everything that determines its result, so an interrupted sweep resumes where it
+stopped. The result holds survival curves (the share of games still in office after
+each day) and first-order sensitivity indices for summary metrics.
+"""
+import concurrent.futures
+import hashlib
+import itertools
+import json
+import os
+
+import numpy as np
+
+from pmsim import instrument
+from pmsim.batch import BatchSimulation
+from pmsim.params import Params, DEFAULTS
+from pmsim.policies import POLICY_TYPES
+from pmsim.results import SharedResults
+
+CACHE_VERSION = 1 # Bump when the engine or the cached layout changes results
+CACHE_DIR = os.environ.get('PMSIM_SWEEP_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'pmsim', 'sweeps'))
+DEFAULT_DAYS = 4 * 365 # One parliamentary term
+DEFAULT_GAMES = 1000
+DEFAULT_ACTION_PROBABILITY = 0.05 # Daily chance of a random policy in the ensemble games
+METRICS = ('survival_rate', 'mean_days', 'mean_score')
+
+
+# --- Designs ---
+def _check_space(space):
+    unknown = sorted(set(space) - set(DEFAULTS))
+    if unknown: raise KeyError(f"Unknown parameters: {', '.join(unknown)}")
+
+def grid_design(space, levels=3):
+    """Every combination of ``levels`` evenly spaced values per parameter."""
+    _check_space(space)
+    axes = [np.linspace(low, high, levels) for low, high in space.values()]
+    return [dict(zip(space, map(float, values))) for values in itertools.product(*axes)]
+
+def latin_hypercube(space, n_points, seed=None):
+    """n_points points with every parameter's range cut into n_points strata, each used once."""
+    _check_space(space)
+    rng = np.random.default_rng(seed)
+    columns = [(rng.permutation(n_points) + rng.random(n_points)) / n_points for _ in space]
+    return [{name: float(low + (high - low) * column[i]) for (name, (low, high)), column in zip(space.items(), columns)}
+            for i in range(n_points)]
+
+
+# --- One point ---
+def run_point(dataset, values, n_games=DEFAULT_GAMES, days=DEFAULT_DAYS, seed=0,
+              action_probability=DEFAULT_ACTION_PROBABILITY):
+    """Play one ensemble with the given parameter overrides.
+
+    Returns a dict of arrays: 'days' (days in office per game, ``days`` for survivors),
+    'score' (final score per game) and 'survival' (length days + 1: share of games still
+    in office after each day)."""
+    batch = BatchSimulation(dataset, n_games, seed=seed, params=Params(values))
+    policy_rng = np.random.default_rng([seed, 1]) # Separate stream: the same decisions at every point
+    for _ in range(days):
+        if not batch.running.any(): break
+        act = policy_rng.random(n_games) < action_probability
+        actions = np.where(act, policy_rng.integers(1, len(POLICY_TYPES) + 1, n_games), 0)
+        batch.apply_actions(actions)
+        batch.step_day()
+    lost = ~batch.running
+    ended = np.where(lost, batch.days, days)
+    survival = (~lost | (ended > np.arange(days + 1)[:, None])).mean(axis=1)
+    return {'days': ended, 'score': batch.score(), 'survival': survival}
+
+
+def outcome_layout(n_games, days):
+    """SharedResults layout of run_point's outcome."""
+    return {'days': (np.int64, (n_games,)), 'score': (np.float64, (n_games,)), 'survival': (np.float64, (days + 1,))}
+
+_worker_dataset = _worker_results = None
+
+def _init_worker(dataset, handle):
+    global _worker_dataset, _worker_results
+    _worker_dataset, _worker_results = dataset, SharedResults.attach(handle)
+
+def _run_in_worker(slot, values, n_games, days, seed, action_probability):
+    _worker_results.write(slot, run_point(_worker_dataset, values, n_games, days, seed, action_probability))
+
+
+# --- Results ---
+def first_order_indices(inputs, output, bins=None):
+    """First-order (main effect) sensitivity index of each input column for output.
+
+    Estimates Var(E[Y | X_i]) / Var(Y) from the design itself. Each input is grouped
+    into equal-count bins (sqrt(n_points) of them by default), or by its distinct values
+    when they repeat (grid designs) or number at most ``bins``, and the variance of the group
+    means of Y is compared with the total variance. Indices of independent inputs sum
+    to at most about 1; the remainder is interaction and noise. Few points per bin bias
+    the indices upwards."""
+    inputs, output = np.asarray(inputs, dtype=float), np.asarray(output, dtype=float)
+    bins = max(2, int(round(np.sqrt(len(output))))) if bins is None else bins
+    total = output.var()
+    indices = np.zeros(inputs.shape[1])
+    if total <= 0: return indices
+    for i, column in enumerate(inputs.T):
+        levels = np.unique(column)
+        if levels.size <= bins or levels.size < len(column): groups = np.searchsorted(levels, column)
+        else: groups = np.argsort(np.argsort(column, kind='stable')) * bins // len(column)
+        counts = np.bincount(groups)
+        means = np.bincount(groups, weights=output)[counts > 0] / counts[counts > 0]
+        indices[i] = (counts[counts > 0] * (means - output.mean()) ** 2).sum() / len(output) / total
+    return indices
+
+
+class SweepResult:
+    """Per-point outcomes of a sweep (rows follow points)."""
+    def __init__(self, names, points, outcomes):
+        self.names = list(names)
+        self.points = points
+        self.inputs = np.array([[point[name] for name in self.names] for point in points]).reshape(len(points), len(self.names))
+        self.survival = np.array([outcome['survival'] for outcome in outcomes]) # (n_points, days + 1)
+        self.days = np.array([outcome['days'] for outcome in outcomes]) # (n_points, n_games)
+        self.scores = np.array([outcome['score'] for outcome in outcomes])
+
+    def metric(self, name):
+        """One value per point: 'survival_rate' (share in office at the end), 'mean_days' or 'mean_score'."""
+        if name == 'survival_rate': return self.survival[:, -1]
+        if name == 'mean_days': return self.days.mean(axis=1)
+        if name == 'mean_score': return self.scores.mean(axis=1)
+        raise ValueError(f"Unknown metric '{name}', expected one of {METRICS}")
+
+    def sensitivity(self, metric='survival_rate', bins=None):
+        """Parameter name -> first-order sensitivity index of the metric."""
+        return dict(zip(self.names, first_order_indices(self.inputs, self.metric(metric), bins).tolist()))
+
+
+# --- Sweep ---
+def _point_key(dataset_key, values, n_games, days, seed, action_probability):
+    document = {'version': CACHE_VERSION, 'dataset': dataset_key, 'params': Params(values).key(),
+                'games': n_games, 'days': days, 'seed': seed, 'action_probability': action_probability}
+    return hashlib.sha256(json.dumps(document, sort_keys=True).encode()).hexdigest()
+
+def _load_point(path):
+    try:
+        with np.load(path, allow_pickle=False) as arrays:
+            return {key: arrays[key] for key in ('days', 'score', 'survival')}
+    except (OSError, ValueError, KeyError):
+        return None # Missing or damaged: run the point again
+
+def _save_point(path, outcome):
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'wb') as f: np.savez(f, **outcome)
+        os.replace(temp_path, path) # Atomic: a killed sweep never leaves a half-written point
+    except OSError as e:
+        if instrument.level <= instrument.WARNING:
+            instrument.emit(instrument.WARNING, 'sweep.cache_failed', path=path, error=repr(e))
+
+def run_sweep(dataset, points, n_games=DEFAULT_GAMES, days=DEFAULT_DAYS, seed=0,
+              action_probability=DEFAULT_ACTION_PROBABILITY, workers=None, cache_dir=None, progress=None):
+    """Run every point of a design (dicts of parameter overrides) and return a SweepResult.
+
+    Points already in the cache are loaded instead of run. workers defaults to the
+    number of cores (0 runs in-process); progress(done, total) is called as points finish."""
+    cache_dir = CACHE_DIR if cache_dir is None else cache_dir
+    names = sorted(set().union(*points)) if points else []
+    dataset_key = dataset.fingerprint()
+    paths = [os.path.join(cache_dir, _point_key(dataset_key, point, n_games, days, seed, action_probability) + '.npz')
+             for point in points]
+    outcomes = [_load_point(path) for path in paths]
+    missing = [i for i, outcome in enumerate(outcomes) if outcome is None]
+    done = len(points) - len(missing)
+    if progress: progress(done, len(points))
+
+    def finish(i, outcome):
+        nonlocal done
+        outcomes[i] = outcome
+        _save_point(paths[i], outcome)
+        done += 1
+        if progress: progress(done, len(points))
+
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    if workers <= 0 or len(missing) <= 1:
+        for i in missing: finish(i, run_point(dataset, points[i], n_games, days, seed, action_probability))
+    else:
+        with SharedResults(outcome_layout(n_games, days), len(missing)) as results, \
+                concurrent.futures.ProcessPoolExecutor(min(workers, len(missing)), initializer=_init_worker,
+                                                       initargs=(dataset, results.handle())) as pool:
+            futures = {pool.submit(_run_in_worker, slot, points[i], n_games, days, seed, action_probability): slot
+                       for slot, i in enumerate(missing)}
+            for future in concurrent.futures.as_completed(futures):
+                future.result() # Re-raises a worker's error
+                slot = futures[future]
+                finish(missing[slot], {name: results[name][slot].copy() for name in results.layout})
+    return SweepResult(names, [{**{name: DEFAULTS[name] for name in names}, **point} for point in points], outcomes)
@@ -0,0 +1,179 @@
+# pmsim/tournament.py
+"""Strategy tournaments on the batch engine with a persistent SQLite results store.
+
+Every registered strategy (see pmsim.strategies) plays the same seeded games, and the
+results are kept in a local SQLite database. Game seeds are grouped in fixed blocks of
+BLOCK_SIZE. Block k is one BatchSimulation seeded with (tournament seed, k), and row i
+plays game seed ``k * BLOCK_SIZE + i``. A game's starting state therefore depends only
+on its seed and is the same for every strategy. Results are keyed by (config,
+strategy, seed), where the config hashes the map, parameters, game length and seed.
+Re-running a tournament only plays blocks with missing (strategy, seed) pairs and only
+inserts those pairs.
+
+Per-strategy totals are kept in a standings table that is updated with each write, so
+leaderboards read one small row per strategy instead of scanning every game.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+from pmsim import strategies
+from pmsim.batch import BatchSimulation
+from pmsim.params import DEFAULT_PARAMS
+
+ENGINE_VERSION = 1 # Bump when engine changes make stored results stale
+BLOCK_SIZE = 256
+DEFAULT_DAYS = 4 * 365
+DEFAULT_DB = os.environ.get('PMSIM_TOURNAMENT_DB',
+                            os.path.join(os.path.expanduser('~'), '.local', 'share', 'pmsim', 'tournaments.sqlite3'))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS configs (
+    config TEXT PRIMARY KEY,
+    description TEXT NOT NULL,
+    created REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS results (
+    config TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    score REAL NOT NULL,
+    days INTEGER NOT NULL,
+    survived INTEGER NOT NULL,
+    PRIMARY KEY (config, strategy, seed)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS results_by_score ON results (config, strategy, score);
+CREATE TABLE IF NOT EXISTS standings (
+    config TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    games INTEGER NOT NULL,
+    score_sum REAL NOT NULL,
+    score_squares REAL NOT NULL,
+    days_sum INTEGER NOT NULL,
+    survived INTEGER NOT NULL,
+    PRIMARY KEY (config, strategy)
+) WITHOUT ROWID;
+"""
+
+
+class ResultStore:
+    """SQLite store of tournament results (one row per config, strategy and seed)."""
+    def __init__(self, path=DEFAULT_DB):
+        if path != ':memory:': os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add_config(self, config, description):
+        with self.connection:
+            self.connection.execute("INSERT OR IGNORE INTO configs VALUES (?, ?, ?)",
+                                    (config, json.dumps(description, sort_keys=True), time.time()))
+
+    def configs(self):
+        """(config, description dict) pairs, newest first."""
+        rows = self.connection.execute("SELECT config, description FROM configs ORDER BY created DESC")
+        return [(config, json.loads(description)) for config, description in rows]
+
+    def missing_seeds(self, config, strategy, seeds):
+        """The seeds (from a range) that have no stored result yet."""
+        done = {seed for (seed,) in self.connection.execute(
+            "SELECT seed FROM results WHERE config = ? AND strategy = ? AND seed BETWEEN ? AND ?",
+            (config, strategy, seeds[0], seeds[-1]))}
+        return [seed for seed in seeds if seed not in done]
+
+    def add_results(self, config, strategy, seeds, scores, days, survived):
+        """Insert one block of results and fold them into the standings (one transaction)."""
+        rows = [(config, strategy, int(seed), float(score), int(day), int(alive))
+                for seed, score, day, alive in zip(seeds, scores, days, survived)]
+        with self.connection:
+            before = self.connection.total_changes
+            self.connection.executemany("INSERT OR IGNORE INTO results VALUES (?, ?, ?, ?, ?, ?)", rows)
+            if self.connection.total_changes != before: self._refresh_standing(config, strategy)
+
+    def _refresh_standing(self, config, strategy):
+        self.connection.execute(
+            """INSERT OR REPLACE INTO standings
+               SELECT config, strategy, COUNT(*), SUM(score), SUM(score * score), SUM(days), SUM(survived)
+               FROM results WHERE config = ? AND strategy = ?""", (config, strategy))
+
+    def leaderboard(self, config):
+        """Strategies ranked by mean score: dicts with strategy, games, mean_score,
+        score_std, survival_rate and mean_days."""
+        rows = self.connection.execute(
+            """SELECT strategy, games, score_sum, score_squares, days_sum, survived FROM standings
+               WHERE config = ? ORDER BY score_sum / games DESC""", (config,))
+        board = []
+        for strategy, games, score_sum, score_squares, days_sum, survived in rows:
+            mean = score_sum / games
+            board.append({'strategy': strategy, 'games': games, 'mean_score': mean,
+                          'score_std': max(0.0, score_squares / games - mean * mean) ** 0.5,
+                          'survival_rate': survived / games, 'mean_days': days_sum / games})
+        return board
+
+    def top_games(self, config, strategy, limit=10):
+        """Best (seed, score, days) results of one strategy (uses the score index)."""
+        return self.connection.execute(
+            "SELECT seed, score, days FROM results WHERE config = ? AND strategy = ? ORDER BY score DESC LIMIT ?",
+            (config, strategy, limit)).fetchall()
+
+
+def tournament_config(dataset, params, days, seed):
+    """Key and description of a tournament setup (what makes results comparable)."""
+    description = {'engine': ENGINE_VERSION, 'block_size': BLOCK_SIZE, 'dataset': dataset.name,
+                   'dataset_hash': dataset.fingerprint(), 'params': params.overrides(), 'days': days, 'seed': seed}
+    key = hashlib.sha256(json.dumps({**description, 'params': params.key()}, sort_keys=True).encode()).hexdigest()
+    return key, description
+
+
+def play_block(dataset, strategy, block, days=DEFAULT_DAYS, params=DEFAULT_PARAMS, seed=0):
+    """Play seed block `block` with strategy; returns (seeds, scores, days, survived)."""
+    batch = BatchSimulation(dataset, BLOCK_SIZE, seed=[seed, block], params=params)
+    for _ in range(days):
+        if not batch.running.any(): break
+        batch.apply_actions(strategy(batch))
+        batch.step_day()
+    seeds = np.arange(block * BLOCK_SIZE, (block + 1) * BLOCK_SIZE)
+    return seeds, batch.score(), batch.days, batch.running.copy()
+
+
+def run_tournament(dataset, names=None, n_games=1000, days=DEFAULT_DAYS, params=None, seed=0, store=None,
+                   progress=None):
+    """Play n_games seeds (0 .. n_games - 1) with every named strategy (default: all
+    registered), storing only missing results. Returns (config, leaderboard)."""
+    params = DEFAULT_PARAMS if params is None else params
+    names = sorted(strategies.STRATEGIES) if names is None else list(names)
+    own_store = store is None
+    store = ResultStore() if own_store else store
+    try:
+        config, description = tournament_config(dataset, params, days, seed)
+        store.add_config(config, description)
+        blocks = range((n_games + BLOCK_SIZE - 1) // BLOCK_SIZE)
+        total, done = len(names) * len(blocks), 0
+        for name in names:
+            strategy = strategies.get(name)
+            for block in blocks:
+                wanted = list(range(block * BLOCK_SIZE, min(n_games, (block + 1) * BLOCK_SIZE)))
+                missing = store.missing_seeds(config, name, wanted)
+                if missing:
+                    seeds, scores, game_days, survived = play_block(dataset, strategy, block, days, params, seed)
+                    rows = np.asarray(missing) - block * BLOCK_SIZE
+                    store.add_results(config, name, seeds[rows], scores[rows], game_days[rows], survived[rows])
+                done += 1
+                if progress: progress(done, total)
+        return config, store.leaderboard(config)
+    finally:
+        if own_store: store.close()
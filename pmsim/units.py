@@ -0,0 +1,102 @@
+# pmsim/units.py
+"""Struct-of-arrays storage for per-unit (prefecture) state.
+
+All per-unit numbers live in one NumPy array per field so daily updates, migration and
+elections are whole-array operations. ``UnitField`` lets object-style code keep using
+``prefecture.approval`` etc. as a view onto one row of the arrays.
+"""
+import numpy as np
+
+FIELDS = ('population', 'gdp', 'economy', 'approval', 'unemployment', 'population_growth_rate')
+
+# Valid ranges enforced by normalize (None = unbounded on that side)
+BOUNDS = {
+    'approval': (0.0, 100.0),
+    'unemployment': (1.0, 30.0),
+    'economy': (0.1, 3.0),
+    'gdp': (1.0, None),
+    'population': (1000.0, None), # Ensure pop doesn't go below a minimum threshold
+}
+
+# Max random change per unit per day (uniform +/- this much)
+DAILY_DRIFT = {'approval': 0.1, 'economy': 0.005, 'unemployment': 0.01}
+
+
+def draw_starting_stats(rng, n_units, size=(), hierarchy=None):
+    """Random starting economy/approval/unemployment, shape size + (n_units,).
+
+    With a hierarchy below prefecture level, units start close to a per-prefecture draw
+    (small local noise) rather than fully independent."""
+    size = tuple(size)
+    if hierarchy is None or hierarchy.is_identity:
+        return {'economy': rng.uniform(0.5, 1.5, size + (n_units,)),
+                'approval': rng.uniform(40.0, 60.0, size + (n_units,)),
+                'unemployment': rng.uniform(3.0, 10.0, size + (n_units,))}
+    n_prefectures = len(hierarchy.prefecture_names)
+    def correlated(low, high, spread):
+        return (hierarchy.expand(rng.uniform(low, high, size + (n_prefectures,)))
+                + rng.normal(0.0, spread, size + (n_units,)))
+    return {'approval': correlated(40.0, 60.0, 2.0), 'economy': correlated(0.5, 1.5, 0.05),
+            'unemployment': correlated(3.0, 10.0, 0.5)}
+
+
+class UnitArrays:
+    """Per-unit state: one float64 array per field, all of length n_units."""
+    def __init__(self, names, **values):
+        self.names = list(names)
+        n_units = len(self.names)
+        for field in FIELDS:
+            array = np.array(values[field], dtype=float)
+            if array.shape != (n_units,):
+                raise ValueError(f"{field} has shape {array.shape}, expected ({n_units},)")
+            setattr(self, field, array)
+
+    @classmethod
+    def generate(cls, names, population, gdp, growth_rate, rng):
+        """Build units from known population/GDP/growth and randomly drawn starting stats."""
+        return cls(names, population=population, gdp=gdp, population_growth_rate=growth_rate,
+                   **draw_starting_stats(rng, len(names)))
+
+    @classmethod
+    def from_buffer(cls, names, buffer):
+        """Units whose fields are views into buffer[..., k, :] (one row per FIELDS entry).
+
+        The buffer may carry leading batch axes, e.g. (n_games, len(FIELDS), n_units) for
+        the batch engine; updating the fields updates the buffer and vice versa."""
+        if buffer.shape[-2:] != (len(FIELDS), len(names)):
+            raise ValueError(f"buffer has shape {buffer.shape}, expected (..., {len(FIELDS)}, {len(names)})")
+        units = cls.__new__(cls)
+        units.names = list(names)
+        for k, field in enumerate(FIELDS):
+            setattr(units, field, buffer[..., k, :])
+        return units
+
+    def __len__(self):
+        return len(self.names)
+
+    def normalize(self, index=None):
+        """Clamp every bounded field into its valid range (all units, or only unit index)."""
+        for field, (low, high) in BOUNDS.items():
+            array = getattr(self, field)
+            if index is None:
+                np.clip(array, low, high, out=array)
+            else:
+                value = array[index]
+                if low is not None and value < low: array[index] = low
+                elif high is not None and value > high: array[index] = high
+
+    def gdp_per_capita(self):
+        return np.where(self.population > 0, self.gdp * 1_000_000_000 / np.maximum(self.population, 1.0), 0.0)
+
+
+class UnitField:
+    """Descriptor exposing one row of a UnitArrays field as a plain float attribute."""
+    def __init__(self, field):
+        self.field = field
+
+    def __get__(self, obj, objtype=None):
+        if obj is None: return self
+        return float(getattr(obj.store, self.field)[obj.index])
+
+    def __set__(self, obj, value):
+        getattr(obj.store, self.field)[obj.index] = value
@@ -2,196 +2,40 @@
 import sys
 import tkinter.font as tkfont
 import tkinter as tk
-from tkinter import messagebox, simpledialog
+from tkinter import messagebox
 from tkinter import ttk
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import matplotlib.dates as mdates
 import datetime
-import pickle
+import time
 import os
-import random
 import math
+import concurrent.futures
+import sqlite3
 import numpy as np
-
-# Prefecture Data
-PREFECTURE_NAMES = [
-    "Hokkaido", "Aomori", "Iwate", "Miyagi", "Akita", "Yamagata", "Fukushima", "Ibaraki", "Tochigi", "Gunma",
-    "Saitama", "Chiba", "Tokyo", "Kanagawa", "Niigata", "Toyama", "Ishikawa", "Fukui", "Yamanashi", "Nagano",
-    "Gifu", "Shizuoka", "Aichi", "Mie", "Shiga", "Kyoto", "Osaka", "Hyogo", "Nara", "Wakayama", "Tottori",
-    "Shimane", "Okayama", "Hiroshima", "Yamaguchi", "Tokushima", "Kagawa", "Ehime", "Kochi", "Fukuoka",
-    "Saga", "Nagasaki", "Kumamoto", "Oita", "Miyazaki", "Kagoshima", "Okinawa"
-]
-
-# Placeholder GDP data (e.g., in Billions USD) - From previous step
-PREFECTURE_GDP_PLACEHOLDERS = {
-    "Tokyo": 1000, "Osaka": 400, "Aichi": 380, "Kanagawa": 350, "Saitama": 230, "Chiba": 210, "Hyogo": 200,
-    "Fukuoka": 190, "Hokkaido": 180, "Shizuoka": 170, "Ibaraki": 130, "Hiroshima": 120, "Kyoto": 110,
-    "Niigata": 100, "Miyagi": 95, "Gunma": 90, "Tochigi": 88, "Okayama": 85, "Gifu": 80, "Nagano": 78,
-    "Mie": 75, "Fukushima": 70, "Shiga": 68, "Yamaguchi": 65, "Kumamoto": 60, "Ehime": 58, "Kagoshima": 55,
-    "Toyama": 53, "Ishikawa": 52, "Wakayama": 50, "Oita": 48, "Yamagata": 46, "Nagasaki": 45, "Yamanashi": 44,
-    "Aomori": 43, "Iwate": 42, "Akita": 40, "Miyazaki": 38, "Fukui": 37, "Kagawa": 36, "Tokushima": 35,
-    "Saga": 34, "Nara": 33, "Okinawa": 32, "Kochi": 30, "Shimane": 28, "Tottori": 25
-}
-
-# ** NEW: Placeholder Population Growth Rates (% per year) **
-# Based on general trends (Tokyo/Okinawa positive, many rural negative) - Needs real data
-PREFECTURE_GROWTH_RATES = {
-    "Tokyo": 0.4, "Kanagawa": 0.1, "Saitama": 0.05, "Chiba": 0.0, "Aichi": 0.0, "Osaka": -0.1, "Fukuoka": 0.05,
-    "Okinawa": 0.3, "Shiga": 0.0,
-    # Most others slightly negative or more significantly negative
-    "Hokkaido": -0.5, "Aomori": -1.0, "Iwate": -0.9, "Miyagi": -0.3, "Akita": -1.5, "Yamagata": -1.1, "Fukushima": -0.8,
-    "Ibaraki": -0.4, "Tochigi": -0.5, "Gunma": -0.6, "Niigata": -0.9, "Toyama": -0.7, "Ishikawa": -0.6, "Fukui": -0.7,
-    "Yamanashi": -0.6, "Nagano": -0.7, "Gifu": -0.5, "Shizuoka": -0.4, "Mie": -0.6, "Kyoto": -0.3, "Hyogo": -0.3,
-    "Nara": -0.7, "Wakayama": -1.0, "Tottori": -0.9, "Shimane": -1.1, "Okayama": -0.3, "Hiroshima": -0.2, "Yamaguchi": -0.8,
-    "Tokushima": -1.0, "Kagawa": -0.6, "Ehime": -0.9, "Kochi": -1.1, "Saga": -0.7, "Nagasaki": -1.0, "Kumamoto": -0.5,
-    "Oita": -0.8, "Miyazaki": -0.9, "Kagoshima": -0.8
+from pmsim import saves, instrument, eventlog
+from pmsim.calendar_table import CALENDAR
+from pmsim.advisor import Advisor, HORIZON_DAYS as ADVISOR_HORIZON_DAYS
+from pmsim.params import DEFAULT_PARAMS
+from pmsim.history import GameHistory, CAUSES as GAME_OVER_CAUSES
+from pmsim.autosave import Autosaver
+# ** MODIFIED: The engine lives in pmsim.engine (no Tk dependency); re-exported for existing imports **
+from pmsim.engine import (PREFECTURE_NAMES, PREFECTURE_GDP_PLACEHOLDERS, PREFECTURE_GROWTH_RATES, PREFECTURE_POPULATIONS,
+                          DEFAULT_PM_NAME, DEFAULT_PARTY_NAME, SCALES, FORECAST_ELEMENT_BUDGET, BUILTIN_DATASET_NAME,
+                          builtin_dataset, Prefecture, PrimeMinister, RivalParty, CountryStatistics, Simulation)
+
+AUTOSAVE_POLL_MS = 5000 # How often the UI checks whether a time-based autosave is due
+PERF_OVERLAY_MS = 500 # Sampling interval of the performance overlay
+PERF_OVERLAY_NAMES = ('apply_changes', 'create_approval_graph', 'update_event_list') # Redraw phases it shows
+CHART_REFRESH_MS = 1000 # Live updates redraw the regional chart at most this often
+# ** NEW: Unit fields behind each chart/map display option (regional means are population-weighted) **
+DISPLAY_FIELDS = {
+    "Population": {'population'}, "Approval": {'approval', 'population'}, "Economy": {'economy', 'population'},
+    "Unemployment": {'unemployment', 'population'}, "GDP": {'gdp'}, "GDP per Capita": {'gdp', 'population'},
+    "Pop. Growth": {'population_growth_rate', 'population'},
 }
 
-# ** NEW: Population data parsed from Wikipedia search results (Oct 1, 2022 figures) **
-PREFECTURE_POPULATIONS = {
-    'Tokyo': 14038167, 'Kanagawa': 9232489, 'Osaka': 8782484, 'Aichi': 7495171,
-    'Saitama': 7337089, 'Chiba': 6265975, 'Hyogo': 5402493, 'Hokkaido': 5140354,
-    'Fukuoka': 5116046, 'Shizuoka': 3582297, 'Ibaraki': 2839555, 'Hiroshima': 2759500,
-    'Kyoto': 2549749, 'Miyagi': 2279977, 'Niigata': 2152693, 'Nagano': 2019993,
-    'Gifu': 1945763, 'Gunma': 1913254, 'Tochigi': 1908821, 'Okayama': 1862317,
-    'Fukushima': 1790181, 'Mie': 1742174, 'Kumamoto': 1718327, 'Kagoshima': 1562662,
-    'Okinawa': 1468318, 'Shiga': 1408931, 'Yamaguchi': 1313403, 'Ehime': 1306486,
-    'Nara': 1305812, 'Nagasaki': 1283128, 'Aomori': 1204392, 'Iwate': 1180595,
-    'Ishikawa': 1117637, 'Oita': 1106831, 'Miyazaki': 1052338, 'Yamagata': 1041025,
-    'Toyama': 1016534, 'Kagawa': 934060, 'Akita': 929901, 'Wakayama': 903265,
-    'Yamanashi': 801874, 'Saga': 800787, 'Fukui': 752855, 'Tokushima': 703852,
-    'Kochi': 675705, 'Shimane': 657909, 'Tottori': 543620
-}
-
-
-DEFAULT_PM_NAME = "Shigeru Ishiba"
-DEFAULT_PARTY_NAME = "Liberal Democratic Party"
-
-class Prefecture:
-    # ** MODIFIED: Added population_growth_rate **
-    def __init__(self, name, population=None, gdp=None, growth_rate=None):
-        self.name = name
-        # Use float for population internally to handle fractional growth
-        self.population = float(population) if population is not None else float(random.randint(500000, 10000000))
-        self.gdp = float(gdp) if gdp is not None else random.uniform(20.0, 100.0) # Billions USD
-        self.economy = random.uniform(0.5, 1.5)
-        self.approval = random.uniform(40.0, 60.0)
-        self.unemployment = random.uniform(3.0, 10.0)
-        # ** NEW: Population Growth Rate (% per year) **
-        self.population_growth_rate = float(growth_rate) if growth_rate is not None else random.uniform(-1.0, 0.5) # Annual rate
-
-    # ** NEW: Method for daily population update **
-    def update_daily_population(self):
-        """Updates population based on the annual growth rate, applied daily."""
-        # Convert annual rate to daily rate (approximation)
-        daily_rate_multiplier = (1.0 + self.population_growth_rate / 100.0)**(1.0/365.0)
-        self.population *= daily_rate_multiplier
-        # Keep population as float internally, can round for display if needed
-
-    def normalize_values(self):
-        """Ensure all values are within valid ranges"""
-        self.approval = min(100.0, max(0.0, self.approval))
-        self.unemployment = min(30.0, max(1.0, self.unemployment))
-        self.economy = min(3.0, max(0.1, self.economy))
-        self.gdp = max(1.0, self.gdp)
-        self.population = max(1000.0, self.population) # Ensure pop doesn't go below a minimum threshold
-        # Optional: Clamp growth rate?
-        # self.population_growth_rate = min(5.0, max(-5.0, self.population_growth_rate))
-
-    def get_gdp_per_capita(self):
-        if self.population > 0:
-            return (self.gdp * 1_000_000_000) / self.population
-        return 0
-
-    # ** NEW: Convenience method to get integer population for display/some calcs **
-    def get_population_int(self):
-        return int(round(self.population))
-
-
-class PrimeMinister:
-    def __init__(self, name, party_name):
-        self.name = name
-        self.party_name = party_name
-        self.global_approval = 50.0
-        self.base_popularity = random.uniform(50.0, 70.0)
-        self.economy_skill = random.uniform(0.5, 1.5)
-        self.unemployment_skill = random.uniform(0.5, 1.5)
-        self.welfare_skill = random.uniform(0.5, 1.5)
-        # ** NEW: Skill related to demographics/growth policies? **
-        self.demographics_skill = random.uniform(0.5, 1.5)
-
-    def calculate_global_approval(self, prefectures):
-        total_approval = 0
-        total_population = 0
-        for prefecture in prefectures:
-            pop_int = prefecture.get_population_int() # Use integer pop for weighting
-            total_approval += prefecture.approval * pop_int
-            total_population += pop_int
-        if total_population > 0:
-            self.global_approval = min(100.0, max(0.0, (total_approval / total_population)))
-        else:
-            self.global_approval = 0.0 # Handle case of zero population
-        return self.global_approval
-
-class RivalParty:
-    def __init__(self, name):
-        self.name = name
-        self.base_popularity = random.uniform(40.0, 60.0)
-        # ** NEW: Attributes for attack strength? **
-        self.attack_skill = random.uniform(0.8, 1.2)
-        self.preferred_attack = random.choice(["economy", "scandal", "welfare", "competence"])
-
-    # ** NEW: Method to generate an attack message/effect **
-    def generate_attack(self):
-        """Generates a random attack message and potential approval impact."""
-        attack_type = self.preferred_attack
-        # Base impact range before skill modification
-        base_impact = random.uniform(0.5, 2.5)
-        # Modify impact by party's skill
-        impact = base_impact * self.attack_skill
-
-        messages = {
-            "economy": [
-                f"{self.name} criticizes the government's failed economic policies!",
-                f"'{self.party_name}'s economic plan is hurting families,' claims {self.name}.",
-                f"{self.name} points to rising inflation under the current administration."
-            ],
-            "scandal": [
-                f"{self.name} hints at potential corruption within the cabinet.",
-                f"Questions raised by {self.name} about the PM's transparency.",
-                f"{self.name} calls for an investigation into government spending."
-            ],
-            "welfare": [
-                f"{self.name} argues that welfare programs are being neglected.",
-                f"'{self.party_name} doesn't care about the elderly,' says {self.name}.",
-                f"{self.name} promises better social support if elected."
-            ],
-            "competence": [
-                f"{self.name} slams the government's handling of recent events.",
-                f"'{self.party_name} is out of touch with the people,' states {self.name}.",
-                f"{self.name} questions the PM's leadership abilities."
-            ]
-        }
-        message = random.choice(messages.get(attack_type, messages["competence"]))
-        return message, impact # Returns the message and the calculated approval hit
-
-
-class CountryStatistics:
-    def __init__(self):
-        self.economy = {
-            'gdp_ppp': 6.31, 'gdp_nominal': 4.204, 'gdp_per_capita': 36990.33,
-            'inflation': 3.2, 'growth_rate': 0.9,
-        }
-        self.demographics = {
-            'population': 125921755, 'density': 333.2, 'migration_rate': 0.08,
-            'birth_rate': 5.7,
-            'immigration': {
-                'total_foreigners': 3768977,
-                'source_countries': [("China", 873286), ("Vietnam", 634361), ("South Korea", 409238), ("Nepal", 124356), ("Brazil", 206886)],
-                'immigration_rate': 10.5
-            }
-        }
 
 class PrefectureTab:
     # (No changes needed in PrefectureTab class structure itself for these new features)
@@ -299,11 +143,8 @@ class PrefectureTab:
 
         self.populate_tree()
 
-    def populate_tree(self):
-        """Populate the treeview with sorted and filtered data"""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
+    def visible_rows(self):
+        """Filtered and sorted rows, formatted as displayed"""
         sort_column = self.sort_var.get()
         # ** MODIFIED: Updated column mapping **
         column_mapping = {
@@ -324,19 +165,51 @@ class PrefectureTab:
         except (TypeError, IndexError): # Added IndexError safety
              sorted_data = sorted(filtered_data, key=lambda x: x[0], reverse=not self.sort_asc_var.get())
 
-        # Insert data
-        for i, data in enumerate(sorted_data):
+        rows = []
+        for data in sorted_data:
             # ** MODIFIED: Unpack new data structure **
             name, population, economy, approval, unemployment, gdp, gdp_per_capita, growth_rate = data
             formatted_pop = f"{population:,}" # Use integer population for display
             formatted_gdp_pc = f"${gdp_per_capita:,.0f}"
             formatted_growth = f"{growth_rate:+.2f}%" # Format growth rate
 
-            # ** MODIFIED: Insert new columns **
-            self.tree.insert("", i, values=(name, formatted_pop, f"{economy:.2f}",
-                                          f"{approval:.1f}%", f"{unemployment:.1f}%",
-                                          f"{gdp:.1f}", formatted_gdp_pc,
-                                          formatted_growth)) # Added growth rate value
+            # ** MODIFIED: New columns **
+            rows.append((name, formatted_pop, f"{economy:.2f}",
+                         f"{approval:.1f}%", f"{unemployment:.1f}%",
+                         f"{gdp:.1f}", formatted_gdp_pc,
+                         formatted_growth)) # Added growth rate value
+        return rows
+
+    @instrument.timed('populate_tree', 'gui')
+    def populate_tree(self):
+        """Populate the treeview with sorted and filtered data"""
+        for item in self.tree.get_children():
+            self.tree.delete(item)
+
+        self.row_items = {} # name -> [tree item, displayed values]
+        rows = self.visible_rows()
+        for i, values in enumerate(rows):
+            self.row_items[values[0]] = [self.tree.insert("", i, values=values), values]
+        self.row_order = [values[0] for values in rows]
+
+    # ** NEW: Live updates rewrite only the rows whose displayed text changed **
+    @instrument.timed('refresh_rows', 'gui')
+    def refresh_rows(self, new_data):
+        """Update from new prefecture data, keeping the tree items (moved if the order changed)"""
+        self.prefecture_data = new_data
+        rows = self.visible_rows()
+        if len(rows) != len(self.row_items) or any(values[0] not in self.row_items for values in rows):
+            self.populate_tree(); return
+        for values in rows:
+            item = self.row_items[values[0]]
+            if values != item[1]:
+                self.tree.item(item[0], values=values); item[1] = values
+        order = [values[0] for values in rows]
+        current = self.row_order
+        for i, name in enumerate(order): # Move only the rows that are out of place
+            if current[i] != name:
+                current.remove(name); current.insert(i, name)
+                self.tree.move(self.row_items[name][0], "", i)
 
     def update_data(self, new_data):
         """Update with new prefecture data"""
@@ -351,6 +224,8 @@ class RegionAnalysisTab:
         self.parent = parent
         self.frame = tk.Frame(parent)
         self.prefecture_data = prefecture_data # Expects data with GDP/GDP p.c. and maybe growth
+        self.redraw_after_id = None # Pending live redraw
+        self.last_drawn = 0.0
         self.setup_ui()
 
     def setup_ui(self):
@@ -395,6 +270,7 @@ class RegionAnalysisTab:
         self.canvas = FigureCanvasTkAgg(self.fig, parent_frame)
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
 
+    @instrument.timed('update_chart', 'gui')
     def update_chart(self):
         """Update the chart with selected display option"""
         self.fig.clear()
@@ -485,12 +361,24 @@ class RegionAnalysisTab:
 
         self.fig.tight_layout(rect=[0, 0, 0.85, 1])
         self.canvas.draw()
+        self.last_drawn = time.perf_counter()
 
     def update_data(self, new_data):
         """Update with new prefecture data"""
         self.prefecture_data = new_data
         self.update_chart()
 
+    # ** NEW: Live updates redraw only when the shown metric changed, at most every CHART_REFRESH_MS **
+    def apply_changes(self, new_data, fields):
+        self.prefecture_data = new_data
+        if self.redraw_after_id is not None or not fields & DISPLAY_FIELDS.get(self.display_var.get(), fields): return
+        wait = self.last_drawn + CHART_REFRESH_MS / 1000 - time.perf_counter()
+        self.redraw_after_id = self.frame.after(max(0, int(wait * 1000)), self.redraw)
+
+    def redraw(self):
+        self.redraw_after_id = None
+        if self.frame.winfo_exists(): self.update_chart() # The window may have closed meanwhile
+
 
 class PrefectureMapTab:
     # (No major changes needed here unless adding Growth Rate as a map option)
@@ -528,6 +416,7 @@ class PrefectureMapTab:
         # Draw the initial map
         self.draw_map()
 
+    @instrument.timed('draw_map', 'gui')
     def draw_map(self):
         """Draw a simplified map of Japan with prefecture data"""
         self.canvas.delete("all")
@@ -690,495 +579,101 @@ class PrefectureMapTab:
         self.prefecture_data = new_data
         self.draw_map()
 
+    # ** NEW: Live updates redraw only when the coloring metric changed **
+    def apply_changes(self, new_data, fields):
+        self.prefecture_data = new_data
+        if fields & DISPLAY_FIELDS.get(self.color_var.get(), fields): self.draw_map()
 
-class Simulation:
-    def __init__(self, fresh=True, pm_name=None, party_name=None):
-        self.stats = CountryStatistics()
-        self.prefectures = []
-        
-        # Check if all prefectures have population data
-        for name in PREFECTURE_NAMES:
-            if name not in PREFECTURE_POPULATIONS:
-                print(f"Warning: Missing population data for {name}, using default.")
-                PREFECTURE_POPULATIONS[name] = 500000  # Default fallback
-        
-        # Initialize prefectures with real population data
-        for name in PREFECTURE_NAMES:
-            pop = PREFECTURE_POPULATIONS.get(name, 500000.0)  # Use real population data
-            gdp = PREFECTURE_GDP_PLACEHOLDERS.get(name, random.uniform(20.0, 100.0))
-            growth = PREFECTURE_GROWTH_RATES.get(name, random.uniform(-1.0, 0.5))
-            self.prefectures.append(Prefecture(name, population=pop, gdp=gdp, growth_rate=growth))
-        
-        self.pm_name = pm_name if pm_name else DEFAULT_PM_NAME
-        self.party_name = party_name if party_name else DEFAULT_PARTY_NAME
-        self.pm = PrimeMinister(self.pm_name, self.party_name)
-        self.day = 1
-        self.month = 1
-        self.year = 2025
-        self.running = True
-        self.game_over_reason = None
-        
-        # ** NEW: Election state management **
-        self.election_in_progress = None # Can be None, 'triggered', 'attack_phase', 'voting_day'
-        self.election_attack_messages = [] # Store messages for the popup
-        
-        # Initial calculation
-        self.pm.calculate_global_approval(self.prefectures)
-        self.approval_history = [self.pm.global_approval]
-        self.approval_dates = [datetime.date(self.year, self.month, self.day)]
-        
-        self.rivals = [
-            RivalParty("Constitutional Democratic Party"),
-            RivalParty("Democratic Party for the People"),
-            RivalParty("Nihon Ishin no Kai"),
-        ]
-        
-        self.events = []
-
-    def make_policy(self, policy_type):
-        """Make a policy and influence stats"""
-        if not self.running or self.election_in_progress: # Prevent actions during election
-            return None, "Game Over" if not self.running else "Election in Progress"
-
-        policy_effect = 0; policy_name = ""; catastrophic = False; positive = False # Define positive here
-
-        def high_risk_outcome(pos_range, neg_range):
-            success = random.random() < 0.5
-            value = random.uniform(*pos_range) if success else -random.uniform(*neg_range)
-            return value, success # Return value and success boolean
-
-        # --- Policy Effects ---
-        # (Simplified effects - adjust ranges and add more nuanced impacts)
-        if policy_type == "economy":
-            policy_effect, positive = high_risk_outcome((6, 14), (7, 15))
-            policy_name = random.choice(["Economic Stimulus", "Industrial Plan", "Trade Initiative", "Investment Promotion"])
-            for p in self.prefectures:
-                gdp_change = (0.02 + 0.03 * self.pm.economy_skill) if positive else (-0.01 - 0.03 / self.pm.economy_skill)
-                p.gdp *= (1 + gdp_change)
-                p.approval += policy_effect * random.uniform(0.8, 1.2) # Apply approval effect
-                p.economy += (0.1 * self.pm.economy_skill) if positive else (-0.1 / self.pm.economy_skill)
-                # Economy policy might slightly affect growth rate
-                p.population_growth_rate += (0.05 * self.pm.economy_skill) if positive else (-0.05 / self.pm.economy_skill)
-                p.normalize_values()
-            self.stats.economy['gdp_nominal'] = sum(p.gdp for p in self.prefectures)
-            self.stats.economy['growth_rate'] += (0.1 if positive else -0.1)
-
-        elif policy_type == "unemployment":
-            policy_effect, positive = high_risk_outcome((5, 10), (6, 12))
-            policy_name = random.choice(["Job Creation", "Workforce Training", "Small Business Support", "Employment Subsidy"])
-            for p in self.prefectures:
-                p.unemployment -= (1.0 + 1.0 * self.pm.unemployment_skill) if positive else (-0.5 - 1.0 / self.pm.unemployment_skill)
-                p.approval += policy_effect * random.uniform(0.7, 1.3)
-                # Maybe slightly boost growth if unemployment drops significantly?
-                if positive and p.unemployment < 4.0:
-                     p.population_growth_rate += 0.02 * self.pm.unemployment_skill
-                p.normalize_values()
-
-        elif policy_type == "welfare":
-            policy_effect, positive = high_risk_outcome((6, 12), (7, 14))
-            policy_name = random.choice(["Healthcare Reform", "Pension Overhaul", "Social Security Boost", "Family Support"])
-            for p in self.prefectures:
-                p.approval += policy_effect * random.uniform(0.9, 1.1)
-                # ** MODIFIED: Welfare policy directly impacts growth rate **
-                growth_impact = (0.1 + 0.1 * self.pm.welfare_skill) if positive else (-0.1 - 0.1 / self.pm.welfare_skill)
-                p.population_growth_rate += growth_impact
-                p.normalize_values()
-            self.stats.demographics['birth_rate'] += 0.1 if positive else -0.05 # Simplified national effect
-
-        # ** NEW POLICY EXAMPLE: Childcare Subsidies **
-        elif policy_type == "childcare_subsidies":
-            policy_effect, positive = high_risk_outcome((5, 10), (4, 8)) # Usually positive effect expected
-            policy_name = "Childcare Subsidy Program"
-            for p in self.prefectures:
-                p.approval += policy_effect * random.uniform(0.8, 1.2)
-                # Directly boost growth rate, more strongly if positive
-                growth_impact = (0.15 + 0.1 * self.pm.demographics_skill) if positive else (-0.05 / self.pm.demographics_skill)
-                p.population_growth_rate += growth_impact
-                p.normalize_values()
-            self.stats.demographics['birth_rate'] += 0.15 if positive else -0.02 # Small national effect
-
-
-        # --- Other policies (Austerity, Corruption, Gambles) ---
-        # (Keep existing logic, potentially add minor growth rate impacts)
-        elif policy_type == "austerity":
-            policy_effect, positive = high_risk_outcome((2, 6), (8, 16)) # More likely negative
-            policy_name = random.choice(["Austerity Budget", "Public Sector Cuts", "Welfare Reduction"])
-            for p in self.prefectures:
-                p.approval += policy_effect * random.uniform(0.8, 1.2)
-                p.economy -= 0.1 / self.pm.economy_skill # Austerity usually hurts economy score
-                p.unemployment += 0.5 / self.pm.unemployment_skill # And increases unemployment
-                # Austerity likely reduces population growth
-                p.population_growth_rate -= (0.1 + 0.1 / self.pm.demographics_skill)
-                p.normalize_values()
-
-        elif policy_type == "corrupt_deal": # Risk of scandal
-            policy_effect, positive = high_risk_outcome((1, 5), (10, 20)) # High risk of large negative if discovered
-            policy_name = random.choice(["Secret Deal", "Crony Contract", "Illegal Funding"])
-            if positive: # Got away with it (small temporary boost)
-                 policy_name += " (Successful)"
-                 for p in self.prefectures:
-                     p.approval += policy_effect
-                     p.normalize_values()
-            else: # Scandal!
-                policy_name += " Scandal Exposed!"
-                catastrophic = True # Treat exposure as catastrophic
-                for p in self.prefectures:
-                    p.approval += policy_effect # Apply large negative effect
-                    p.normalize_values()
-                self.events.append(f"SCANDAL! {policy_name}")
-
-
-        elif policy_type == "nuclear_energy_gamble":
-            policy_effect, positive = high_risk_outcome((12, 20), (15, 30))
-            if positive:
-                policy_name = "Nuclear Expansion Success"
-                for p in self.prefectures:
-                    p.gdp *= (1 + random.uniform(0.03, 0.06))
-                    p.approval += policy_effect * random.uniform(0.8, 1.2)
-                    p.economy += 0.2 * self.pm.economy_skill
-                    p.normalize_values()
-            else:
-                policy_name = "Nuclear Accident Disaster"
-                catastrophic = True
-                for p in self.prefectures:
-                    p.approval += policy_effect * random.uniform(0.9, 1.1)
-                    p.population_growth_rate -= random.uniform(0.1, 0.5) # People might leave affected areas
-                    p.normalize_values()
-                self.events.append(f"CATASTROPHE: {policy_name}")
-
-
-        elif policy_type == "tech_gamble":
-            policy_effect, positive = high_risk_outcome((15, 25), (12, 20))
-            if positive:
-                policy_name = "AI Tech Revolution"
-                for p in self.prefectures:
-                    p.gdp *= (1 + random.uniform(0.05, 0.10))
-                    p.approval += policy_effect * random.uniform(0.8, 1.2)
-                    p.economy += 0.3 * self.pm.economy_skill
-                    p.unemployment -= 0.5 * self.pm.unemployment_skill
-                    # Tech boom might attract people
-                    p.population_growth_rate += random.uniform(0.05, 0.15) * self.pm.demographics_skill
-                    p.normalize_values()
-            else:
-                policy_name = "Tech Bubble Burst"
-                for p in self.prefectures:
-                    p.gdp *= (1 - random.uniform(0.02, 0.05))
-                    p.approval += policy_effect * random.uniform(0.9, 1.1)
-                    p.economy -= 0.2 / self.pm.economy_skill
-                    # Bubble burst might slow growth
-                    p.population_growth_rate -= random.uniform(0.05, 0.1) / self.pm.demographics_skill
-                    p.normalize_values()
-
-
-        # Recalculate global approval after policy effects
-        self.pm.calculate_global_approval(self.prefectures)
-
-        # Add event message (avoiding duplicate scandal/catastrophe messages)
-        if not catastrophic and "Scandal" not in policy_name:
-             outcome = "Success" if positive else "Failure"
-             self.events.append(f"Policy: {policy_name} ({outcome})")
-
-        if len(self.events) > 10: self.events.pop(0)
-
-        # Check for election trigger
-        self.check_for_election()
-
-        return policy_effect, policy_name
-
-    def random_event(self):
-        """Random events affecting approval"""
-        if not self.running or self.election_in_progress: return None, None
-
-        if random.random() > 0.2: return None, None # 20% chance
-
-        event_type = random.choice(["scandal", "natural_disaster", "economic_boom", "foreign_success"])
-        event_name = ""; effect = 0
-
-        if event_type == "scandal":
-            event_name = random.choice(["Minister Resigns", "Corruption Allegations", "Funds Misuse Exposed", "Gaffe Backlash"])
-            effect = -random.uniform(3.0, 8.0)
-        elif event_type == "natural_disaster":
-            event_name = random.choice(["Typhoon Strike", "Kansai Earthquake", "Northern Flooding", "Volcano Warning"])
-            effect = -random.uniform(2.0, 5.0)
-            # Disasters can impact growth negatively
-            for p in self.prefectures:
-                 p.population_growth_rate -= random.uniform(0.01, 0.1) # Random small negative impact
-                 p.normalize_values()
-        elif event_type == "economic_boom":
-            event_name = random.choice(["Stock Market Rally", "Major Investment Deal", "Tourism Boom", "Tech Sector Growth"])
-            effect = random.uniform(3.0, 7.0)
-            # Booms might slightly increase growth
-            for p in self.prefectures:
-                 p.population_growth_rate += random.uniform(0.01, 0.05)
-                 p.normalize_values()
-        elif event_type == "foreign_success":
-            event_name = random.choice(["Trade Deal Signed", "Diplomatic Victory", "Peace Initiative Success", "New Alliance Formed"])
-            effect = random.uniform(2.0, 6.0)
-
-        # Apply approval effect locally
-        for p in self.prefectures:
-            p.approval += effect * random.uniform(0.7, 1.3)
-            p.normalize_values()
-
-        self.pm.calculate_global_approval(self.prefectures)
-        self.events.append(f"Event: {event_name}")
-        if len(self.events) > 10: self.events.pop(0)
-
-        self.check_for_election()
-        return event_type, event_name
-
-    # ** MODIFIED: Advance day handles population growth and election state **
-    def advance_day(self):
-        """Advance the simulation by one day, handling growth and elections."""
-        if not self.running: return None, None
-
-        # --- Handle Election State Machine ---
-        if self.election_in_progress == 'triggered':
-            self.election_in_progress = 'attack_phase'
-            self.handle_election_attacks() # Run attacks, update approval
-            # Record approval *after* attacks
-            self.approval_history.append(self.pm.global_approval)
-            self.approval_dates.append(datetime.date(self.year, self.month, self.day))
-            # Return immediately, day advances effectively to attack day results
-            return "election_attack", "Rival parties launch attacks!"
-
-        elif self.election_in_progress == 'attack_phase':
-            self.election_in_progress = 'voting_day'
-            # No approval change today, just transition state
-            # Day advances to voting day
-            # Record approval (should be same as end of attack day)
-            self.approval_history.append(self.pm.global_approval)
-            self.approval_dates.append(datetime.date(self.year, self.month, self.day))
-            return "election_voting", "Election voting begins!"
-
-        elif self.election_in_progress == 'voting_day':
-            self.handle_election_voting() # This will set running=False if lost
-            self.election_in_progress = None # Election cycle ends
-            # Record final approval after vote outcome (might be unchanged if won)
-            self.approval_history.append(self.pm.global_approval)
-            self.approval_dates.append(datetime.date(self.year, self.month, self.day))
-            # If still running, proceed with normal day advancement below
-            if not self.running:
-                 return "election_result", "Election results are in!" # Game Over handled by check later
-            # If survived, continue to normal day processing for the day *after* voting
-
-
-        # --- Normal Day Advancement ---
-        # Update Date
-        self.day += 1
-        days_in_month = 30 # Simplified month length (can be improved)
-        if self.month == 2: days_in_month = 28
-        if self.day > days_in_month:
-            self.day = 1; self.month += 1
-            if self.month > 12: self.month = 1; self.year += 1
-
-        # Apply daily population growth
-        for p in self.prefectures:
-            p.update_daily_population()
-
-        # Apply slight daily drift/changes to other stats (optional)
-        for p in self.prefectures:
-            p.approval += random.uniform(-0.1, 0.1) # Random drift
-            p.economy += random.uniform(-0.005, 0.005)
-            p.unemployment += random.uniform(-0.01, 0.01)
-            p.normalize_values()
-
-        # Recalculate global approval after drift
-        self.pm.calculate_global_approval(self.prefectures)
-
-        # Check for random events (which includes election check)
-        event_type, event_name = self.random_event()
-
-        # Record history (only if not handled by election logic above)
-        if self.election_in_progress is None:
-            try:
-                 current_date = datetime.date(self.year, self.month, self.day)
-            except ValueError: # Handle invalid dates like Feb 30
-                 # Attempt to fix the date, e.g., go to last valid day of previous month? Or first of current?
-                 try:
-                     current_date = datetime.date(self.year, self.month, self.day - 1) # Try previous day
-                 except ValueError:
-                     current_date = datetime.date(self.year, self.month, 1) # Fallback
-
-            self.approval_history.append(self.pm.global_approval)
-            self.approval_dates.append(current_date)
-
-
-        # Final check (mainly for game over state after events/voting)
-        if not self.running: return None, None # Ensure game over state stops further processing
-
-        return event_type, event_name
-
-
-    # ** NEW: Election attack phase logic **
-    def handle_election_attacks(self):
-        """Simulates rival attacks during the election campaign."""
-        if not self.running: return
-
-        total_approval_hit = 0
-        self.election_attack_messages = ["Election Attack Phase! Rivals respond:"] # Reset messages
-
-        for rival in self.rivals:
-            message, impact = rival.generate_attack()
-            self.election_attack_messages.append(f"- {message} (Impact: ~{impact:.1f}%)")
-            total_approval_hit += impact
-
-        # Apply the hit - reduce global approval and slightly randomized local approval
-        print(f"Total calculated attack impact: {total_approval_hit:.2f}%") # Debug
-        # Make the hit slightly variable
-        actual_hit = total_approval_hit * random.uniform(0.8, 1.2)
-        print(f"Actual approval hit applied: {actual_hit:.2f}%") # Debug
-
-        # Apply hit locally with variation
-        for p in self.prefectures:
-             local_hit_factor = random.uniform(0.7, 1.3)
-             p.approval -= actual_hit * local_hit_factor
-             p.normalize_values()
-
-        # Recalculate precise global approval after local hits
-        self.pm.calculate_global_approval(self.prefectures)
-
-        self.events.append("Election: Rivals launch attacks!")
-        # The messages stored in self.election_attack_messages will be shown by the App
-
-
-    # ** NEW: Election voting logic (separated from check) **
-    def handle_election_voting(self):
-        """Counts votes and determines election outcome."""
-        if not self.running: return
 
-        votes_to_keep = 0
-        votes_to_oust = 0
-        total_prefectures = len(self.prefectures)
+# ** NEW: Virtualized view of the full event log **
+class EventLogView:
+    """Filterable event history, newest first; the Listbox only ever holds the lines on screen.
 
-        for prefecture in self.prefectures:
-            if prefecture.approval >= 50.0:
-                votes_to_keep += 1
-            else:
-                votes_to_oust += 1
-
-        print(f"Election Voting Results: Keep: {votes_to_keep}, Oust: {votes_to_oust}") # Debug
-
-        # PM loses if more than half vote to oust
-        if votes_to_oust > total_prefectures / 2:
-            self.running = False # Set game state to over
-            self.game_over_reason = (f"Lost Election!\n"
-                                     f"Final Vote: Keep {votes_to_keep}, Oust {votes_to_oust}. "
-                                     f"({votes_to_oust}/{total_prefectures} prefectures voted against you).")
-            self.events.append("Election Result: Lost!")
-            print("Election Lost!") # Debug
-        else:
-             # PM survives the election
-             self.events.append("Election Result: Survived!")
-             # Store message to be shown by App
-             self.election_survival_message = (f"Election Survived!\n"
-                                               f"Votes to Keep: {votes_to_keep}\n"
-                                               f"Votes to Oust: {votes_to_oust}\n"
-                                               f"Your position is secure... for now.")
-             # Optional: Small approval boost for surviving?
-             boost = random.uniform(1.0, 4.0)
-             for p in self.prefectures:
-                 p.approval += boost
-                 p.normalize_values()
-             self.pm.calculate_global_approval(self.prefectures)
-             self.events.append(f"Approval boosted slightly after surviving election (+{boost:.1f}% approx).")
-
-
-    # ** MODIFIED: Election check only triggers the process **
-    def check_for_election(self):
-        """Checks if global approval triggers an election."""
-        if not self.running or self.election_in_progress: return # Don't trigger if game over or election already happening
-
-        election_threshold = 30.0 # ** CHANGED THRESHOLD **
-        if self.pm.global_approval < election_threshold:
-            self.election_in_progress = 'triggered'
-            print(f"Approval dropped to {self.pm.global_approval:.2f}%, election process triggered!") # Debug
-            self.events.append(f"Approval below {election_threshold}%! Election Triggered!")
-            # Message will be shown by App based on state change
+    Filters pick the matching log rows through the log's indexes (an integer array), and
+    scrolling, filtering or new events only rewrite the visible lines."""
+    SEVERITY_FILTERS = {"All": eventlog.INFO, "Warnings+": eventlog.WARNING, "Critical": eventlog.CRITICAL}
+    SEVERITY_COLORS = ("black", "#E65100", "#C62828")
 
+    def __init__(self, parent, log):
+        self.frame = tk.Frame(parent, bg="white")
+        self.log = log
+        self.rows = np.empty(0, dtype=np.int64) # Matching log rows, oldest first
+        self.seen = 0 # Log length rows is up to date with
+        self.top = 0 # First visible line (0 = newest match)
+        self.setup_ui()
+        self.refilter()
 
-    def skip_year(self):
-        """Skip ahead by one year, simulating daily changes."""
-        if not self.running or self.election_in_progress:
-             print("Cannot skip year while game is over or election is in progress.")
-             return self.running
-
-        original_date_str = f"{self.day}/{self.month}/{self.year}"
-        num_days_to_skip = 365 # Approximate a year
-
-        for i in range(num_days_to_skip):
-            # --- Simulate one day ---
-            if self.election_in_progress == 'triggered':
-                self.election_in_progress = 'attack_phase'
-                self.handle_election_attacks()
-            elif self.election_in_progress == 'attack_phase':
-                self.election_in_progress = 'voting_day'
-            elif self.election_in_progress == 'voting_day':
-                self.handle_election_voting()
-                self.election_in_progress = None
-                if not self.running: # Check if game ended after voting
-                     final_date = (datetime.date(self.year, self.month, self.day) + datetime.timedelta(days=i+1))
-                     self.year, self.month, self.day = final_date.year, final_date.month, final_date.day
-                     print(f"Game ended during year skip (election) on {self.day}/{self.month}/{self.year}")
-                     self.approval_history.append(self.pm.global_approval); self.approval_dates.append(final_date)
-                     return False # Stop skipping
-
-            # Apply daily growth if no election is happening or after it resolves
-            if self.election_in_progress is None:
-                for p in self.prefectures: p.update_daily_population()
-
-            # Apply drift/changes
-            for p in self.prefectures:
-                p.approval += random.uniform(-0.15, 0.15) # Slightly larger drift for skips
-                p.normalize_values()
-            self.pm.calculate_global_approval(self.prefectures)
-
-            # Higher chance of random event during skip
-            if random.random() < 0.05: # 5% chance per skipped day
-                self.random_event()
-                if not self.running: # Check if event caused game over
-                    final_date = (datetime.date(self.year, self.month, self.day) + datetime.timedelta(days=i+1))
-                    self.year, self.month, self.day = final_date.year, final_date.month, final_date.day
-                    print(f"Game ended during year skip (event) on {self.day}/{self.month}/{self.year}")
-                    self.approval_history.append(self.pm.global_approval); self.approval_dates.append(final_date)
-                    return False # Stop skipping
-
-            # Record approval periodically during skip for graph
-            if (i + 1) % 30 == 0: # Record roughly monthly
-                interim_date = (datetime.date(self.year, self.month, self.day) + datetime.timedelta(days=i+1))
-                self.approval_history.append(self.pm.global_approval)
-                # Ensure date is valid before appending
-                try: valid_date = datetime.date(interim_date.year, interim_date.month, interim_date.day)
-                except ValueError: continue # Skip if date becomes invalid during skip
-                self.approval_dates.append(valid_date)
-
-        # Update final date after skip completes successfully
-        final_date = (datetime.date(self.year, self.month, self.day) + datetime.timedelta(days=num_days_to_skip))
-        self.year, self.month, self.day = final_date.year, final_date.month, final_date.day
-
-        # Add final data point
-        self.approval_history.append(self.pm.global_approval)
-        self.approval_dates.append(final_date)
-
-        # Final check for election trigger after skip (if still running)
-        if self.running: self.check_for_election()
-
-        print(f"Skipped from {original_date_str} to {self.day}/{self.month}/{self.year}")
-        return self.running
-
-    # ** MODIFIED: Return prefecture data including growth rate **
-    def get_prefecture_data(self):
-        """Return data about all prefectures for display"""
-        return [(p.name, p.get_population_int(), p.economy, p.approval, p.unemployment,
-                 p.gdp, p.get_gdp_per_capita(), p.population_growth_rate)
-                for p in self.prefectures]
-
-    def get_recent_events(self):
-        return self.events
-
-    def calculate_final_score(self):
-        if not self.approval_history: return 0.0
-        return sum(self.approval_history) / len(self.approval_history)
+    def setup_ui(self):
+        filter_frame = tk.Frame(self.frame, bg="white"); filter_frame.pack(fill=tk.X)
+        self.type_var = tk.StringVar(value="All")
+        type_menu = ttk.Combobox(filter_frame, textvariable=self.type_var, values=["All"] + [kind.title() for kind in eventlog.TYPES], width=10, state="readonly"); type_menu.pack(side=tk.LEFT, padx=2)
+        self.severity_var = tk.StringVar(value="All")
+        severity_menu = ttk.Combobox(filter_frame, textvariable=self.severity_var, values=list(self.SEVERITY_FILTERS), width=9, state="readonly"); severity_menu.pack(side=tk.LEFT, padx=2)
+        self.search_entry = tk.Entry(filter_frame, width=10); self.search_entry.pack(side=tk.LEFT, padx=2, fill=tk.X, expand=True)
+        self.count_label = tk.Label(filter_frame, text="", bg="white", fg="#616161"); self.count_label.pack(side=tk.RIGHT)
+
+        list_frame = tk.Frame(self.frame, bg="white"); list_frame.pack(fill=tk.BOTH, expand=True)
+        self.scrollbar = tk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.on_scroll); self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        font = ("Arial", 11)
+        self.listbox = tk.Listbox(list_frame, font=font, height=10, width=35, bd=0, highlightthickness=0); self.listbox.pack(fill=tk.BOTH, expand=True)
+        self.line_height = tkfont.Font(font=font).metrics("linespace") + 1
+
+        type_menu.bind("<<ComboboxSelected>>", lambda e: self.refilter())
+        severity_menu.bind("<<ComboboxSelected>>", lambda e: self.refilter())
+        self.search_entry.bind("<KeyRelease>", lambda e: self.refilter())
+        self.listbox.bind("<Configure>", lambda e: self.render()) # Resizing changes the visible line count
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"): self.listbox.bind(sequence, self.on_wheel)
+
+    def filters(self):
+        kind = self.type_var.get().lower()
+        return {'types': None if kind == "all" else (kind,), 'min_severity': self.SEVERITY_FILTERS[self.severity_var.get()],
+                'contains': self.search_entry.get().strip() or None}
+
+    def visible_lines(self):
+        height = self.listbox.winfo_height()
+        return max(1, height // self.line_height) if height > 1 else int(self.listbox.cget("height"))
+
+    def set_log(self, log):
+        self.log = log
+        self.refilter()
+
+    def refilter(self):
+        self.rows = self.log.select(**self.filters())
+        self.seen, self.top = len(self.log), 0
+        self.render()
+
+    def extend(self):
+        """Take in entries logged since the last update (only they are matched against the filters)."""
+        if len(self.log) == self.seen: return
+        new = self.log.select(first=self.seen, **self.filters())
+        self.seen = len(self.log)
+        if new.size:
+            self.rows = np.concatenate([self.rows, new])
+            if self.top: self.top += new.size # Keep a scrolled-back view on the same entries
+        self.render()
+
+    def render(self):
+        n, lines = len(self.rows), self.visible_lines()
+        self.top = max(0, min(self.top, n - lines))
+        self.listbox.delete(0, tk.END)
+        for i, row in enumerate(self.rows[::-1][self.top:self.top + lines].tolist()):
+            tick, _, severity, message = self.log.entry(row)
+            year, month, day = CALENDAR.ymd(tick)
+            self.listbox.insert(tk.END, f"{day}/{month}/{year}  {message}")
+            if severity: self.listbox.itemconfig(i, fg=self.SEVERITY_COLORS[severity])
+        if n: self.scrollbar.set(self.top / n, min(1.0, (self.top + lines) / n))
+        else: self.scrollbar.set(0.0, 1.0)
+        self.count_label.config(text=f"{n}/{len(self.log)}")
+
+    def on_scroll(self, action, amount, unit=None):
+        if action == "moveto": self.top = int(float(amount) * len(self.rows))
+        else: self.top += int(amount) * (self.visible_lines() if unit == "pages" else 1)
+        self.render()
+
+    def on_wheel(self, event):
+        up = event.num == 4 or getattr(event, 'delta', 0) > 0
+        self.on_scroll("scroll", -3 if up else 3, "units")
+        return "break"
 
 
 class JapanPMSimulatorApp:
@@ -1196,6 +691,32 @@ class JapanPMSimulatorApp:
 
         self.simulation = None
         self.prefecture_window_open = False # Flag to track if prefecture window is open
+        self.refresh_pending = False # A coalesced redraw is queued (see schedule_refresh)
+
+        # ** NEW: Search-based advisor, run off the UI thread **
+        self.advisor = Advisor()
+        self.advisor_thread = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+        self.advisor_future = None
+        self.pending_move = None # Policy played before the next day (for advisor tree reuse)
+
+        # ** NEW: Local high-score / game-history database **
+        try: self.history = GameHistory()
+        except (OSError, sqlite3.Error) as e:
+            self.history = None
+            if instrument.level <= instrument.WARNING:
+                instrument.emit(instrument.WARNING, 'history.unavailable', error=repr(e))
+        self.history_window = None
+
+        # ** NEW: Periodic background autosave (checked after each day and on a timer) **
+        self.autosaver = Autosaver()
+        self.root.after(AUTOSAVE_POLL_MS, self.autosave_tick)
+
+        # ** NEW: Performance overlay (F12), fed by the instrumentation counters **
+        self.perf_label = None
+        self.perf_sampler = None # instrument.Sampler while the overlay is on
+        self.perf_after_id = None
+        self.perf_owns_instruments = False # Whether the overlay turned instrumentation on
+        self.root.bind('<F12>', self.toggle_perf_overlay)
 
         self.show_welcome_screen()
 
@@ -1226,7 +747,9 @@ class JapanPMSimulatorApp:
         button_frame = tk.Frame(welcome_frame, bg="#f0f0f8", pady=20); button_frame.pack()
         new_game_btn = tk.Button(button_frame, text="Start New Game", font=("Arial", 12), command=self.start_new_game, bg="#4CAF50", fg="white", padx=20, pady=10); new_game_btn.grid(row=0, column=0, padx=10)
         load_game_btn = tk.Button(button_frame, text="Load Game", font=("Arial", 12), command=self.load_game, bg="#2196F3", fg="white", padx=20, pady=10); load_game_btn.grid(row=0, column=1, padx=10)
-        quit_btn = tk.Button(button_frame, text="Quit", font=("Arial", 12), command=self.quit_game, bg="#f44336", fg="white", padx=20, pady=10); quit_btn.grid(row=0, column=2, padx=10)
+        history_btn = tk.Button(button_frame, text="High Scores", font=("Arial", 12), command=self.show_history_screen, bg="#FF9800", fg="white", padx=20, pady=10); history_btn.grid(row=0, column=2, padx=10)
+        if self.history is None: history_btn.config(state=tk.DISABLED)
+        quit_btn = tk.Button(button_frame, text="Quit", font=("Arial", 12), command=self.quit_game, bg="#f44336", fg="white", padx=20, pady=10); quit_btn.grid(row=0, column=3, padx=10)
 
 
     def show_country_stats(self):
@@ -1237,18 +760,12 @@ class JapanPMSimulatorApp:
         stats = self.simulation.stats
         prefectures = self.simulation.prefectures
 
-        # Calculate dynamic totals/averages using integer population
-        total_pop = sum(p.get_population_int() for p in prefectures)
-        total_gdp_nominal = sum(p.gdp for p in prefectures)
-
-        stats.demographics['population'] = total_pop
-        stats.economy['gdp_nominal'] = total_gdp_nominal
-        stats.economy['gdp_per_capita'] = (total_gdp_nominal * 1_000_000_000) / total_pop if total_pop > 0 else 0
-        # Calculate average growth rate (weighted by population)
-        if total_pop > 0:
-             weighted_growth_sum = sum(p.get_population_int() * p.population_growth_rate for p in prefectures)
-             avg_growth_rate = weighted_growth_sum / total_pop
-        else: avg_growth_rate = 0
+        # ** MODIFIED: Totals/averages (integer-population weighted) come from the cached national aggregates **
+        national = self.simulation.national
+        stats.demographics['population'] = national.population
+        stats.economy['gdp_nominal'] = national.gdp
+        stats.economy['gdp_per_capita'] = national.gdp_per_capita
+        avg_growth_rate = national.growth_rate
 
 
         # --- Calculate Rankings ---
@@ -1301,8 +818,9 @@ class JapanPMSimulatorApp:
             if still_running:
                 messagebox.showinfo("Time Advanced",
                                 f"One year has passed. The date is now {self.simulation.day}/{self.simulation.month}/{self.simulation.year}.")
-                self.update_display() # Update display after successful skip
+                self.schedule_refresh() # Update display after successful skip
                 self.check_election_messages() # Check if election was triggered during skip
+                self.autosaver.maybe_save(self.simulation)
             else:
                 # Game ended during the skip, show game over screen
                 self.show_game_over_screen()
@@ -1315,15 +833,59 @@ class JapanPMSimulatorApp:
         self.game_over_shown = False # Reset flag for new game
         self.setup_game_screen()
 
+    # ** NEW: Slot picker built from the save headers (one small read per file) **
+    def pick_save_slot(self, mode):
+        """Modal list of save slots for mode 'save' or 'load' (which also lists autosaves);
+        returns (label, path) of the choice or None."""
+        existing = saves.list_slots()
+        slots = {(str(slot), saves.slot_path(slot)): header for slot, header in existing.items()}
+        if mode == 'save': # Offer the first free slot as well
+            free = next((slot for slot in range(1, saves.MAX_SLOTS + 1) if slot not in existing), None)
+            if free is not None: slots[(str(free), saves.slot_path(free))] = 'empty'
+        else:
+            slots.update({(f"Auto {index}", saves.autosave_path(index)): header
+                          for index, header in saves.list_autosaves().items()})
+        if not slots:
+            messagebox.showinfo("Load Game", "No saved games found."); return None
+
+        dialog = tk.Toplevel(self.root); dialog.title("Save Game" if mode == 'save' else "Load Game")
+        dialog.transient(self.root); dialog.geometry("760x320")
+        columns = ("slot", "pm", "party", "date", "approval", "status", "saved")
+        headings = ("Slot", "Prime Minister", "Party", "Game Date", "Approval", "Status", "Saved")
+        tree = ttk.Treeview(dialog, columns=columns, show="headings", height=10, selectmode="browse")
+        for column, heading, width in zip(columns, headings, (60, 150, 165, 85, 70, 125, 105)):
+            tree.heading(column, text=heading); tree.column(column, width=width, anchor=tk.W)
+        choices = list(slots)
+        for i, ((label, _), header) in enumerate(slots.items()):
+            if header == 'empty': values = (label, "— empty slot —", "", "", "", "", "")
+            elif header is None: values = (label, "(older save)", "", "", "", "Details shown on load", "")
+            elif isinstance(header, saves.SaveError): values = (label, "(unreadable)", "", "", "", str(header), "")
+            else:
+                values = (label, header.pm_name, header.party_name, f"{header.day}/{header.month}/{header.year}",
+                          f"{header.approval:.1f}%", header.status,
+                          datetime.datetime.fromtimestamp(header.saved_at).strftime("%Y-%m-%d %H:%M"))
+            tree.insert("", tk.END, iid=str(i), values=values)
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        choice = {'slot': None}
+        def choose(_event=None):
+            if tree.selection(): choice['slot'] = choices[int(tree.selection()[0])]; dialog.destroy()
+        button_frame = tk.Frame(dialog); button_frame.pack(pady=5)
+        tk.Button(button_frame, text="Save" if mode == 'save' else "Load", command=choose, width=10).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Cancel", command=dialog.destroy, width=10).pack(side=tk.LEFT, padx=5)
+        tree.bind("<Double-1>", choose)
+        dialog.grab_set(); self.root.wait_window(dialog)
+        return choice['slot']
+
     def load_game(self):
         try:
-            slot = simpledialog.askinteger("Load Game", "Enter save slot (1-3):", minvalue=1, maxvalue=3)
-            if slot is None: return
-            save_file = f"pm_simulator_save_{slot}.pkl"
+            choice = self.pick_save_slot('load')
+            if choice is None: return
+            slot, save_file = choice
             if not os.path.exists(save_file):
                 messagebox.showerror("Error", f"Save file for slot {slot} not found"); return
             try:
-                with open(save_file, "rb") as f: self.simulation = pickle.load(f)
+                self.simulation = saves.load(save_file)
                 self.game_over_shown = False # Reset flag on load
 
                 if not self.simulation.running:
@@ -1356,6 +918,7 @@ class JapanPMSimulatorApp:
         # ** NEW: Election Status Label **
         self.election_status_label = tk.Label(self.info_frame, text="", font=("Arial", 12, "bold"), fg="red", bg="#e1e1f0");
         self.election_status_label.grid(row=2, column=0, columnspan=2, sticky="w")
+        self.autosave_label = tk.Label(self.info_frame, text="", font=("Arial", 10), fg="red", bg="#e1e1f0"); self.autosave_label.grid(row=3, column=0, columnspan=2, sticky="w")
 
 
         # Middle section (graph/events - remains same structure)
@@ -1363,8 +926,8 @@ class JapanPMSimulatorApp:
         self.graph_frame = tk.Frame(middle_frame, bg="white", bd=2, relief=tk.GROOVE); self.graph_frame.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
         event_frame = tk.Frame(middle_frame, bg="white", bd=2, relief=tk.GROOVE, width=300); event_frame.grid(row=0, column=1, sticky="nsew", padx=5, pady=5)
         middle_frame.grid_columnconfigure(0, weight=7); middle_frame.grid_columnconfigure(1, weight=3); middle_frame.grid_rowconfigure(0, weight=1)
-        tk.Label(event_frame, text="Recent Events / Log", font=("Arial", 14, "bold"), bg="white").pack(anchor="w", padx=10, pady=5)
-        self.event_listbox = tk.Listbox(event_frame, font=("Arial", 11), height=10, width=35, bd=0, highlightthickness=0); self.event_listbox.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        tk.Label(event_frame, text="Event Log", font=("Arial", 14, "bold"), bg="white").pack(anchor="w", padx=10, pady=5)
+        self.event_view = EventLogView(event_frame, self.simulation.events); self.event_view.frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
 
         # Policy buttons section
         policy_frame = tk.Frame(main_frame, bg="#f0f0f8", pady=5); policy_frame.pack(fill=tk.X, padx=10, pady=5)
@@ -1379,6 +942,7 @@ class JapanPMSimulatorApp:
             ("Nuclear Gamble", "nuclear_energy_gamble", "#fbc02d", "black", 1, 2), ("Tech Gamble", "tech_gamble", "#1976d2", "white", 1, 3),
         ]
         self.policy_buttons = {}
+        self.policy_labels = {ptype: text for text, ptype, *_ in policy_buttons_config}
         for text, ptype, bg, fg, r, c in policy_buttons_config:
              btn = tk.Button(btn_frame, text=text, command=lambda pt=ptype: self.policy_action(pt), width=btn_width, height=btn_height, bg=bg, fg=fg, font=btn_font)
              btn.grid(row=r, column=c, padx=3, pady=3)
@@ -1388,18 +952,26 @@ class JapanPMSimulatorApp:
         control_frame = tk.Frame(policy_frame, bg="#f0f0f8"); control_frame.pack(pady=5)
         self.next_day_btn = tk.Button(control_frame, text="Next Day ➡️", command=self.next_day, width=btn_width*2, height=btn_height, bg="#9C27B0", fg="white", font=btn_font); self.next_day_btn.grid(row=0, column=0, padx=3, pady=3)
         self.skip_year_btn = tk.Button(control_frame, text="Skip Year ⏩", command=self.skip_year, width=btn_width*2, height=btn_height, bg="#673AB7", fg="white", font=btn_font); self.skip_year_btn.grid(row=0, column=1, padx=3, pady=3)
+        # ** NEW: Advisor suggestion next to the policy buttons **
+        self.advisor_btn = tk.Button(control_frame, text="Ask Advisor 💡", command=self.ask_advisor, width=btn_width, height=btn_height, bg="#00897B", fg="white", font=btn_font); self.advisor_btn.grid(row=0, column=2, padx=3, pady=3)
+        self.advisor_label = tk.Label(policy_frame, text="", font=("Arial", 10, "italic"), bg="#f0f0f8", fg="#00695C"); self.advisor_label.pack()
 
         # Bottom Menu (Save, Stats, End Game)
         self.menu_frame = tk.Frame(main_frame, bg="#f0f0f8"); self.menu_frame.pack(fill=tk.X, padx=10, pady=5)
         self.save_btn = tk.Button(self.menu_frame, text="Save Game", command=self.save_game, bg="#673AB7", fg="white", font=("Arial", 10)); self.save_btn.pack(side=tk.LEFT, padx=5)
         self.stats_btn = tk.Button(self.menu_frame, text="Country Stats", command=self.show_country_stats, bg="#607D8B", fg="white", font=("Arial", 10)); self.stats_btn.pack(side=tk.LEFT, padx=5)
         self.end_game_btn = tk.Button(self.menu_frame, text="End Game", command=self.confirm_end_game, bg="#f44336", fg="white", font=("Arial", 10)); self.end_game_btn.pack(side=tk.RIGHT, padx=5)
+        tk.Button(self.menu_frame, text="Perf (F12)", command=self.toggle_perf_overlay, bg="#455A64", fg="white", font=("Arial", 10)).pack(side=tk.RIGHT, padx=5)
 
         self.add_prefecture_button() # Adds prefecture button to menu
+        # ** NEW: Widgets follow the simulation's change bus from here on **
+        self.simulation.changes.subscribe(self.on_simulation_changes)
+        if self.prefecture_window_open: self.simulation.changes.subscribe(self.on_prefecture_changes, topics=('units',))
         self.create_approval_graph() # Initial graph draw
         self.update_display() # Update all UI elements to reflect initial state
 
 
+    @instrument.timed('create_approval_graph', 'gui')
     def create_approval_graph(self):
         # (Graph creation logic remains largely the same as previous step)
         # Ensure it handles potentially empty history gracefully
@@ -1407,14 +979,15 @@ class JapanPMSimulatorApp:
         for widget in self.graph_frame.winfo_children(): widget.destroy()
         fig, ax = plt.subplots(figsize=(5, 3), dpi=100)
         approval_data = self.simulation.approval_history if self.simulation else []
-        approval_dates = self.simulation.approval_dates if self.simulation else []
+        approval_ordinals = self.simulation.approval_ordinals if self.simulation else []
 
         if len(approval_data) > 1:
-            min_len = min(len(approval_dates), len(approval_data))
-            dates, data = approval_dates[:min_len], approval_data[:min_len]
-            if dates and data: # Ensure not empty after slicing
+            min_len = min(len(approval_ordinals), len(approval_data))
+            ordinals, data = approval_ordinals[:min_len], approval_data[:min_len]
+            if ordinals and data: # Ensure not empty after slicing
+                dates = CALENDAR.to_datetime64(ordinals) # One table lookup for the whole series
                 ax.plot(dates, data, marker='o', markersize=3, linestyle='-', color='#2196F3', linewidth=1.5)
-                date_range = max(dates) - min(dates)
+                date_range = datetime.timedelta(days=max(ordinals) - min(ordinals))
                 if date_range.days > 730: loc, fmt = mdates.YearLocator(), mdates.DateFormatter('%Y')
                 elif date_range.days > 180: loc, fmt = mdates.MonthLocator(interval=3), mdates.DateFormatter('%b %Y')
                 elif date_range.days > 30: loc, fmt = mdates.MonthLocator(), mdates.DateFormatter('%b %d')
@@ -1437,15 +1010,15 @@ class JapanPMSimulatorApp:
         canvas = FigureCanvasTkAgg(fig, self.graph_frame); canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True); canvas.draw()
 
 
-    def update_event_list(self):
-        self.event_listbox.delete(0, tk.END)
+    @instrument.timed('update_event_list', 'gui')
+    def update_event_list(self, new_only=False):
         if not self.simulation: return
-        events = self.simulation.get_recent_events()
-        for event in reversed(events): # Show newest first
-            self.event_listbox.insert(tk.END, event)
+        if new_only and self.event_view.log is self.simulation.events: self.event_view.extend()
+        else: self.event_view.set_log(self.simulation.events)
 
 
     # ** MODIFIED: update_display handles election state UI **
+    @instrument.timed('update_display', 'gui')
     def update_display(self):
         if not self.simulation: return
 
@@ -1458,7 +1031,19 @@ class JapanPMSimulatorApp:
         self.date_label.config(text=f"Date: {self.simulation.day}/{self.simulation.month}/{self.simulation.year}")
         self.approval_label.config(text=f"Approval: {self.simulation.pm.global_approval:.2f}%")
 
-        # Update election status label and button states
+        self.update_election_status()
+
+        # Update graph and event list (always update)
+        self.create_approval_graph()
+        self.update_event_list()
+
+        # Update prefecture window if open
+        if self.prefecture_window_open:
+            self.refresh_prefecture_window_data()
+        self.simulation.changes.clear() # Everything is up to date
+
+    def update_election_status(self):
+        """Election status label and button states"""
         election_status_text = ""
         action_button_state = tk.NORMAL
         if self.simulation.election_in_progress == 'triggered':
@@ -1470,6 +1055,9 @@ class JapanPMSimulatorApp:
         elif self.simulation.election_in_progress == 'voting_day':
             election_status_text = "ELECTION: Voting Day! Results soon..."
             action_button_state = tk.DISABLED
+        # ** NEW: Show the forecast chance of keeping office during an election **
+        if self.simulation.election_in_progress:
+            election_status_text += f" (Chance to keep office: {self.simulation.forecast_election():.0%})"
 
         self.election_status_label.config(text=election_status_text)
 
@@ -1478,17 +1066,71 @@ class JapanPMSimulatorApp:
             if btn: btn.config(state=action_button_state)
         if hasattr(self, 'next_day_btn'): self.next_day_btn.config(state=tk.NORMAL) # Next day always active to advance election
         if hasattr(self, 'skip_year_btn'): self.skip_year_btn.config(state=action_button_state)
-        if hasattr(self, 'save_btn'): self.save_btn.config(state=action_button_state) # Prevent saving during election?
-
-
-        # Update graph and event list (always update)
-        self.create_approval_graph()
-        self.update_event_list()
-
-        # Update prefecture window if open
-        if self.prefecture_window_open:
-            self.refresh_prefecture_window_data()
-
+        if hasattr(self, 'save_btn'): self.save_btn.config(state=tk.NORMAL) # Saving mid-election is allowed
+
+    # ** NEW: Redraws follow the simulation's change bus, coalesced into one pass per frame **
+    def schedule_refresh(self):
+        """Redraw what changed once the event loop is idle (repeated calls before then share one pass)."""
+        if self.refresh_pending: return
+        self.refresh_pending = True
+        self.root.after_idle(self.apply_changes)
+
+    @instrument.timed('apply_changes', 'gui')
+    def apply_changes(self):
+        self.refresh_pending = False
+        if self.simulation: self.simulation.changes.flush()
+
+    def on_simulation_changes(self, changes):
+        """Bus subscriber of the game screen: update only the widgets the changes touch."""
+        if not self.simulation.running:
+            if not self.game_over_shown: self.show_game_over_screen()
+            return
+        if 'date' in changes:
+            self.date_label.config(text=f"Date: {self.simulation.day}/{self.simulation.month}/{self.simulation.year}")
+        if 'approval' in changes:
+            self.approval_label.config(text=f"Approval: {self.simulation.pm.global_approval:.2f}%")
+        # The forecast shown during an election moves with approval
+        if 'election' in changes or (self.simulation.election_in_progress and 'approval' in changes):
+            self.update_election_status()
+        if 'history' in changes: self.create_approval_graph()
+        if 'events' in changes: self.update_event_list(new_only=True)
+
+
+    # ** NEW: Advisor runs in a background thread; buttons stay disabled until it answers **
+    def ask_advisor(self):
+        if not self.simulation or not self.simulation.running or self.advisor_future is not None: return
+        self.advisor_label.config(text="Advisor is thinking...")
+        for btn in list(self.policy_buttons.values()) + [self.next_day_btn, self.skip_year_btn, self.advisor_btn]:
+            btn.config(state=tk.DISABLED)
+        self.advisor_future = self.advisor_thread.submit(self.advisor.recommend, self.simulation)
+        self.root.after(50, self.show_advice)
+
+    def show_advice(self):
+        if self.advisor_future is None: return
+        if not self.advisor_future.done():
+            self.root.after(50, self.show_advice); return
+        error = None
+        try:
+            advice = self.advisor_future.result()
+        except Exception as e:
+            advice, error = None, e
+            if instrument.level <= instrument.WARNING:
+                instrument.emit(instrument.WARNING, 'advisor.failed', error=repr(e))
+        self.advisor_future = None
+        self.advisor_btn.config(state=tk.NORMAL)
+        if advice is None:
+            self.advisor_label.config(text="Advisor is unavailable." + (f" ({error})" if error else ""))
+        elif advice['expected_approval'] is None:
+            sim = self.simulation
+            reason = ("no simulation finished in time" if sim.running and not sim.election_in_progress
+                      else "no policies possible now")
+            self.advisor_label.config(text=f"Advisor suggests: Next Day ({reason})")
+        else:
+            action = self.policy_labels.get(advice['action'], "Next Day (wait)")
+            self.advisor_label.config(text=f"Advisor suggests: {action} "
+                                           f"(expected avg. approval {advice['expected_approval']:.1f}% "
+                                           f"over {ADVISOR_HORIZON_DAYS} days, {advice['visits']} simulations)")
+        self.update_display() # Restores the button states
 
     # ** NEW: Check for and display election-related messages **
     def check_election_messages(self):
@@ -1522,17 +1164,20 @@ class JapanPMSimulatorApp:
         # Check if policy triggered an election
         if self.simulation.election_in_progress == 'triggered':
              messagebox.showinfo("Election Triggered!", f"Your approval dropped below 30% after implementing {policy_name}, triggering an election!")
-             self.update_display() # Update UI to show election status
+             self.schedule_refresh() # Update UI to show election status
              # Don't advance day here, let user click Next Day to start attack phase
              return
 
         # If game still running and no election triggered by policy, proceed to next day
+        self.pending_move = policy_type
         self.next_day()
 
 
     def next_day(self):
         if not self.simulation or not self.simulation.running: return
 
+        self.advisor.advance(self.pending_move or "wait"); self.pending_move = None
+        if hasattr(self, 'advisor_label'): self.advisor_label.config(text="") # Advice was for the previous day
         event_type, event_name = self.simulation.advance_day()
 
         # Check game state AFTER advancing day
@@ -1557,8 +1202,9 @@ class JapanPMSimulatorApp:
         elif self.simulation.election_in_progress == 'triggered':
              messagebox.showinfo("Election Triggered!", "Your approval dropped below 30% due to recent events, triggering an election!")
 
-        # Always update display at the end
-        self.update_display()
+        # Redraw what the day changed
+        self.schedule_refresh()
+        self.autosaver.maybe_save(self.simulation)
 
 
     def confirm_end_game(self):
@@ -1568,15 +1214,16 @@ class JapanPMSimulatorApp:
                                      "This will count as an election loss."):
                  return # User cancelled
              # If they proceed, end the game with election loss reason
-             self.end_game("Conceded during election.")
+             self.end_game("Conceded during election.", cause='conceded')
         elif messagebox.askyesno("End Game", "Are you sure you want to end the current game?\nYour final score will be calculated."):
-            self.end_game("Ended game voluntarily.")
+            self.end_game("Ended game voluntarily.", cause='resigned')
 
 
-    def end_game(self, reason="Game Over"):
+    def end_game(self, reason="Game Over", cause='unknown'):
         if not self.simulation: return
         self.simulation.running = False
         self.simulation.game_over_reason = reason
+        self.simulation.game_over_cause = cause
         self.show_game_over_screen()
 
 
@@ -1598,6 +1245,7 @@ class JapanPMSimulatorApp:
 
         final_score = self.simulation.calculate_final_score()
         reason = self.simulation.game_over_reason or "Game Ended"
+        self.record_finished_game()
 
         # Display final message (only once)
         messagebox.showinfo("Game Over", f"{reason}\n\nFinal Score (Avg. Daily Approval): {final_score:.2f}%")
@@ -1606,6 +1254,70 @@ class JapanPMSimulatorApp:
         # Keep game screen visible, user clicks the modified "Return to Menu" button
 
 
+    # ** NEW: Game history (finished games are stored in SQLite, not read from save files) **
+    def record_finished_game(self):
+        if self.history is None or not self.simulation: return
+        try: self.history.record(self.simulation)
+        except sqlite3.Error as e:
+            if instrument.level <= instrument.WARNING:
+                instrument.emit(instrument.WARNING, 'history.record_failed', error=repr(e))
+
+    def show_history_screen(self):
+        if self.history is None: return
+        if self.history_window is not None and self.history_window.winfo_exists():
+            self.history_window.lift(); return
+
+        window = self.history_window = tk.Toplevel(self.root)
+        window.title("High Scores & Game History"); window.geometry("820x520"); window.configure(bg="#f0f0f8")
+        filter_frame = tk.Frame(window, bg="#f0f0f8", pady=5); filter_frame.pack(fill=tk.X, padx=10)
+        party_var, cause_var, order_var = tk.StringVar(value="All"), tk.StringVar(value="All"), tk.StringVar(value="score")
+        tk.Label(filter_frame, text="Party:", bg="#f0f0f8").pack(side=tk.LEFT)
+        party_box = ttk.Combobox(filter_frame, textvariable=party_var, state="readonly", width=28,
+                                 values=["All"] + self.history.parties()); party_box.pack(side=tk.LEFT, padx=5)
+        tk.Label(filter_frame, text="Cause:", bg="#f0f0f8").pack(side=tk.LEFT)
+        cause_box = ttk.Combobox(filter_frame, textvariable=cause_var, state="readonly", width=10,
+                                 values=["All"] + list(GAME_OVER_CAUSES)); cause_box.pack(side=tk.LEFT, padx=5)
+        for text, value in (("Best", "score"), ("Recent", "recent")):
+            tk.Radiobutton(filter_frame, text=text, variable=order_var, value=value, bg="#f0f0f8",
+                           command=lambda: refresh()).pack(side=tk.LEFT)
+
+        columns = ("rank", "pm", "party", "score", "days", "cause", "ended")
+        headings = ("#", "Prime Minister", "Party", "Score", "Days", "Cause", "Ended (game date)")
+        tree = ttk.Treeview(window, columns=columns, show="headings", height=14)
+        for column, heading, width in zip(columns, headings, (40, 150, 200, 70, 60, 80, 130)):
+            tree.heading(column, text=heading); tree.column(column, width=width, anchor=tk.W)
+        tree.pack(fill=tk.BOTH, expand=True, padx=10)
+        curve_canvas = tk.Canvas(window, height=110, bg="white"); curve_canvas.pack(fill=tk.X, padx=10, pady=8)
+
+        def refresh(*_):
+            tree.delete(*tree.get_children())
+            games = self.history.query(party=None if party_var.get() == "All" else party_var.get(),
+                                       cause=None if cause_var.get() == "All" else cause_var.get(),
+                                       order=order_var.get(), limit=200)
+            for rank, game in enumerate(games, start=1):
+                tree.insert("", tk.END, iid=str(game['id']), values=(rank, game['pm_name'], game['party_name'],
+                            f"{game['score']:.2f}", game['days'], game['cause'], game['end_date']))
+            curve_canvas.delete("all")
+
+        def show_curve(_event):
+            selection = tree.selection()
+            curve_canvas.delete("all")
+            curve = self.history.curve(int(selection[0])) if selection else None
+            if curve is None or curve.size < 2: return
+            width, height = max(curve_canvas.winfo_width(), 100), int(curve_canvas['height'])
+            points = []
+            for i, value in enumerate(curve):
+                points += [5 + i * (width - 10) / (curve.size - 1), height - 5 - float(value) / 100.0 * (height - 10)]
+            threshold_y = height - 5 - DEFAULT_PARAMS['election_threshold'] / 100.0 * (height - 10)
+            curve_canvas.create_line(5, threshold_y, width - 5, threshold_y, fill="red", dash=(4, 2))
+            curve_canvas.create_line(*points, fill="#2196F3", width=2)
+            curve_canvas.create_text(8, 8, anchor=tk.NW, text="Approval curve", fill="#555555")
+
+        party_box.bind("<<ComboboxSelected>>", refresh)
+        cause_box.bind("<<ComboboxSelected>>", refresh)
+        tree.bind("<<TreeviewSelect>>", show_curve)
+        refresh()
+
     def show_prefecture_data(self):
         if self.prefecture_window_open: return # Prevent opening multiple windows
 
@@ -1639,6 +1351,8 @@ class JapanPMSimulatorApp:
         stats_frame = tk.Frame(self.prefecture_window, bg="#e1e1f0", padx=10, pady=5); stats_frame.pack(fill=tk.X, padx=10, pady=5)
         self.pref_stats_label = tk.Label(stats_frame, text="", bg="#e1e1f0", font=("Arial", 10)); self.pref_stats_label.pack(pady=5)
         self.update_prefecture_stats_display(current_prefecture_data) # Initial stats display
+        # ** NEW: Live updates from the change bus (Refresh Data forces a full redraw) **
+        if self.simulation: self.simulation.changes.subscribe(self.on_prefecture_changes, topics=('units',))
 
 
         button_frame = tk.Frame(self.prefecture_window, bg="#f0f0f8"); button_frame.pack(pady=10)
@@ -1684,9 +1398,20 @@ class JapanPMSimulatorApp:
                        f"Avg Unemployment: {avg_unemployment:.1f}% | Total GDP: ${total_gdp:.1f}B | Avg Growth: {avg_growth:+.2f}%")
          self.pref_stats_label.config(text=stats_text)
 
+    def on_prefecture_changes(self, changes):
+        """Bus subscriber of the prefecture window: update the tabs from the changed fields."""
+        if not self.prefecture_window_open or not self.simulation.running: return
+        new_data = self.simulation.get_prefecture_data()
+        fields = changes['units'].fields
+        self.pref_data_tab.refresh_rows(new_data)
+        self.pref_analysis_tab.apply_changes(new_data, fields)
+        self.pref_map_tab.apply_changes(new_data, fields)
+        self.update_prefecture_stats_display(new_data)
+
     # ** NEW: Handle prefecture window closing **
     def on_prefecture_window_close(self):
         self.prefecture_window_open = False
+        if self.simulation: self.simulation.changes.unsubscribe(self.on_prefecture_changes)
         if hasattr(self, 'prefecture_window'): # Check if window exists
              try: self.prefecture_window.destroy()
              except tk.TclError: pass # Ignore error if already destroyed
@@ -1701,22 +1426,72 @@ class JapanPMSimulatorApp:
 
     def save_game(self):
         if not self.simulation: messagebox.showerror("Error", "No game running to save."); return
-        if self.simulation.election_in_progress:
-             messagebox.showwarning("Save Blocked", "Cannot save during an election.")
-             return
+        # ** MODIFIED: Saving mid-election is allowed (the scheduler keeps the pending phases) **
         # if not self.simulation.running: messagebox.showwarning("Save Info", "Cannot save ended game."); return
 
         try:
-            slot = simpledialog.askinteger("Save Game", "Enter save slot (1-3):", minvalue=1, maxvalue=3)
-            if slot is None: return
-            save_file = f"pm_simulator_save_{slot}.pkl"
+            choice = self.pick_save_slot('save')
+            if choice is None: return
+            slot, save_file = choice
+            if os.path.exists(save_file) and not messagebox.askyesno("Overwrite Save", f"Overwrite the game in slot {slot}?"):
+                return
             try:
-                with open(save_file, "wb") as f: pickle.dump(self.simulation, f)
+                saves.write(save_file, self.simulation)
                 messagebox.showinfo("Save Complete", f"Game saved to slot {slot}")
             except Exception as e: messagebox.showerror("Save Error", f"Could not save game data: {str(e)}")
         except Exception as e: messagebox.showerror("Error", f"Failed to save game: {str(e)}")
 
 
+    def autosave_tick(self):
+        """Timer-driven autosave check (the write itself runs on the autosaver's thread)."""
+        if self.simulation and self.simulation.running: self.autosaver.maybe_save(self.simulation)
+        error = self.autosaver.last_error
+        if hasattr(self, 'autosave_label') and self.autosave_label.winfo_exists():
+            self.autosave_label.config(text=f"Autosave failed: {error}" if error else "")
+        self.root.after(AUTOSAVE_POLL_MS, self.autosave_tick)
+
+    # ** NEW: Performance overlay **
+    def toggle_perf_overlay(self, _event=None):
+        """Show or hide the overlay; counters are only collected while something needs them."""
+        if self.perf_sampler is not None:
+            if self.perf_after_id is not None: self.root.after_cancel(self.perf_after_id)
+            if self.perf_label is not None and self.perf_label.winfo_exists(): self.perf_label.destroy()
+            if self.perf_owns_instruments: instrument.disable()
+            self.perf_sampler = self.perf_label = self.perf_after_id = None
+            return
+        # Allocation counting is left off: it would add to the very timings on display
+        self.perf_owns_instruments = not instrument.INSTRUMENTS.enabled
+        if self.perf_owns_instruments: instrument.enable(memory=False)
+        self.perf_sampler = instrument.Sampler(PERF_OVERLAY_NAMES)
+        self.perf_sampler.sample(self.simulation.tick if self.simulation else 0)
+        self.perf_due = time.perf_counter() + PERF_OVERLAY_MS / 1000
+        self.perf_after_id = self.root.after(PERF_OVERLAY_MS, self.perf_overlay_tick)
+
+    def perf_overlay_tick(self):
+        """Timer callback: sample the counters and refresh the overlay text."""
+        now = time.perf_counter()
+        lag = now - self.perf_due # How late the event loop ran this timer
+        sample = self.perf_sampler.sample(self.simulation.tick if self.simulation else 0, now)
+
+        def ms(name):
+            value = sample[name]['ms_per_call']
+            return f"{value:7.1f} ms" if value is not None else "      - ms"
+        memory = sample['memory']
+        lines = [f"days/s   {sample['days_per_second']:9.1f}",
+                 f"loop lag {1000 * max(lag, 0.0):7.1f} ms",
+                 f"frame    {ms('apply_changes')}",
+                 f"graph    {ms('create_approval_graph')}",
+                 f"events   {ms('update_event_list')}",
+                 f"memory   {memory / 2**20:7.1f} MB" if memory is not None else "memory         n/a"]
+        # Screens are rebuilt by destroying the root's children, so recreate the label when needed
+        if self.perf_label is None or not self.perf_label.winfo_exists():
+            self.perf_label = tk.Label(self.root, font=("Courier", 9), bg="#263238", fg="#B2FF59", justify=tk.LEFT, padx=6, pady=4)
+        self.perf_label.config(text="\n".join(lines))
+        self.perf_label.place(relx=1.0, rely=0.0, anchor="ne", x=-4, y=4); self.perf_label.lift()
+
+        self.perf_due = time.perf_counter() + PERF_OVERLAY_MS / 1000
+        self.perf_after_id = self.root.after(PERF_OVERLAY_MS, self.perf_overlay_tick)
+
     def quit_game(self):
         # Close prefecture window if open
         if self.prefecture_window_open: self.on_prefecture_window_close()
@@ -1729,6 +1504,7 @@ class JapanPMSimulatorApp:
                  self.root.destroy()
 
 def main():
+    instrument.configure_from_env() # PMSIM_LOG_LEVEL / PMSIM_PROFILE / PMSIM_TRACE
     root = tk.Tk()
     # Font/DPI/Encoding settings (keep as is)
     if hasattr(sys, 'getwindowsversion'):
@@ -1738,6 +1514,9 @@ def main():
         except: pass
     app = JapanPMSimulatorApp(root)
     root.mainloop()
+    app.advisor.close()
+    app.autosaver.close() # Let a pending autosave finish
+    if app.history is not None: app.history.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,40 @@
+"""Per-game memory footprint: slotted engine classes and the FOOTPRINT_TARGETS budget."""
+import pickle
+
+import pytest
+
+from pmsim import benchmarks
+from pmsim.engine import CountryStatistics, Prefecture, PrimeMinister, RivalParty, Simulation
+
+
+@pytest.fixture(scope='module')
+def sim():
+    return Simulation(seed=benchmarks.SEED)
+
+
+def slotted_objects(sim):
+    return [sim._prefecture_views[0], sim.pm, sim.rivals[0], sim.stats]
+
+
+@pytest.mark.parametrize('cls', [Prefecture, PrimeMinister, RivalParty, CountryStatistics])
+def test_class_is_slotted(cls):
+    assert '__slots__' in vars(cls)
+
+
+def test_instances_have_no_dict(sim):
+    for obj in slotted_objects(sim):
+        assert not hasattr(obj, '__dict__'), type(obj).__name__
+
+
+def test_loaded_copy_stays_slotted(sim):
+    copy = pickle.loads(pickle.dumps(sim, protocol=pickle.HIGHEST_PROTOCOL))
+    for obj in slotted_objects(copy):
+        assert not hasattr(obj, '__dict__'), type(obj).__name__
+    assert copy.pm.name == sim.pm.name
+    assert [rival.name for rival in copy.rivals] == [rival.name for rival in sim.rivals]
+
+
+@pytest.mark.parametrize('days', [0, 365])
+def test_prefecture_game_within_budget(tmp_path, days):
+    result = benchmarks.footprint(benchmarks.Case('prefecture', days, str(tmp_path)))
+    assert result['bytes'] <= result['target'], result
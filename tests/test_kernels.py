@@ -0,0 +1,39 @@
+"""The compiled batch kernel must match the NumPy reference bit for bit.
+
+The kernel path is forced on (backend='numba' set after construction), so without
+numba it runs as plain Python; with numba installed it runs compiled.
+"""
+import numpy as np
+import pytest
+
+from pmsim import municipalities
+from pmsim.batch import BatchSimulation
+from pmsim.engine import builtin_dataset
+from pmsim.policies import POLICY_TYPES
+
+CASES = {'prefecture': (47, 8, 30), 'municipality': (1741, 3, 3)} # n_units, games, days
+
+
+def dataset(scale):
+    return builtin_dataset() if scale == 'prefecture' else municipalities.split_dataset(builtin_dataset())
+
+
+def play(scale, backend):
+    n_units, n_games, days = CASES[scale]
+    batch = BatchSimulation(dataset(scale), n_games, seed=7)
+    assert batch.dataset.n_units == n_units
+    batch.backend = backend
+    actions = np.random.default_rng(1)
+    for _ in range(days):
+        batch.apply_actions(actions.integers(0, len(POLICY_TYPES) + 1, n_games))
+        batch.step_day()
+    return batch
+
+
+@pytest.mark.parametrize('scale', sorted(CASES))
+def test_kernel_matches_numpy(scale):
+    reference, kernel = play(scale, 'numpy'), play(scale, 'numba')
+    assert np.array_equal(kernel.buffer, reference.buffer)
+    assert np.array_equal(kernel.global_approval, reference.global_approval)
+    assert np.array_equal(kernel.score(), reference.score())
+    assert np.array_equal(kernel.running, reference.running)